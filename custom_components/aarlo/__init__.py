@@ -5,15 +5,14 @@ For more details about this platform, please refer to the documentation at
 https://github.com/twrecked/hass-aarlo/blob/master/README.md
 """
 
-import json
+import asyncio
 import logging
-import pprint
+import os
 import time
 import voluptuous as vol
-from traceback import extract_stack
+from functools import partial
 from requests.exceptions import ConnectTimeout, HTTPError
 
-from homeassistant.components import persistent_notification
 from homeassistant.components.alarm_control_panel import DOMAIN as ALARM_DOMAIN
 from homeassistant.components.camera import DOMAIN as CAMERA_DOMAIN
 from homeassistant.config_entries import ConfigEntry, SOURCE_IMPORT
@@ -29,29 +28,55 @@ from homeassistant.const import (
 from homeassistant.core import (
     DOMAIN as HOMEASSISTANT_DOMAIN,
     HomeAssistant,
+    SupportsResponse,
     callback
 )
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send, dispatcher_send
+from homeassistant.helpers.event import async_track_state_change_event, async_track_time_interval
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.issue_registry import (
     async_create_issue,
     IssueSeverity
 )
 from homeassistant.helpers.typing import ConfigType
 import homeassistant.helpers.device_registry as dr
+import homeassistant.helpers.entity_registry as er
 
 from pyaarlo.constant import (
+    ACTIVITY_STATE_KEY,
+    BATTERY_KEY,
+    BUTTON_PRESSED_KEY,
+    CHARGING_KEY,
+    CONNECTION_KEY,
     DEFAULT_AUTH_HOST,
     DEFAULT_HOST,
     DEVICE_ID_KEY,
     DEVICE_NAME_KEY,
+    LAST_IMAGE_SRC_KEY,
+    MOTION_DETECTED_KEY,
     SIREN_STATE_KEY,
     MQTT_HOST
 )
 
+from .breaker import ArloCircuitBreakers
+from .commands import ArloCommandQueue, PRIORITY_CONTROL
 from .const import *
-from .utils import get_entity_from_domain
+from .executor import ArloExecutor
+from .image_cache import ArloImageStore
+from .utils import (
+    async_fan_out_sirens,
+    async_run_blocking,
+    async_run_command,
+    async_service_handler,
+    battery_devices,
+    get_device_from_domain,
+    get_entity_from_domain
+)
 from .cfg import BlendedCfg, PyaarloCfg
+from .registry import ArloEntityRegistry
+from .stats import ArloStats
 
 
 __version__ = "0.8.1.22"
@@ -154,6 +179,7 @@ SERVICE_SIREN_OFF = "siren_off"
 SERVICE_SIRENS_OFF = "sirens_off"
 SERVICE_RESTART = "restart_device"
 SERVICE_INJECT_RESPONSE = "inject_response"
+SERVICE_REPLAY_PACKETS = "replay_packets"
 SIREN_ON_SCHEMA = vol.Schema({
     vol.Required(ATTR_ENTITY_ID): cv.comp_entity_ids,
     vol.Required(ATTR_DURATION): cv.positive_int,
@@ -171,6 +197,10 @@ SIRENS_OFF_SCHEMA = vol.Schema({
 INJECT_RESPONSE_SCHEMA = vol.Schema({
     vol.Required("filename"): cv.string,
 })
+REPLAY_PACKETS_SCHEMA = vol.Schema({
+    vol.Required("path"): cv.string,
+    vol.Optional("speed"): vol.All(vol.Coerce(float), vol.Range(min=0.001)),
+})
 RESTART_SCHEMA = vol.Schema({
     vol.Required(ATTR_ENTITY_ID): cv.comp_entity_ids,
 })
@@ -241,16 +271,90 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     cfg = BlendedCfg(hass)
     await cfg.async_load_and_merge(entry.data, entry.options)
     domain_config = cfg.domain_config
+
+    # All our blocking calls go through our own executor.
+    executor = ArloExecutor(
+        domain_config.get(CONF_EXECUTOR_WORKERS, EXECUTOR_WORKERS),
+        domain_config.get(CONF_EXECUTOR_QUEUE, EXECUTOR_QUEUE)
+    )
+
+    # Don't leave the executor or a half filled hass.data behind if anything
+    # goes wrong, or we're cancelled, from here on.
+    try:
+        return await _async_setup_session(hass, entry, cfg, executor)
+    except BaseException:
+        await _async_abandon_setup(hass, executor)
+        raise
+
+
+async def _async_abandon_setup(hass, executor):
+    """Undo what a failed `async_setup_entry` got done.
+
+    The threads are stopped before we return so a retry can't race them.
+    """
+    executor.shutdown()
+    stops = [
+        hass.async_add_executor_job(hass.data[key].stop)
+        for key in (COMPONENT_DATA, COMPONENT_PACKET_DUMP, COMPONENT_HISTORY)
+        if hass.data.get(key) is not None
+    ]
+    for result in await asyncio.gather(*stops, return_exceptions=True):
+        if isinstance(result, Exception):
+            _LOGGER.warning(f"failed to stop after a failed set up: {result}")
+    for key in (
+        COMPONENT_EXECUTOR, COMPONENT_DATA, COMPONENT_SERVICES, COMPONENT_CONFIG,
+        COMPONENT_ENTITIES, COMPONENT_STATS, COMPONENT_COMMANDS, COMPONENT_BREAKERS,
+        COMPONENT_LIMITER, COMPONENT_TRACER, COMPONENT_IMAGES, COMPONENT_SNAPSHOTS,
+        COMPONENT_REFRESH, COMPONENT_PACKET_DUMP, COMPONENT_ACTIVITY, COMPONENT_BATTERY,
+        COMPONENT_HISTORY,
+    ):
+        hass.data.pop(key, None)
+
+
+async def _async_setup_session(hass, entry, cfg, executor):
+    domain_config = cfg.domain_config
     injection_service = domain_config.get(CONF_INJECTION_SERVICE, False)
 
     # Try to login to aarlo.
-    arlo = await hass.async_add_executor_job(login, hass, domain_config)
+    login_start = time.monotonic()
+    arlo = await executor.async_run(login, hass, domain_config)
+    login_time = time.monotonic() - login_start
     if arlo is None:
+        executor.shutdown()
         return False
 
     # We've logged in so create the session config.
+    hass.data[COMPONENT_EXECUTOR] = executor
     hass.data[COMPONENT_DATA] = arlo
     hass.data[COMPONENT_SERVICES] = {}
+    hass.data[COMPONENT_ENTITIES] = ArloEntityRegistry()
+    hass.data[COMPONENT_STATS] = ArloStats()
+    hass.data[COMPONENT_STATS].time("login", login_time)
+    _count_device_callbacks(arlo, hass.data[COMPONENT_STATS])
+    _time_device_refreshes(arlo, hass.data[COMPONENT_STATS])
+    hass.data[COMPONENT_TRACER] = _tracer()
+    _trace_packets(arlo, hass.data[COMPONENT_TRACER])
+    hass.data[COMPONENT_PACKET_DUMP] = _packet_dump(hass, domain_config)
+    _dump_packets(arlo, hass.data[COMPONENT_PACKET_DUMP])
+    hass.data[COMPONENT_IMAGES] = ArloImageStore()
+    hass.data[COMPONENT_SNAPSHOTS] = await _async_snapshot_strategy(hass, domain_config)
+    hass.data[COMPONENT_REFRESH] = _refresh_scheduler(domain_config)
+    hass.data[COMPONENT_HISTORY] = await _async_event_history(hass, domain_config)
+    _record_events(arlo, hass.data[COMPONENT_HISTORY])
+    hass.data[COMPONENT_ACTIVITY] = _activity_stats(hass, domain_config)
+    _count_captures(arlo, hass.data[COMPONENT_ACTIVITY])
+    hass.data[COMPONENT_BATTERY] = await _async_battery_estimator(hass, domain_config)
+    _estimate_batteries(arlo, hass.data[COMPONENT_BATTERY])
+    hass.data[COMPONENT_BREAKERS] = ArloCircuitBreakers(
+        domain_config.get(CONF_BREAKER_FAILURES, BREAKER_FAILURES),
+        domain_config.get(CONF_BREAKER_BACKOFF, BREAKER_BACKOFF)
+    )
+    _watch_device_connections(arlo, hass.data[COMPONENT_BREAKERS])
+    hass.data[COMPONENT_LIMITER] = _rate_limiter(domain_config)
+    hass.data[COMPONENT_COMMANDS] = ArloCommandQueue(
+        partial(async_run_blocking, hass),
+        domain_config.get(CONF_COMMAND_CONCURRENCY, COMMAND_CONCURRENCY)
+    )
     hass.data[COMPONENT_CONFIG] = {
         COMPONENT_DOMAIN: domain_config,
         str(Platform.ALARM_CONTROL_PANEL): cfg.alarm_config,
@@ -261,6 +365,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.debug(f"update hass data {hass.data[COMPONENT_CONFIG]}")
     
     # Create a pseudo device. We use this for device less entities.
+    registry_start = time.monotonic()
     aarlo_device = {
         DEVICE_NAME_KEY: arlo.name,
         DEVICE_ID_KEY: arlo.device_id,
@@ -272,12 +377,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     for device in arlo.devices:
         _LOGGER.debug(f"would try to add {device[DEVICE_NAME_KEY]}")
         await _async_get_or_create_momentary_device_in_registry(hass, entry, device)
+    hass.data[COMPONENT_STATS].time("setup/device_registry", time.monotonic() - registry_start)
 
     # Create the entities.
+    platforms_start = time.monotonic()
     await hass.config_entries.async_forward_entry_setups(entry, ARLO_PLATFORMS)
+    hass.data[COMPONENT_STATS].time("setup/platforms", time.monotonic() - platforms_start)
 
     # Make sure we pick up config changes.
     entry.async_on_unload(entry.add_update_listener(update_listener))
+    if domain_config.get(CONF_CONFIG_WATCH, CONFIG_WATCH):
+        await _async_watch_config(hass, entry)
+
+    # Keep camera images fresh, if any cameras want it.
+    entry.async_on_unload(async_track_time_interval(hass, _refresh_cameras(hass), REFRESH_TICK))
+
+    # Keep the activity counts moving when nothing is being captured.
+    if hass.data[COMPONENT_ACTIVITY] is not None:
+        entry.async_on_unload(async_track_time_interval(hass, _activity_aged(hass), ACTIVITY_TICK))
+
+    # Count and time how often our entities write new states.
+    entry.async_on_unload(_track_state_writes(hass, entry))
 
     # Component services
     has_sirens = False
@@ -285,63 +405,50 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if device.has_capability(SIREN_STATE_KEY):
             has_sirens = True
 
-    def service_callback(call):
-        """Call aarlo service handler."""
-        _LOGGER.info("{} service called".format(call.service))
-        if has_sirens:
-            if call.service == SERVICE_SIREN_ON:
-                aarlo_siren_on(hass, call)
-            if call.service == SERVICE_SIRENS_ON:
-                aarlo_sirens_on(hass, call)
-            if call.service == SERVICE_SIREN_OFF:
-                aarlo_siren_off(hass, call)
-            if call.service == SERVICE_SIRENS_OFF:
-                aarlo_sirens_off(hass, call)
-        if call.service == SERVICE_RESTART:
-            aarlo_restart_device(hass, call)
-        if call.service == SERVICE_INJECT_RESPONSE:
-            aarlo_inject_response(hass, call)
-
-    async def async_service_callback(call):
-        await hass.async_add_executor_job(service_callback, call)
-
     hass.services.async_register(
         COMPONENT_DOMAIN,
         SERVICE_SIREN_ON,
-        async_service_callback,
+        async_service_handler(hass, async_aarlo_siren_on, has_sirens),
         schema=SIREN_ON_SCHEMA,
     )
     hass.services.async_register(
         COMPONENT_DOMAIN,
         SERVICE_SIRENS_ON,
-        async_service_callback,
+        async_service_handler(hass, async_aarlo_sirens_on, has_sirens),
         schema=SIRENS_ON_SCHEMA,
     )
     hass.services.async_register(
         COMPONENT_DOMAIN,
         SERVICE_SIREN_OFF,
-        async_service_callback,
+        async_service_handler(hass, async_aarlo_siren_off, has_sirens),
         schema=SIREN_OFF_SCHEMA,
     )
     hass.services.async_register(
         COMPONENT_DOMAIN,
         SERVICE_SIRENS_OFF,
-        async_service_callback,
+        async_service_handler(hass, async_aarlo_sirens_off, has_sirens),
         schema=SIRENS_OFF_SCHEMA,
     )
     hass.services.async_register(
         COMPONENT_DOMAIN,
         SERVICE_RESTART,
-        async_service_callback,
+        async_service_handler(hass, async_aarlo_restart_device),
         schema=RESTART_SCHEMA,
     )
     if injection_service:
         hass.services.async_register(
             COMPONENT_DOMAIN,
             SERVICE_INJECT_RESPONSE,
-            async_service_callback,
+            async_service_handler(hass, async_aarlo_inject_response),
             schema=INJECT_RESPONSE_SCHEMA,
         )
+        hass.services.async_register(
+            COMPONENT_DOMAIN,
+            SERVICE_REPLAY_PACKETS,
+            async_service_handler(hass, async_aarlo_replay_packets),
+            schema=REPLAY_PACKETS_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
 
     return True
 
@@ -351,10 +458,28 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.debug(f"unloading it {entry.title}")
     unload_ok = await hass.config_entries.async_unload_platforms(entry, ARLO_PLATFORMS)
     if unload_ok:
-        await hass.async_add_executor_job(hass.data[COMPONENT_DATA].stop, True)
+        await async_run_blocking(hass, hass.data[COMPONENT_DATA].stop, True)
+        hass.data.pop(COMPONENT_EXECUTOR).shutdown()
         hass.data.pop(COMPONENT_DATA)
         hass.data.pop(COMPONENT_SERVICES)
         hass.data.pop(COMPONENT_CONFIG)
+        hass.data.pop(COMPONENT_ENTITIES)
+        hass.data.pop(COMPONENT_STATS)
+        hass.data.pop(COMPONENT_COMMANDS)
+        hass.data.pop(COMPONENT_BREAKERS)
+        hass.data.pop(COMPONENT_LIMITER)
+        hass.data.pop(COMPONENT_TRACER)
+        hass.data.pop(COMPONENT_IMAGES)
+        hass.data.pop(COMPONENT_SNAPSHOTS)
+        hass.data.pop(COMPONENT_REFRESH)
+        packet_dump = hass.data.pop(COMPONENT_PACKET_DUMP)
+        if packet_dump is not None:
+            await async_run_blocking(hass, packet_dump.stop)
+        hass.data.pop(COMPONENT_ACTIVITY)
+        hass.data.pop(COMPONENT_BATTERY)
+        history = hass.data.pop(COMPONENT_HISTORY)
+        if history is not None:
+            await async_run_blocking(hass, history.stop)
     _LOGGER.debug(f"ok={unload_ok}")
 
     return unload_ok
@@ -380,6 +505,391 @@ async def update_listener(hass: HomeAssistant, entry: ConfigEntry):
     await hass.config_entries.async_forward_entry_setups(entry, ARLO_PLATFORMS)
 
 
+async def _async_watch_config(hass, entry):
+    """Keep an eye on aarlo.yaml.
+
+    Changes to the options in `AARLO_SCHEMA_LIVE` are applied straight away,
+    anything else needs the integration reloading.
+    """
+    cfg = BlendedCfg(hass)
+    last_key = await cfg.async_file_key()
+
+    async def _async_check(_now):
+        nonlocal last_key
+        key = await cfg.async_file_key()
+        if key == last_key:
+            return
+        last_key = key
+
+        await cfg.async_load_and_merge(entry.data, entry.options)
+        domain_config = hass.data[COMPONENT_CONFIG][COMPONENT_DOMAIN]
+        live, needs_reload = BlendedCfg.live_changes(domain_config, cfg.domain_config)
+        if live:
+            _LOGGER.info(f"applying aarlo.yaml changes {live}")
+            domain_config.update(live)
+        if needs_reload:
+            _LOGGER.warning(f"aarlo.yaml changed {', '.join(needs_reload)}; reload Aarlo to apply")
+
+    entry.async_on_unload(async_track_time_interval(hass, _async_check, CONFIG_WATCH_INTERVAL))
+
+
+def _all_devices(arlo):
+    return arlo.cameras + arlo.base_stations + arlo.doorbells + arlo.lights + arlo.sensors
+
+
+def _watch_device_connections(arlo, breakers):
+    """Keep the circuit breakers up to date with what the devices report."""
+
+    def update_connection(device, _attr, value):
+        breakers.get(device.device_id).connection(value)
+
+    def update_activity(device, _attr, _value):
+        breakers.get(device.device_id).activity()
+
+    for device in _all_devices(arlo):
+        breakers.get(device.device_id).connection(device.attribute(CONNECTION_KEY))
+        device.add_attr_callback(CONNECTION_KEY, update_connection)
+        device.add_attr_callback(ACTIVITY_STATE_KEY, update_activity)
+
+
+def _count_device_callbacks(arlo, stats):
+    """Count the attribute updates pyaarlo passes us."""
+
+    def count_callback(_device, attr, _value):
+        stats.count(f"callback/{attr}")
+
+    for device in _all_devices(arlo):
+        device.add_attr_callback("*", count_callback)
+
+
+def _time_device_refreshes(arlo, stats):
+    """Time pyaarlo's periodic device refresh.
+
+    pyaarlo doesn't report this so we wrap its refresh method.
+    """
+    refresh = getattr(arlo, "_refresh_devices", None)
+    if refresh is None:
+        return
+
+    def _timed_refresh(*args, **kwargs):
+        start = time.monotonic()
+        try:
+            return refresh(*args, **kwargs)
+        finally:
+            stats.time("refresh_devices", time.monotonic() - start)
+
+    arlo._refresh_devices = _timed_refresh
+
+
+def _tracer():
+    """Create the latency tracer."""
+    from .tracing import ArloTracer
+
+    return ArloTracer()
+
+
+def _rate_limiter(config):
+    """Create the rate limiter with the configured budgets."""
+    from .limiter import ArloRateLimiter
+
+    return ArloRateLimiter(config.get(CONF_REQUEST_RATES, {}))
+
+
+def _refresh_scheduler(config):
+    """Create the scheduler sharing out the snapshot refreshes."""
+    from .refresh import ArloRefreshScheduler
+
+    return ArloRefreshScheduler(config.get(CONF_REFRESH_BUDGET, REFRESH_BUDGET))
+
+
+def _activity_stats(hass, config):
+    """Create the rolling capture counts if the activity sensors are wanted.
+
+    The sensors are signalled after each capture.
+    """
+    if not config.get(CONF_ACTIVITY_SENSORS, ACTIVITY_SENSORS):
+        return None
+
+    from .activity import ArloActivityStats
+
+    activity = ArloActivityStats()
+    activity.on_capture = partial(dispatcher_send, hass, SIGNAL_ACTIVITY_UPDATED)
+    return activity
+
+
+def _activity_aged(hass):
+    """Signal every activity sensor, captures age out of the counts without one."""
+
+    @callback
+    def _aged(_now):
+        async_dispatcher_send(hass, SIGNAL_ACTIVITY_UPDATED, None)
+
+    return _aged
+
+
+def _trace_packets(arlo, tracer):
+    """Note when each packet arrives from Arlo.
+
+    pyaarlo has no hook that runs before its device callbacks so we wrap its
+    event dispatcher.
+    """
+    backend = getattr(arlo, "be", None)
+    dispatcher = getattr(backend, "_event_dispatcher", None)
+    if dispatcher is None:
+        return
+
+    def _traced_dispatcher(response, *args, **kwargs):
+        tracer.packet(response)
+        return dispatcher(response, *args, **kwargs)
+
+    backend._event_dispatcher = _traced_dispatcher
+
+
+def _packet_dump(hass, config):
+    """Start the packet dump writer if it's wanted."""
+    if not config.get(CONF_PACKET_DUMP, PACKET_DUMP):
+        return None
+
+    from .packet_dump import ArloPacketDump
+
+    return ArloPacketDump(
+        f"{PyaarloCfg.storage_dir(hass, config)}/packets.dump.gz",
+        max_size=config.get(CONF_PACKET_DUMP_MAX_SIZE, PACKET_DUMP_MAX_SIZE) * 1024 * 1024,
+        max_age=config.get(CONF_PACKET_DUMP_MAX_AGE, PACKET_DUMP_MAX_AGE) * 60 * 60,
+        backups=config.get(CONF_PACKET_DUMP_BACKUPS, PACKET_DUMP_BACKUPS),
+        sample=config.get(CONF_PACKET_DUMP_SAMPLE, PACKET_DUMP_SAMPLE),
+        max_queue=config.get(CONF_PACKET_DUMP_QUEUE, PACKET_DUMP_QUEUE),
+    ).start()
+
+
+async def _async_event_history(hass, config):
+    """Open the event history if it's wanted."""
+    if not config.get(CONF_EVENT_HISTORY, EVENT_HISTORY):
+        return None
+
+    import sqlite3
+    from .history import ArloEventHistory
+
+    history = ArloEventHistory(
+        f"{PyaarloCfg.storage_dir(hass, config)}/events.db",
+        retention=config.get(CONF_EVENT_HISTORY_RETENTION, EVENT_HISTORY_RETENTION) * 24 * 60 * 60,
+    )
+    try:
+        return await hass.async_add_executor_job(history.start)
+    except (OSError, sqlite3.Error) as err:
+        _LOGGER.warning(f"unable to open the event history: {err}")
+        return None
+
+
+def _record_events(arlo, history):
+    """Add motion, doorbell presses and new captures to the event history."""
+    if history is None:
+        return
+
+    from .history import EVENT_CAPTURE, EVENT_DING, EVENT_MOTION
+
+    def record_motion(device, _attr, value):
+        if value:
+            history.record(device.device_id, EVENT_MOTION)
+
+    def record_ding(device, _attr, value):
+        if value:
+            history.record(device.device_id, EVENT_DING)
+
+    def record_capture(device, _attr, value):
+        if _is_capture(value):
+            history.record(device.device_id, EVENT_CAPTURE, **_capture_details(device))
+
+    # Video doorbells are cameras and doorbells, only listen once.
+    devices = {device.device_id: device for device in arlo.cameras + arlo.doorbells}
+    for device in devices.values():
+        device.add_attr_callback(MOTION_DETECTED_KEY, record_motion)
+        if device.has_capability(BUTTON_PRESSED_KEY):
+            device.add_attr_callback(BUTTON_PRESSED_KEY, record_ding)
+    for camera in arlo.cameras:
+        camera.add_attr_callback(LAST_IMAGE_SRC_KEY, record_capture)
+
+
+def _count_captures(arlo, activity):
+    """Keep the rolling capture counts up to date."""
+    if activity is None:
+        return
+
+    def count_capture(device, _attr, value):
+        if _is_capture(value):
+            details = _capture_details(device)
+            details.pop("object_region")
+            activity.capture(device.device_id, **details)
+
+    for camera in arlo.cameras:
+        camera.add_attr_callback(LAST_IMAGE_SRC_KEY, count_capture)
+
+
+async def _async_battery_estimator(hass, config):
+    """Load the battery readings we've kept, if the estimates are wanted.
+
+    Readings are saved a little while after they change. The sensors are
+    signalled when a device's estimate changes.
+    """
+    if not config.get(CONF_BATTERY_SENSORS, BATTERY_SENSORS):
+        return None
+
+    from .battery import ArloBatteryEstimator
+
+    store = Store(hass, BATTERY_STORAGE_VERSION, BATTERY_STORAGE_KEY)
+    estimator = ArloBatteryEstimator().load(await store.async_load())
+
+    def _save():
+        hass.loop.call_soon_threadsafe(store.async_delay_save, estimator.as_dict, BATTERY_SAVE_DELAY)
+
+    estimator.on_change = _save
+    estimator.on_update = partial(dispatcher_send, hass, SIGNAL_BATTERY_UPDATED)
+    return estimator
+
+
+def _estimate_batteries(arlo, estimator):
+    """Hand each battery level, and charging change, to the estimator."""
+    if estimator is None:
+        return
+
+    def update_battery(device, _attr, _value):
+        estimator.reading(device.device_id, device.battery_level, device.is_charging)
+
+    for device in battery_devices(arlo):
+        update_battery(device, BATTERY_KEY, None)
+        device.add_attr_callback(BATTERY_KEY, update_battery)
+        device.add_attr_callback(CHARGING_KEY, update_battery)
+
+
+def _is_capture(image_source):
+    """Did a recording change the image? Snapshots are ours, not events."""
+    return bool(image_source) and not image_source.startswith("snapshot/")
+
+
+def _capture_details(camera):
+    """What we know about the capture from the camera's last video."""
+    video = camera.last_video
+    if video is None:
+        return {"object_type": None, "object_region": None, "video_id": None, "at": None}
+    created_at = video.created_at
+    return {
+        "object_type": video.object_type,
+        "object_region": video.object_region,
+        "video_id": video.id,
+        "at": created_at / 1000 if created_at else None,
+    }
+
+
+def _refresh_cameras(hass):
+    """Ask the cameras the refresh scheduler says are due for a snapshot."""
+    entities = hass.data[COMPONENT_ENTITIES]
+    scheduler = hass.data[COMPONENT_REFRESH]
+
+    def _power(entity_id):
+        device = entities.device(entity_id)
+        if device is None:
+            return None, False, False
+        return device.battery_level, device.is_charging, device.has_charger
+
+    async def _async_refresh_camera(camera):
+        try:
+            _LOGGER.debug(f"refreshing {camera.entity_id}")
+            await camera.async_request_snapshot()
+        except HomeAssistantError as err:
+            _LOGGER.debug(f"refresh of {camera.entity_id} failed: {err}")
+
+    async def _async_refresh(_now):
+        for entity_id in scheduler.due(_power):
+            camera = entities.entity(entity_id, CAMERA_DOMAIN)
+            if camera is not None:
+                hass.async_create_task(_async_refresh_camera(camera))
+
+    return _async_refresh
+
+
+async def _async_snapshot_strategy(hass, config):
+    """Load what we've learnt about taking snapshots, if it's wanted.
+
+    Outcomes are saved a little while after they change.
+    """
+    if not config.get(CONF_ADAPTIVE_SNAPSHOTS, ADAPTIVE_SNAPSHOTS):
+        return None
+
+    from .snapshots import ArloSnapshotStrategy
+
+    store = Store(hass, SNAPSHOTS_STORAGE_VERSION, SNAPSHOTS_STORAGE_KEY)
+    strategy = ArloSnapshotStrategy().load(await store.async_load())
+
+    def _save():
+        hass.loop.call_soon_threadsafe(store.async_delay_save, strategy.as_dict, SNAPSHOTS_SAVE_DELAY)
+
+    strategy.on_change = _save
+    return strategy
+
+
+def _dump_packets(arlo, packet_dump):
+    """Hand each packet from Arlo to the packet dump, it only queues it."""
+    backend = getattr(arlo, "be", None)
+    dispatcher = getattr(backend, "_event_dispatcher", None)
+    if packet_dump is None or dispatcher is None:
+        return
+
+    def _dumped_dispatcher(response, *args, **kwargs):
+        packet_dump.write(response)
+        return dispatcher(response, *args, **kwargs)
+
+    backend._event_dispatcher = _dumped_dispatcher
+
+
+def _state_change_listener(hass, stats, tracer):
+    """Return a listener counting state changes of our entities per platform.
+
+    It also tells the tracer when a device's state reached Home Assistant.
+    """
+    from .tracing import STAGE_STATE
+
+    entities = hass.data[COMPONENT_ENTITIES]
+
+    @callback
+    def _state_change(event):
+        entity_id = event.data["entity_id"]
+        stats.count(f"state_write/{entity_id.split('.', 1)[0]}")
+        device = entities.device(entity_id)
+        if device is not None:
+            tracer.stage(device.device_id, None, STAGE_STATE)
+
+    return _state_change
+
+
+def _track_state_writes(hass, entry):
+    """Listen to the state changes of our entities, and only ours.
+
+    Entities registered later, by a reconfigure say, are picked up as they
+    appear. Returns a function that stops listening.
+    """
+    registry = er.async_get(hass)
+    listener = _state_change_listener(hass, hass.data[COMPONENT_STATS], hass.data[COMPONENT_TRACER])
+    entity_ids = [entity.entity_id for entity in er.async_entries_for_config_entry(registry, entry.entry_id)]
+    unsubs = [async_track_state_change_event(hass, entity_ids, listener)]
+
+    @callback
+    def _entity_registered(event):
+        if event.data["action"] != "create":
+            return
+        entity = registry.async_get(event.data["entity_id"])
+        if entity is not None and entity.config_entry_id == entry.entry_id:
+            unsubs.append(async_track_state_change_event(hass, entity.entity_id, listener))
+
+    unsubs.append(hass.bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, _entity_registered))
+
+    @callback
+    def _stop():
+        while unsubs:
+            unsubs.pop()()
+
+    return _stop
+
+
 async def _async_get_or_create_momentary_device_in_registry(
         hass: HomeAssistant, entry: ConfigEntry, device
 ) -> None:
@@ -394,6 +904,19 @@ async def _async_get_or_create_momentary_device_in_registry(
     )
 
 
+def _notify_login_failure(hass, error):
+    from homeassistant.components import persistent_notification
+
+    persistent_notification.create(
+        hass=hass,
+        message="Error: {}<br />If error persists you might need to change config and restart.".format(
+            error
+        ),
+        title=NOTIFICATION_TITLE,
+        notification_id=NOTIFICATION_ID,
+    )
+
+
 def login(hass, conf):
 
     sleep = 15
@@ -413,28 +936,14 @@ def login(hass, conf):
             arlo.stop()
 
             if attempt == 1:
-                persistent_notification.create(
-                    hass=hass,
-                    message="Error: {}<br />If error persists you might need to change config and restart.".format(
-                        arlo.last_error
-                    ),
-                    title=NOTIFICATION_TITLE,
-                    notification_id=NOTIFICATION_ID,
-                )
+                _notify_login_failure(hass, arlo.last_error)
             _LOGGER.error(
                 f"unable to connect to Arlo: attempt={attempt},sleep={sleep},error={arlo.last_error}"
             )
 
         except (ConnectTimeout, HTTPError) as ex:
             if attempt == 1:
-                persistent_notification.create(
-                    hass=hass,
-                    message="Error: {}<br />If error persists you might need to change config and restart.".format(
-                        ex
-                    ),
-                    title=NOTIFICATION_TITLE,
-                    notification_id=NOTIFICATION_ID,
-                )
+                _notify_login_failure(hass, ex)
             _LOGGER.error(
                 f"unable to connect to Arlo: attempt={attempt},sleep={sleep},error={str(ex)}"
             )
@@ -448,67 +957,130 @@ def login(hass, conf):
         sleep = min(300, sleep * 2)
 
 
-def aarlo_siren_on(hass, call):
+async def async_aarlo_siren_on(hass, call):
+    volume = call.data["volume"]
+    duration = call.data["duration"]
+    jobs = []
     for entity_id in call.data["entity_id"]:
         try:
-            volume = call.data["volume"]
-            duration = call.data["duration"]
             device = get_entity_from_domain(
                 hass, [ALARM_DOMAIN, CAMERA_DOMAIN], entity_id
             )
-            device.siren_on(duration=duration, volume=volume)
+            device_id = get_device_from_domain(hass, [ALARM_DOMAIN, CAMERA_DOMAIN], entity_id).device_id
+            jobs.append((entity_id, device_id, partial(device.siren_on, duration=duration, volume=volume)))
             _LOGGER.info("{} siren on {}/{}".format(entity_id, volume, duration))
         except HomeAssistantError:
             _LOGGER.info("{} siren device not found".format(entity_id))
+    await async_fan_out_sirens(hass, jobs)
 
 
-def aarlo_sirens_on(hass, call):
+async def async_aarlo_sirens_on(hass, call):
     arlo = hass.data[COMPONENT_DATA]
     volume = call.data["volume"]
     duration = call.data["duration"]
+    jobs = []
     for device in arlo.cameras + arlo.base_stations:
         if device.has_capability(SIREN_STATE_KEY):
-            device.siren_on(duration=duration, volume=volume)
+            jobs.append((device.unique_id, device.device_id,
+                         partial(device.siren_on, duration=duration, volume=volume)))
             _LOGGER.info("{} siren on {}/{}".format(device.unique_id, volume, duration))
+    await async_fan_out_sirens(hass, jobs)
 
 
-def aarlo_siren_off(hass, call):
+async def async_aarlo_siren_off(hass, call):
+    jobs = []
     for entity_id in call.data["entity_id"]:
         try:
             device = get_entity_from_domain(
                 hass, [ALARM_DOMAIN, CAMERA_DOMAIN], entity_id
             )
-            device.siren_off()
+            device_id = get_device_from_domain(hass, [ALARM_DOMAIN, CAMERA_DOMAIN], entity_id).device_id
+            jobs.append((entity_id, device_id, device.siren_off))
             _LOGGER.info("{} siren off".format(entity_id))
         except HomeAssistantError:
             _LOGGER.info("{} siren not found".format(entity_id))
+    await async_fan_out_sirens(hass, jobs)
 
 
-def aarlo_sirens_off(hass, _call):
+async def async_aarlo_sirens_off(hass, _call):
     arlo = hass.data[COMPONENT_DATA]
+    jobs = []
     for device in arlo.cameras + arlo.base_stations:
         if device.has_capability(SIREN_STATE_KEY):
-            device.siren_off()
+            jobs.append((device.unique_id, device.device_id, device.siren_off))
             _LOGGER.info("{} siren off".format(device.unique_id))
+    await async_fan_out_sirens(hass, jobs)
 
 
-def aarlo_restart_device(hass, call):
-    for entity_id in call.data["entity_id"]:
+async def async_aarlo_restart_device(hass, call):
+
+    async def _restart(entity_id):
         try:
             device = get_entity_from_domain(
                 hass, [ALARM_DOMAIN, CAMERA_DOMAIN], entity_id
             )
-            device.restart()
+            device_id = get_device_from_domain(hass, [ALARM_DOMAIN, CAMERA_DOMAIN], entity_id).device_id
+            await async_run_command(hass, device_id, PRIORITY_CONTROL, device.restart)
             _LOGGER.info("{} restarted".format(entity_id))
         except HomeAssistantError:
             _LOGGER.info("{} device not found".format(entity_id))
 
+    await asyncio.gather(*[_restart(entity_id) for entity_id in call.data["entity_id"]])
+
+
+def _load_packet(patch_file):
+    import json
 
-def aarlo_inject_response(hass, call):
-    patch_file = hass.config.config_dir + "/" + call.data["filename"]
     with open(patch_file) as file:
-        packet = json.load(file)
+        return json.load(file)
+
+
+async def async_aarlo_inject_response(hass, call):
+    patch_file = hass.config.config_dir + "/" + call.data["filename"]
+    packet = await hass.async_add_executor_job(_load_packet, patch_file)
 
     if packet is not None:
-        _LOGGER.debug("injecting->{}".format(pprint.pformat(packet)))
-        hass.data[COMPONENT_DATA].inject_response(packet)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            import pprint
+            _LOGGER.debug("injecting->{}".format(pprint.pformat(packet)))
+        await async_run_blocking(hass, hass.data[COMPONENT_DATA].inject_response, packet)
+
+
+async def async_aarlo_replay_packets(hass, call):
+    """Replay a packet dump, or a directory of them, into the event stream.
+
+    The packets are read as they are needed and fed to pyaarlo flat out or,
+    if `speed` is given, with their recorded gaps divided by it. Returns how
+    quickly they went through and how far the event loop fell behind.
+    """
+    from .replay import LoopLagProbe, async_iter_blocking, async_replay, iter_packet_files
+
+    path = hass.config.path(call.data["path"])
+    if not await hass.async_add_executor_job(hass.config.is_allowed_path, path):
+        raise HomeAssistantError(f"Can't read {path}, no access to path!")
+    if not await hass.async_add_executor_job(os.path.exists, path):
+        raise HomeAssistantError(f"{path} not found")
+
+    arlo = hass.data[COMPONENT_DATA]
+    packets = async_iter_blocking(iter_packet_files(path), partial(async_run_blocking, hass))
+
+    async def _inject(packet):
+        await async_run_blocking(hass, arlo.inject_response, packet)
+
+    probe = LoopLagProbe()
+    probe.start()
+    try:
+        result = await async_replay(packets, _inject, call.data.get("speed"))
+    finally:
+        await probe.stop()
+
+    report = {
+        "packets": result["packets"],
+        "elapsed": round(result["elapsed"], 3),
+        "packets_per_s": round(result["rate"], 1) if result["rate"] else None,
+        "max_late": round(result["max_late"], 3),
+        "loop_lag_max": round(probe.max_lag, 3),
+        "loop_lag_mean": round(probe.total_lag / probe.samples, 4) if probe.samples else None,
+    }
+    _LOGGER.info(f"replayed {path}: {report}")
+    return report
@@ -0,0 +1,134 @@
+"""
+Count captures as they happen.
+
+The `captured_today` and `recent_activity` sensors come from pyaarlo's copy
+of the library and only move when it reloads. These counts are kept from
+the capture callbacks instead:
+
+- each camera, and the site as a whole, has fixed size rings of counts; 60
+  one minute slots, 24 one hour slots and 7 one day slots, and a 24 hour
+  ring for each object type seen
+- a slot remembers which minute, hour or day it's counting so stale slots
+  are cleared as they are reused, there's no timer
+- recording a capture touches one slot per ring and reading a total adds up
+  one ring, both take the same time however busy the camera is
+- a video is only counted once, pyaarlo tells us about the last capture
+  every time it starts
+- `on_capture` is told about each capture counted, the sensors don't poll
+"""
+
+import threading
+import time
+
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# The whole site is counted under this id.
+SITE = "site"
+
+
+class _Ring(object):
+    """Counts for the last `slots` periods of `width` seconds."""
+
+    __slots__ = ("_width", "_counts", "_periods")
+
+    def __init__(self, slots, width):
+        self._width = width
+        self._counts = [0] * slots
+        self._periods = [None] * slots
+
+    def add(self, at, now):
+        period = int(at // self._width)
+        if period <= int(now // self._width) - len(self._counts):
+            return
+        slot = period % len(self._counts)
+        if self._periods[slot] != period:
+            self._periods[slot] = period
+            self._counts[slot] = 0
+        self._counts[slot] += 1
+
+    def total(self, now):
+        oldest = int(now // self._width) - len(self._counts)
+        return sum(
+            count for count, period in zip(self._counts, self._periods)
+            if period is not None and period > oldest
+        )
+
+
+class _Counts(object):
+    """The rings for one camera."""
+
+    __slots__ = ("minutes", "hours", "days", "object_types", "last_video")
+
+    def __init__(self):
+        self.minutes = _Ring(60, MINUTE)
+        self.hours = _Ring(24, HOUR)
+        self.days = _Ring(7, DAY)
+        self.object_types = {}
+        self.last_video = None
+
+    def add(self, at, now, object_type):
+        self.minutes.add(at, now)
+        self.hours.add(at, now)
+        self.days.add(at, now)
+        if object_type:
+            ring = self.object_types.get(object_type)
+            if ring is None:
+                ring = self.object_types[object_type] = _Ring(24, HOUR)
+            ring.add(at, now)
+
+
+class ArloActivityStats(object):
+    """Rolling capture counts for each camera and the whole site."""
+
+    def __init__(self, clock=time.time):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._cameras = {SITE: _Counts()}
+
+        # Called, with the camera's device id, after each capture is counted.
+        self.on_capture = None
+
+    def capture(self, device_id, object_type=None, video_id=None, at=None):
+        """Count a capture; returns False if the video was already counted."""
+        now = self._clock()
+        at = now if at is None else min(at, now)
+        with self._lock:
+            counts = self._cameras.get(device_id)
+            if counts is None:
+                counts = self._cameras[device_id] = _Counts()
+            if video_id is not None:
+                if video_id == counts.last_video:
+                    return False
+                counts.last_video = video_id
+            counts.add(at, now, object_type)
+            self._cameras[SITE].add(at, now, object_type)
+        if self.on_capture is not None:
+            self.on_capture(device_id)
+        return True
+
+    def summary(self, device_id=SITE):
+        """Captures in the last hour, day and week and by object type today."""
+        now = self._clock()
+        with self._lock:
+            counts = self._cameras.get(device_id)
+            if counts is None:
+                return {"last_hour": 0, "last_day": 0, "last_week": 0, "object_types": {}}
+            object_types = {
+                object_type: ring.total(now) for object_type, ring in counts.object_types.items()
+            }
+            return {
+                "last_hour": counts.minutes.total(now),
+                "last_day": counts.hours.total(now),
+                "last_week": counts.days.total(now),
+                "object_types": {
+                    object_type: total for object_type, total in sorted(object_types.items()) if total
+                },
+            }
+
+    def as_dict(self):
+        with self._lock:
+            device_ids = list(self._cameras)
+        return {device_id: self.summary(device_id) for device_id in device_ids}
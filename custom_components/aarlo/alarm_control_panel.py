@@ -6,6 +6,7 @@ https://github.com/twrecked/hass-aarlo/blob/master/README.md
 https://home-assistant.io/components/alarm_control_panel.arlo
 """
 
+import asyncio
 import logging
 import re
 from collections.abc import Callable
@@ -42,8 +43,19 @@ from pyaarlo.constant import (
     SIREN_STATE_KEY
 )
 
+from .commands import PRIORITY_SAFETY
 from .const import *
-from .utils import get_entity_from_domain
+from .utils import (
+    add_entity_to_registry,
+    async_run_command,
+    async_service_handler,
+    get_circuit_state,
+    get_entity_from_domain,
+    lean_attributes,
+    remove_entity_from_registry,
+    timed_websocket,
+    trim_attributes
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -129,23 +141,13 @@ async def async_setup_entry(
     async_add_entities(locations)
 
     # Component services
-    def service_callback(call):
-        """Call aarlo service handler."""
-        _LOGGER.debug(f"{call.service} service called")
-        if call.service == SERVICE_MODE:
-            alarm_mode_service(hass, call)
-
-    async def async_service_callback(call):
-        # pass off to background thread
-        await hass.async_add_executor_job(service_callback, call)
-
     if not hasattr(hass.data[COMPONENT_SERVICES], ALARM_DOMAIN):
         _LOGGER.debug("installing handlers")
         hass.data[COMPONENT_SERVICES][ALARM_DOMAIN] = "installed"
         hass.services.async_register(
             COMPONENT_DOMAIN,
             SERVICE_MODE,
-            async_service_callback,
+            async_service_handler(hass, async_alarm_mode_service),
             schema=SERVICE_MODE_SCHEMA,
         )
 
@@ -178,33 +180,10 @@ def _code_validate(code, code_to_check, state):
     return True
 
 
-def _get_base_from_entity_id(hass, entity_id):
-    component = hass.data.get(ALARM_DOMAIN)
-    if component is None:
-        raise HomeAssistantError("base component not set up")
-
-    location = component.get_entity(entity_id)
-    if location is None:
-        raise HomeAssistantError("base not found")
-
-    return location
-
-
-def _get_location_from_entity_id(hass, entity_id):
-    component = hass.data.get(ALARM_DOMAIN)
-    if component is None:
-        raise HomeAssistantError("location component not set up")
-
-    location = component.get_entity(entity_id)
-    if location is None:
-        raise HomeAssistantError("location not found")
-
-    return location
-
-
 class ArloBaseStation(AlarmControlPanelEntity):
     """Representation of an Arlo Alarm Control Panel."""
 
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES | frozenset({"siren"})
     _timer: Callable[[], None] | None = None
 
     def __init__(self, device, aarlo_config, config):
@@ -222,6 +201,8 @@ class ArloBaseStation(AlarmControlPanelEntity):
         self._timer = None
         _LOGGER.debug(f"alarm-code={self._code}")
 
+        self._lean_attributes = lean_attributes(aarlo_config)
+
         self._attr_name = device.name
         self._attr_unique_id = device.entity_id
         if aarlo_config.get(CONF_ADD_AARLO_PREFIX, True):
@@ -261,9 +242,9 @@ class ArloBaseStation(AlarmControlPanelEntity):
     async def _async_stop_trigger(self, *_args: Any) -> None:
         if self._trigger_till is not None:
             _LOGGER.info(f"{self._attr_name}: untriggered")
-            self.alarm_clear()
+            await async_run_command(self.hass, self._base.device_id, PRIORITY_SAFETY, self.alarm_clear)
             self._trigger_till = None
-            self.async_schedule_update_ha_state()
+            self.async_write_ha_state()
 
     async def async_added_to_hass(self):
         """Register callbacks."""
@@ -275,6 +256,10 @@ class ArloBaseStation(AlarmControlPanelEntity):
 
         self._attr_alarm_state = self._get_state_from_ha(self._base.attribute(MODE_KEY, STATE_ALARM_ARLO_ARMED))
         self._base.add_attr_callback(MODE_KEY, update_state)
+        add_entity_to_registry(self.hass, self, self._base)
+
+    async def async_will_remove_from_hass(self):
+        remove_entity_from_registry(self.hass, self)
 
     @property
     def alarm_state(self) -> AlarmControlPanelState | None:
@@ -283,31 +268,33 @@ class ArloBaseStation(AlarmControlPanelEntity):
             return AlarmControlPanelState.TRIGGERED
         return self._attr_alarm_state
 
-    def alarm_disarm(self, code=None):
+    async def async_alarm_disarm(self, code=None):
         if self._attr_code_disarm_required and not _code_validate(self._code, code, "disarming"):
             return
-        self.set_mode_in_ha(self._disarmed_mode_name)
+        await self.async_set_mode_in_ha(self._disarmed_mode_name)
 
-    def alarm_arm_away(self, code=None):
+    async def async_alarm_arm_away(self, code=None):
         if self._attr_code_arm_required and not _code_validate(self._code, code, "arming away"):
             return
-        self.set_mode_in_ha(self._away_mode_name)
+        await self.async_set_mode_in_ha(self._away_mode_name)
 
-    def alarm_arm_home(self, code=None):
+    async def async_alarm_arm_home(self, code=None):
         if self._attr_code_arm_required and not _code_validate(self._code, code, "arming home"):
             return
-        self.set_mode_in_ha(self._home_mode_name)
+        await self.async_set_mode_in_ha(self._home_mode_name)
 
-    def alarm_arm_night(self, code=None):
+    async def async_alarm_arm_night(self, code=None):
         if self._attr_code_arm_required and not _code_validate(self._code, code, "arming night"):
             return
-        self.set_mode_in_ha(self._night_mode_name)
+        await self.async_set_mode_in_ha(self._night_mode_name)
 
-    def alarm_trigger(self, code=None):
+    async def async_alarm_trigger(self, code=None):
         if self._trigger_till is None:
             _LOGGER.info(f"{self._attr_name}: triggered")
             if int(self._alarm_volume) != 0:
-                self._base.siren_on(
+                await async_run_command(
+                    self.hass, self._base.device_id, PRIORITY_SAFETY,
+                    self._base.siren_on,
                     duration=self._trigger_time.total_seconds(),
                     volume=self._alarm_volume,
                 )
@@ -315,7 +302,7 @@ class ArloBaseStation(AlarmControlPanelEntity):
             self._timer = async_track_point_in_time(
                 self.hass, HassJob(self._async_stop_trigger), self._trigger_till
             )
-            self.schedule_update_ha_state()
+            self.async_write_ha_state()
 
     def alarm_clear(self):
         self._trigger_till = None
@@ -336,6 +323,9 @@ class ArloBaseStation(AlarmControlPanelEntity):
         _LOGGER.debug(f"{self._attr_name} set mode to {mode}")
         self._base.mode = mode
 
+    async def async_set_mode_in_ha(self, mode):
+        await async_run_command(self.hass, self._base.device_id, PRIORITY_SAFETY, self.set_mode_in_ha, mode)
+
     def siren_on(self, duration=30, volume=10):
         if self._base.has_capability(SIREN_STATE_KEY):
             _LOGGER.debug(f"{self._attr_name} siren on {volume}/{duration}")
@@ -351,15 +341,17 @@ class ArloBaseStation(AlarmControlPanelEntity):
         return False
 
     async def async_siren_on(self, duration, volume):
-        return await self.hass.async_add_executor_job(self.siren_on, duration, volume)
+        return await async_run_command(
+            self.hass, self._base.device_id, PRIORITY_SAFETY, self.siren_on, duration, volume
+        )
 
     async def async_siren_off(self):
-        return await self.hass.async_add_executor_job(self.siren_off)
+        return await async_run_command(self.hass, self._base.device_id, PRIORITY_SAFETY, self.siren_off)
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        return {
+        return trim_attributes({
             ATTR_ATTRIBUTION: COMPONENT_ATTRIBUTION,
             "name": self._attr_name,
             "device_brand": COMPONENT_BRAND,
@@ -367,18 +359,22 @@ class ArloBaseStation(AlarmControlPanelEntity):
             "device_model": self._base.model_id,
             "on_schedule": self._base.on_schedule,
             "siren": self._base.has_capability(SIREN_STATE_KEY),
-        }
+            ATTR_CIRCUIT_BREAKER: get_circuit_state(self.hass, self._base.device_id),
+        }, self._lean_attributes)
 
 
 class ArloLocation(AlarmControlPanelEntity):
     """Representation of an Arlo Alarm Control Panel."""
 
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES
+
     def __init__(self, location, aarlo_config, config):
         """Initialize the alarm control panel."""
 
         self._location = location
 
         self._code = config.get(CONF_CODE)
+        self._lean_attributes = lean_attributes(aarlo_config)
 
         self._attr_name = location.name
         self._attr_unique_id = location.entity_id
@@ -419,28 +415,32 @@ class ArloLocation(AlarmControlPanelEntity):
 
         self._attr_alarm_state = self._get_state_from_ha(self._location.attribute(MODE_KEY, "Stand By"))
         self._location.add_attr_callback(MODE_KEY, update_state)
+        add_entity_to_registry(self.hass, self, self._location)
+
+    async def async_will_remove_from_hass(self):
+        remove_entity_from_registry(self.hass, self)
 
     @property
     def alarm_state(self) -> AlarmControlPanelState | None:
         return self._attr_alarm_state
 
-    def alarm_disarm(self, code=None):
+    async def async_alarm_disarm(self, code=None):
         _LOGGER.debug(f"Location {self._attr_name} disarm.  Code: {code}")
         if self._attr_code_disarm_required and not _code_validate(self._code, code, "disarming"):
             return
-        self._location.stand_by()
+        await async_run_command(self.hass, self._location.device_id, PRIORITY_SAFETY, self._location.stand_by)
 
-    def alarm_arm_away(self, code=None):
+    async def async_alarm_arm_away(self, code=None):
         _LOGGER.debug(f"Location {self._attr_name} arm away.  Code: {code}")
         if self._attr_code_arm_required and not _code_validate(self._code, code, "arming away"):
             return
-        self._location.arm_away()
+        await async_run_command(self.hass, self._location.device_id, PRIORITY_SAFETY, self._location.arm_away)
 
-    def alarm_arm_home(self, code=None):
+    async def async_alarm_arm_home(self, code=None):
         _LOGGER.debug(f"Location {self._attr_name} arm home.  Code: {code}")
         if self._attr_code_arm_required and not _code_validate(self._code, code, "arming home"):
             return
-        self._location.arm_home()
+        await async_run_command(self.hass, self._location.device_id, PRIORITY_SAFETY, self._location.arm_home)
 
     def alarm_trigger(self, code=None):
         pass
@@ -459,6 +459,9 @@ class ArloLocation(AlarmControlPanelEntity):
         _LOGGER.debug(f"{self._attr_name} set mode to {mode}")
         self._location.mode = mode
 
+    async def async_set_mode_in_ha(self, mode):
+        await async_run_command(self.hass, self._location.device_id, PRIORITY_SAFETY, self.set_mode_in_ha, mode)
+
     def siren_on(self, duration=30, volume=10):
         pass
 
@@ -474,16 +477,17 @@ class ArloLocation(AlarmControlPanelEntity):
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        return {
+        return trim_attributes({
             ATTR_ATTRIBUTION: COMPONENT_ATTRIBUTION,
             "name": self._attr_name,
             "device_brand": COMPONENT_BRAND,
-        }
+        }, self._lean_attributes)
 
 
 @websocket_api.async_response
+@timed_websocket
 async def websocket_siren_on(hass, connection, msg):
-    base = _get_base_from_entity_id(hass, msg["entity_id"])
+    base = get_entity_from_domain(hass, ALARM_DOMAIN, msg["entity_id"])
     _LOGGER.debug(f"start siren for {msg['entity_id']}")
 
     await base.async_siren_on(duration=msg["duration"], volume=msg["volume"])
@@ -491,8 +495,9 @@ async def websocket_siren_on(hass, connection, msg):
 
 
 @websocket_api.async_response
+@timed_websocket
 async def websocket_siren_off(hass, connection, msg):
-    base = _get_base_from_entity_id(hass, msg["entity_id"])
+    base = get_entity_from_domain(hass, ALARM_DOMAIN, msg["entity_id"])
     _LOGGER.debug(f"stop siren for {msg['entity_id']}")
 
     await base.async_siren_off()
@@ -514,11 +519,14 @@ async def aarlo_siren_off_service_handler(base, _service):
     base.siren_off()
 
 
-def alarm_mode_service(hass, call):
-    for entity_id in call.data["entity_id"]:
+async def async_alarm_mode_service(hass, call):
+    mode = call.data["mode"]
+
+    async def _set_mode(entity_id):
         try:
-            mode = call.data["mode"]
-            get_entity_from_domain(hass, ALARM_DOMAIN, entity_id).set_mode_in_ha(mode)
+            await get_entity_from_domain(hass, ALARM_DOMAIN, entity_id).async_set_mode_in_ha(mode)
             _LOGGER.debug(f"{entity_id} setting mode to {mode}")
         except HomeAssistantError:
             _LOGGER.warning(f"{entity_id} is not an aarlo alarm device")
+
+    await asyncio.gather(*[_set_mode(entity_id) for entity_id in call.data["entity_id"]])
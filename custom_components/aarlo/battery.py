@@ -0,0 +1,179 @@
+"""
+Estimate how fast each device's battery is draining.
+
+Battery levels are whole percentages that wobble with temperature and
+activity so a straight line through them is easily thrown. For each device
+the last `window` readings are kept and the drain rate is their Theil-Sen
+slope, the median of the slopes between every pair of readings, which
+shrugs off the odd bad reading.
+
+The fit is kept up incrementally; each reading keeps the slopes back to the
+readings before it and all the slopes are kept sorted, so a reading costs
+`window` insertions and removals and the median is a lookup.
+
+- a reading is only kept if the level changed or `gap` seconds have passed
+- charging, or a level that jumps up, a battery swap say, starts again
+- there's no estimate until the readings span `min_span` seconds
+"""
+
+import bisect
+import collections
+import threading
+import time
+
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+DEFAULT_WINDOW = 48
+DEFAULT_GAP = HOUR
+DEFAULT_MIN_SPAN = 6 * HOUR
+DEFAULT_MIN_READINGS = 3
+
+
+class _Fit(object):
+    """The readings for one device and the slopes between them."""
+
+    __slots__ = ("readings", "slopes", "charging")
+
+    def __init__(self):
+        # (at, level, slopes back to the earlier readings, oldest first)
+        self.readings = collections.deque()
+        self.slopes = []
+        self.charging = False
+
+    def add(self, at, level, window):
+        if len(self.readings) >= window:
+            self._drop_oldest()
+        back = collections.deque()
+        for earlier_at, earlier_level, _back in self.readings:
+            slope = (level - earlier_level) / (at - earlier_at)
+            back.append(slope)
+            bisect.insort(self.slopes, slope)
+        self.readings.append((at, level, back))
+
+    def _drop_oldest(self):
+        self.readings.popleft()
+        for _at, _level, back in self.readings:
+            slope = back.popleft()
+            del self.slopes[bisect.bisect_left(self.slopes, slope)]
+
+    def clear(self):
+        self.readings.clear()
+        self.slopes.clear()
+
+    def median(self):
+        slopes, middle = self.slopes, len(self.slopes) // 2
+        if len(slopes) % 2:
+            return slopes[middle]
+        return (slopes[middle - 1] + slopes[middle]) / 2
+
+
+class ArloBatteryEstimator(object):
+    """Battery drain rate and time to empty for each device."""
+
+    def __init__(self, window=DEFAULT_WINDOW, gap=DEFAULT_GAP, min_span=DEFAULT_MIN_SPAN,
+                 min_readings=DEFAULT_MIN_READINGS, clock=time.time):
+        self._lock = threading.Lock()
+        self._window = max(2, window)
+        self._gap = gap
+        self._min_span = min_span
+        self._min_readings = max(2, min_readings)
+        self._clock = clock
+        self._fits = {}
+
+        # Called, with no arguments, whenever there is something new to save.
+        self.on_change = None
+        # Called, with the device id, whenever a device's estimate or charging changes.
+        self.on_update = None
+
+    def reading(self, device_id, level, is_charging=False, at=None):
+        """Add a battery reading; returns True if it was kept."""
+        if level is None:
+            return False
+        at = self._clock() if at is None else at
+        with self._lock:
+            fit = self._fits.get(device_id)
+            if fit is None:
+                fit = self._fits[device_id] = _Fit()
+            kept = self._add(fit, at, level, is_charging)
+            changed = kept or (is_charging and not fit.charging)
+            updated = kept or is_charging != fit.charging
+            fit.charging = is_charging
+        if changed and self.on_change is not None:
+            self.on_change()
+        if updated and self.on_update is not None:
+            self.on_update(device_id)
+        return kept
+
+    def _add(self, fit, at, level, is_charging):
+        if is_charging:
+            fit.clear()
+            return False
+        if fit.readings:
+            last_at, last_level, _back = fit.readings[-1]
+            if level > last_level:
+                fit.clear()
+            elif at <= last_at or (level == last_level and at - last_at < self._gap):
+                return False
+        fit.add(at, level, self._window)
+        return True
+
+    def _estimate(self, fit):
+        if fit.charging or len(fit.readings) < self._min_readings:
+            return None
+        if fit.readings[-1][0] - fit.readings[0][0] < self._min_span:
+            return None
+        return fit.median()
+
+    def estimate(self, device_id):
+        """Drain in %/day and days to empty, either can be None."""
+        with self._lock:
+            fit = self._fits.get(device_id)
+            slope = self._estimate(fit) if fit is not None else None
+            level = fit.readings[-1][1] if slope is not None else None
+        if slope is None:
+            return {"drain_per_day": None, "days_to_empty": None}
+        drain = -slope * DAY
+        return {
+            "drain_per_day": round(drain, 2),
+            "days_to_empty": round(level / drain, 1) if drain > 0 else None,
+        }
+
+    def is_charging(self, device_id):
+        with self._lock:
+            fit = self._fits.get(device_id)
+            return fit is not None and fit.charging
+
+    def as_dict(self):
+        """Readings and what they add up to; `load` reads this back."""
+        with self._lock:
+            device_ids = list(self._fits)
+            readings = {
+                device_id: [[at, level] for at, level, _back in self._fits[device_id].readings]
+                for device_id in device_ids
+            }
+            charging = {device_id: self._fits[device_id].charging for device_id in device_ids}
+        return {
+            device_id: {
+                "readings": readings[device_id],
+                "charging": charging[device_id],
+                **self.estimate(device_id),
+            }
+            for device_id in device_ids
+        }
+
+    def load(self, data):
+        """Pick up readings saved by `as_dict`, ignoring anything odd."""
+        with self._lock:
+            for device_id, saved in (data or {}).items():
+                fit = self._fits.setdefault(device_id, _Fit())
+                for reading in saved.get("readings", []):
+                    try:
+                        at, level = (float(value) for value in reading)
+                    except (TypeError, ValueError):
+                        continue
+                    if fit.readings and (at <= fit.readings[-1][0] or level > fit.readings[-1][1]):
+                        continue
+                    fit.add(at, level, self._window)
+        return self
@@ -42,10 +42,20 @@ from . import (
     COMPONENT_CONFIG,
     COMPONENT_DATA,
     COMPONENT_DOMAIN,
-    CONF_ADD_AARLO_PREFIX
+    CONF_ADD_AARLO_PREFIX,
+    UNRECORDED_ATTRIBUTES
 )
 from homeassistant.util import slugify
 
+from .tracing import STAGE_CALLBACK
+from .utils import (
+    add_entity_to_registry,
+    lean_attributes,
+    remove_entity_from_registry,
+    trace_stage,
+    trim_attributes
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 DEPENDENCIES = [COMPONENT_DOMAIN]
@@ -154,12 +164,15 @@ async def async_setup_entry(
 class ArloBinarySensor(BinarySensorEntity):
     """An implementation of a Netgear Arlo IP sensor."""
 
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES
+
     def __init__(self, device, aarlo_config, sensor_type, sensor_value):
         """Initialize an Arlo sensor."""
 
         self._device = device
         self._sensor_type = sensor_type
         self._main_attrs = sensor_value["keys"]
+        self._lean_attributes = lean_attributes(aarlo_config)
 
         self._attr_name = f"{sensor_value['description']} {device.name}"
         self._attr_unique_id = slugify(f"{sensor_value['description']}_{device.entity_id}")
@@ -190,6 +203,7 @@ class ArloBinarySensor(BinarySensorEntity):
 
         def update_state(_device, attr, value):
             _LOGGER.debug("callback:" + self._attr_name + ":" + attr + ":" + str(value)[:80])
+            trace_stage(self.hass, self._device.device_id, attr, STAGE_CALLBACK)
             if attr in self._main_attrs:
                 self._attr_is_on = self._map_value(attr, value)
             self.schedule_update_ha_state()
@@ -201,6 +215,10 @@ class ArloBinarySensor(BinarySensorEntity):
             self._device.add_attr_callback(main_attr, update_state)
         for other_attr in self._other_attrs:
             self._device.add_attr_callback(other_attr, update_state)
+        add_entity_to_registry(self.hass, self, self._device)
+
+    async def async_will_remove_from_hass(self):
+        remove_entity_from_registry(self.hass, self)
 
     @property
     def extra_state_attributes(self):
@@ -218,5 +236,5 @@ class ArloBinarySensor(BinarySensorEntity):
                 "chimes_silenced": self._device.chimes_are_silenced,
                 "calls_silenced": self._device.calls_are_silenced
             })
-        return attrs
+        return trim_attributes(attrs, self._lean_attributes)
 
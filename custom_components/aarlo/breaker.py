@@ -0,0 +1,178 @@
+"""
+Per device circuit breakers.
+
+When a camera is offline, or too cold to run, every snapshot, stream or siren
+request still goes to Arlo and waits out its full timeout. The breaker stops
+that:
+
+- `closed`; commands go through as normal
+- `open`; commands fail straight away, either because the device told us it
+  is unavailable or because too many commands failed in a row
+- `half_open`; the backoff has passed and one command is let through to see
+  if the device is back
+
+A failed probe doubles the backoff, up to `MAX_BACKOFF`. Any activity from the
+device lets the next command probe straight away.
+"""
+
+import threading
+import time
+
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Connection states that mean the device can't answer.
+OFFLINE_STATES = ("unavailable", "thermalShutdownCold")
+
+DEFAULT_FAILURES = 3
+DEFAULT_BACKOFF = 30
+MAX_BACKOFF = 600
+
+
+class ArloCircuitOpen(RuntimeError):
+    """The device's breaker is open."""
+
+
+class ArloCircuitBreaker(object):
+    """Breaker for one device."""
+
+    def __init__(self, failures=DEFAULT_FAILURES, backoff=DEFAULT_BACKOFF, clock=time.monotonic):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._max_failures = max(1, failures)
+        self._base_backoff = backoff
+        self._backoff = backoff
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._retry_at = 0.0
+        self._reason = None
+        self._offline = None
+
+    def allow(self):
+        """Can a command go to the device now?
+
+        Moves an open breaker to half open once the backoff has passed.
+        """
+        with self._lock:
+            if self._offline is not None:
+                return False
+            if self._state == STATE_CLOSED:
+                return True
+            now = self._clock()
+            if now < self._retry_at:
+                return False
+            # Let one probe through. If it never reports back we allow
+            # another after the backoff.
+            self._state = STATE_HALF_OPEN
+            self._retry_at = now + self._backoff
+            return True
+
+    def success(self):
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._backoff = self._base_backoff
+            self._reason = None
+
+    def failure(self, reason):
+        with self._lock:
+            self._failures += 1
+            self._reason = reason
+            if self._state == STATE_HALF_OPEN:
+                self._backoff = min(self._backoff * 2, MAX_BACKOFF)
+                self._trip()
+            elif self._state == STATE_CLOSED and self._failures >= self._max_failures:
+                self._trip()
+
+    def _trip(self):
+        self._state = STATE_OPEN
+        self._trips += 1
+        self._retry_at = self._clock() + self._backoff
+
+    def connection(self, value):
+        """The device reported a new connection state."""
+        with self._lock:
+            if value in OFFLINE_STATES:
+                if self._offline is None:
+                    self._trips += 1
+                self._offline = value
+                return
+            self._offline = None
+            if self._state != STATE_CLOSED:
+                self._retry_at = self._clock()
+
+    def activity(self):
+        """The device did something, so it is worth trying again."""
+        with self._lock:
+            if self._state != STATE_CLOSED:
+                self._retry_at = min(self._retry_at, self._clock())
+
+    @property
+    def state(self):
+        with self._lock:
+            return STATE_OPEN if self._offline is not None else self._state
+
+    @property
+    def reason(self):
+        with self._lock:
+            return self._offline if self._offline is not None else self._reason
+
+    def retry_in(self):
+        with self._lock:
+            if self._offline is not None or self._state == STATE_CLOSED:
+                return None
+            return max(0.0, self._retry_at - self._clock())
+
+    def as_dict(self):
+        retry_in = self.retry_in()
+        with self._lock:
+            return {
+                "state": STATE_OPEN if self._offline is not None else self._state,
+                "reason": self._offline if self._offline is not None else self._reason,
+                "failures": self._failures,
+                "trips": self._trips,
+                "backoff": self._backoff,
+                "retry_in": round(retry_in, 1) if retry_in is not None else None,
+            }
+
+
+class ArloCircuitBreakers(object):
+    """The breakers for all devices, created as needed."""
+
+    def __init__(self, failures=DEFAULT_FAILURES, backoff=DEFAULT_BACKOFF, clock=time.monotonic):
+        self._lock = threading.Lock()
+        self._failures = failures
+        self._backoff = backoff
+        self._clock = clock
+        self._breakers = {}
+
+    def get(self, device_id):
+        with self._lock:
+            breaker = self._breakers.get(device_id)
+            if breaker is None:
+                breaker = self._breakers[device_id] = ArloCircuitBreaker(
+                    self._failures, self._backoff, self._clock
+                )
+            return breaker
+
+    def check(self, device_id):
+        """Raise `ArloCircuitOpen` if commands can't go to `device_id`."""
+        breaker = self.get(device_id)
+        if not breaker.allow():
+            retry_in = breaker.retry_in()
+            raise ArloCircuitOpen(
+                f"{device_id} is not responding ({breaker.reason})"
+                + (f", retrying in {retry_in:.0f}s" if retry_in is not None else "")
+            )
+        return breaker
+
+    def state(self, device_id):
+        return self.get(device_id).state
+
+    def as_dict(self):
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {device_id: breaker.as_dict() for device_id, breaker in sorted(breakers)}
@@ -8,14 +8,15 @@ https://www.home-assistant.io/integrations/camera
 from __future__ import annotations
 
 import asyncio
-import base64
 import logging
 import voluptuous as vol
 from collections.abc import Callable
-from haffmpeg.camera import CameraMjpeg
+from datetime import datetime, timezone
+from functools import partial
 
 import homeassistant.helpers.config_validation as cv
 from homeassistant.components import websocket_api
+from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR_DOMAIN
 from homeassistant.components.camera.const import (
     CameraState
 )
@@ -26,22 +27,27 @@ from homeassistant.components.camera import (
     Camera,
     CameraEntityFeature,
     DOMAIN as CAMERA_DOMAIN,
+    Image,
     SERVICE_RECORD,
     StreamType
 )
-from homeassistant.components.ffmpeg import DATA_FFMPEG
+from homeassistant.components.camera.img_util import scale_jpeg_camera_image
 from homeassistant.const import (
     ATTR_ATTRIBUTION,
     ATTR_BATTERY_LEVEL,
     ATTR_ENTITY_ID,
     CONF_FILENAME,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_aiohttp_proxy_stream
 from homeassistant.helpers.config_validation import PLATFORM_SCHEMA
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_call_later
+import homeassistant.helpers.entity_registry as er
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
 
 import pyaarlo
 from pyaarlo.constant import (
@@ -61,19 +67,59 @@ from pyaarlo.constant import (
 from .const import (
     ATTR_BATTERY_TECH,
     ATTR_CHARGER_TYPE,
+    ATTR_CIRCUIT_BREAKER,
+    ATTR_NEXT_REFRESH,
     COMPONENT_ATTRIBUTION,
     COMPONENT_BRAND,
     COMPONENT_CONFIG,
     COMPONENT_DATA,
     COMPONENT_DOMAIN,
+    COMPONENT_HISTORY,
+    COMPONENT_IMAGES,
+    COMPONENT_REFRESH,
     COMPONENT_SERVICES,
+    COMPONENT_SNAPSHOTS,
     CONF_ADD_AARLO_PREFIX,
+    CONF_FFMPEG_ARGUMENTS,
+    CONF_REFRESH_INTERVAL,
     CONF_SAVE_UPDATES_TO,
+    CONF_SNAPSHOT_TIMEOUT,
     CONF_STREAM_SNAPSHOT,
+    CONF_STREAM_SNAPSHOT_STOP,
+    REFRESH_INTERVAL,
+    SNAPSHOT_TIMEOUT,
     STATE_ALARM_ARLO_ARMED,
     STATE_ALARM_ARLO_DISARMED,
+    UNRECORDED_ATTRIBUTES,
+)
+from .cfg import PyaarloCfg, camera_overrides
+from .commands import PRIORITY_CONTROL, PRIORITY_MEDIA, PRIORITY_SAFETY
+from .image_cache import ArloImageStore, image_bucket
+from .refresh import ArloRefreshScheduler
+from .snapshots import (
+    METHOD_FULL_FRAME,
+    METHOD_STREAM,
+    METHOD_STREAM_THUMBNAIL,
+    THUMBNAIL_STREAM_STOP,
+    ArloSnapshotStrategy,
+)
+from .tracing import STAGE_CALLBACK, STAGE_EVENT
+from .utils import (
+    add_entity_to_registry,
+    async_run_blocking,
+    async_run_command,
+    async_service_handler,
+    async_track_outcome,
+    get_circuit_state,
+    get_device_from_domain,
+    get_entity_from_domain,
+    lean_attributes,
+    no_result,
+    remove_entity_from_registry,
+    timed_websocket,
+    trace_stage,
+    trim_attributes
 )
-from .utils import get_entity_from_domain
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -99,7 +145,6 @@ ATTR_DURATION = "duration"
 ATTR_TIME_ZONE = "time_zone"
 ATTR_STATE = "state"
 
-CONF_FFMPEG_ARGUMENTS = "ffmpeg_arguments"
 DEFAULT_FFMPEG_ARGUMENTS = "-pred 1 -q:v 2 -r 5"
 
 POWERSAVE_MODE_MAPPING = {1: "best_battery_life", 2: "optimized", 3: "best_video"}
@@ -141,6 +186,7 @@ WS_TYPE_VIDEO_DATA = "aarlo_video_data"
 WS_TYPE_STOP_ACTIVITY = "aarlo_stop_activity"
 WS_TYPE_SIREN_ON = "aarlo_camera_siren_on"
 WS_TYPE_SIREN_OFF = "aarlo_camera_siren_off"
+WS_TYPE_EVENT_HISTORY = "aarlo_event_history"
 SCHEMA_WS_VIDEO_URL = websocket_api.BASE_COMMAND_MESSAGE_SCHEMA.extend({
     vol.Required("type"): WS_TYPE_VIDEO_URL,
     vol.Required("entity_id"): cv.entity_id,
@@ -180,6 +226,15 @@ SCHEMA_WS_SIREN_ON = websocket_api.BASE_COMMAND_MESSAGE_SCHEMA.extend({
 SCHEMA_WS_SIREN_OFF = websocket_api.BASE_COMMAND_MESSAGE_SCHEMA.extend({
     vol.Required("type"): WS_TYPE_SIREN_OFF, vol.Required("entity_id"): cv.entity_id
 })
+SCHEMA_WS_EVENT_HISTORY = websocket_api.BASE_COMMAND_MESSAGE_SCHEMA.extend({
+    vol.Required("type"): WS_TYPE_EVENT_HISTORY,
+    vol.Optional("entity_id"): cv.entity_ids,
+    vol.Optional("start"): cv.datetime,
+    vol.Optional("end"): cv.datetime,
+    vol.Optional("event_types"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("object_type"): cv.string,
+    vol.Optional("at_most", default=100): vol.All(cv.positive_int, vol.Range(max=1000)),
+})
 
 
 async def async_setup_entry(
@@ -202,62 +257,43 @@ async def async_setup_entry(
     async_add_entities(cameras)
 
     # Component services
-    def service_callback(call):
-        """Call aarlo service handler."""
-        _LOGGER.info("{} service called".format(call.service))
-        if call.service == SERVICE_REQUEST_SNAPSHOT:
-            camera_snapshot_service(hass, call)
-        if call.service == SERVICE_REQUEST_SNAPSHOT_TO_FILE:
-            camera_snapshot_to_file_service(hass, call)
-        if call.service == SERVICE_REQUEST_VIDEO_TO_FILE:
-            camera_video_to_file_service(hass, call)
-        if call.service == SERVICE_STOP_ACTIVITY:
-            camera_stop_activity_service(hass, call)
-        if call.service == SERVICE_RECORD_START:
-            camera_start_recording_service(hass, call)
-        if call.service == SERVICE_RECORD_STOP:
-            camera_stop_recording_service(hass, call)
-
-    async def async_service_callback(call):
-        await hass.async_add_executor_job(service_callback, call)
-
     if not hasattr(hass.data[COMPONENT_SERVICES], CAMERA_DOMAIN):
         _LOGGER.info("installing handlers")
         hass.data[COMPONENT_SERVICES][CAMERA_DOMAIN] = "installed"
         hass.services.async_register(
             COMPONENT_DOMAIN,
             SERVICE_REQUEST_SNAPSHOT,
-            async_service_callback,
+            async_service_handler(hass, async_camera_snapshot_service),
             schema=CAMERA_SERVICE_SCHEMA,
         )
         hass.services.async_register(
             COMPONENT_DOMAIN,
             SERVICE_REQUEST_SNAPSHOT_TO_FILE,
-            async_service_callback,
+            async_service_handler(hass, async_camera_snapshot_to_file_service),
             schema=CAMERA_SERVICE_SNAPSHOT,
         )
         hass.services.async_register(
             COMPONENT_DOMAIN,
             SERVICE_REQUEST_VIDEO_TO_FILE,
-            async_service_callback,
+            async_service_handler(hass, async_camera_video_to_file_service),
             schema=CAMERA_SERVICE_SNAPSHOT,
         )
         hass.services.async_register(
             COMPONENT_DOMAIN,
             SERVICE_STOP_ACTIVITY,
-            async_service_callback,
+            async_service_handler(hass, async_camera_stop_activity_service),
             schema=CAMERA_SERVICE_SCHEMA,
         )
         hass.services.async_register(
             COMPONENT_DOMAIN,
             SERVICE_RECORD_START,
-            async_service_callback,
+            async_service_handler(hass, async_camera_start_recording_service),
             schema=RECORD_START_SCHEMA,
         )
         hass.services.async_register(
             COMPONENT_DOMAIN,
             SERVICE_RECORD_STOP,
-            async_service_callback,
+            async_service_handler(hass, async_camera_stop_recording_service),
             schema=CAMERA_SERVICE_SCHEMA,
         )
 
@@ -283,6 +319,9 @@ async def async_setup_entry(
     websocket_api.async_register_command(
         hass, WS_TYPE_STOP_ACTIVITY, websocket_stop_activity, SCHEMA_WS_STOP_ACTIVITY
     )
+    websocket_api.async_register_command(
+        hass, WS_TYPE_EVENT_HISTORY, websocket_event_history, SCHEMA_WS_EVENT_HISTORY
+    )
     if cameras_with_siren:
         websocket_api.async_register_command(
             hass, WS_TYPE_SIREN_ON, websocket_siren_on, SCHEMA_WS_SIREN_ON
@@ -292,16 +331,39 @@ async def async_setup_entry(
         )
 
 
+def _registered_entity_id(hass, camera):
+    """The entity id Home Assistant gives a camera we don't name ourselves.
+
+    It's the one in the registry if the camera has been set up before,
+    otherwise one made from its name.
+    """
+    entity_id = er.async_get(hass).async_get_entity_id(CAMERA_DOMAIN, COMPONENT_DOMAIN, camera.entity_id)
+    return entity_id or f"{CAMERA_DOMAIN}.{slugify(camera.name)}"
+
+
 class ArloCam(Camera):
     """An implementation of a Netgear Arlo IP camera."""
 
+    # The media URLs change with every signed link and the rest either never
+    # change or flip back and forth; none of it is worth a history.
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES | frozenset({
+        ATTR_BATTERY_TECH, ATTR_CHARGER_TYPE, ATTR_IMAGE_SRC, ATTR_LAST_THUMBNAIL,
+        ATTR_LAST_VIDEO, ATTR_NEXT_REFRESH, ATTR_RECENT_ACTIVITY, ATTR_SIGNAL_STRENGTH,
+        ATTR_TIME_ZONE, ATTR_UNSEEN_VIDEOS, ATTR_WIRED, ATTR_WIRED_ONLY, "has_siren",
+    })
+
     _camera: pyaarlo.ArloCamera | None = None
     _state: str | None = None
     _recent: bool = False
     _last_image_source: str | None = None
     _ffmpeg_arguments: str = DEFAULT_FFMPEG_ARGUMENTS
-    _stream_snapshot: bool = False
-    _save_updates_to: str | None = None
+    _aarlo_config: dict | None = None
+    _overrides: dict | None = None
+    _device_overrides: dict | None = None
+    _cancel_snapshot_timeout: Callable[[], None] | None = None
+    _images: ArloImageStore | None = None
+    _snapshots: ArloSnapshotStrategy | None = None
+    _refresh: ArloRefreshScheduler | None = None
 
     def __init__(self, camera, aarlo_config, hass):
         """Initialize an Arlo camera."""
@@ -311,9 +373,13 @@ class ArloCam(Camera):
         self._state: None
         self._recent: False
         self._last_image_source = None
-        self._stream_snapshot = aarlo_config.get(CONF_STREAM_SNAPSHOT)
-        self._save_updates_to = aarlo_config.get(CONF_SAVE_UPDATES_TO)
-        self._ffmpeg = hass.data[DATA_FFMPEG]
+        # Read as we go, `save_updates_to` and `stream_snapshot` can change
+        # while we're running.
+        self._aarlo_config = aarlo_config
+        self._lean_attributes = lean_attributes(aarlo_config)
+        self._images = hass.data[COMPONENT_IMAGES]
+        self._snapshots = hass.data.get(COMPONENT_SNAPSHOTS)
+        self._refresh = hass.data.get(COMPONENT_REFRESH)
 
         self._attr_name = camera.name
         self._attr_unique_id = camera.entity_id
@@ -321,6 +387,16 @@ class ArloCam(Camera):
             self.entity_id = f"{CAMERA_DOMAIN}.{COMPONENT_DOMAIN}_{self._attr_unique_id}"
         _LOGGER.debug(f"camera-entity-id={self.entity_id}")
 
+        # Settings from the `cameras:` section of aarlo.yaml. The pyaarlo ones
+        # are handed to the camera, we keep the rest.
+        self._overrides = camera_overrides(
+            aarlo_config, self._attr_unique_id, self.entity_id or _registered_entity_id(hass, camera),
+            camera.device_id
+        )
+        self._ffmpeg_arguments = self._overrides.get(CONF_FFMPEG_ARGUMENTS, DEFAULT_FFMPEG_ARGUMENTS)
+        PyaarloCfg.override_device(camera, self._overrides)
+        self._device_overrides = self._overrides
+
         self._attr_brand = COMPONENT_BRAND
         # removed for issue #1019
         # self._attr_frontend_stream_type = StreamType.HLS
@@ -339,6 +415,7 @@ class ArloCam(Camera):
 
         def update_state(_device, attr, value):
             _LOGGER.debug(f"callback:{self._attr_name}:{attr}:{str(value)[:120]}")
+            trace_stage(self.hass, self._camera.device_id, attr, STAGE_CALLBACK)
 
             # set state
             if attr == ACTIVITY_STATE_KEY or attr == CONNECTION_KEY:
@@ -373,33 +450,43 @@ class ArloCam(Camera):
                     self._last_image_source is not None
                     and self._last_image_source != value
                 ):
+                    if self._snapshots is not None:
+                        self._snapshots.finished(self._camera.device_id, value)
                     if value.startswith("snapshot/"):
                         _LOGGER.debug("{0} snapshot updated".format(self.entity_id))
                         self.hass.bus.fire(
                             "aarlo_snapshot_updated",
                             {"entity_id": self.entity_id, "device_id": self.device_id},
                         )
+                        trace_stage(self.hass, self._camera.device_id, "aarlo_snapshot_updated", STAGE_EVENT)
                     else:
                         _LOGGER.debug("{0} capture updated".format(self.entity_id))
                         self.hass.bus.fire(
                             "aarlo_capture_updated",
                             {"entity_id": self.entity_id, "device_id": self.device_id},
                         )
+                        trace_stage(self.hass, self._camera.device_id, "aarlo_capture_updated", STAGE_EVENT)
                     self.hass.bus.fire(
                         "aarlo_image_updated",
                         {"entity_id": self.entity_id, "device_id": self.device_id},
                     )
                 self._last_image_source = value
 
+            # New image data, it replaces the stored image and its scaled copies.
+            if attr == LAST_IMAGE_DATA_KEY:
+                self._images.put(self._camera.device_id, self._camera.last_image_source, value)
+                if self._refresh is not None:
+                    self._refresh.image_updated(self.entity_id)
+
             # Save image if asked to
-            if attr == LAST_IMAGE_DATA_KEY and self._save_updates_to != "":
-                filename = "{}/{}.jpg".format(self._save_updates_to, self._attr_unique_id)
+            save_updates_to = self._aarlo_config.get(CONF_SAVE_UPDATES_TO)
+            if attr == LAST_IMAGE_DATA_KEY and save_updates_to != "":
+                filename = "{}/{}.jpg".format(save_updates_to, self._attr_unique_id)
                 _LOGGER.debug("saving to {}".format(filename))
                 if not self.hass.config.is_allowed_path(filename):
                     _LOGGER.error("Can't write %s, no access to path!", filename)
                 else:
-                    with open(filename, "wb") as img_file:
-                        img_file.write(value)
+                    _write_file(filename, self._images.view(self._camera.device_id))
 
             # Is the camera on or off?
             if attr == PRIVACY_KEY:
@@ -418,12 +505,32 @@ class ArloCam(Camera):
         self._camera.add_attr_callback(MEDIA_UPLOAD_KEY, update_state)
         self._camera.add_attr_callback(PRIVACY_KEY, update_state)
         self._camera.add_attr_callback(RECENT_ACTIVITY_KEY, update_state)
+        add_entity_to_registry(self.hass, self, self._camera)
+
+        # Keep the image fresh, if asked to.
+        if self._refresh is not None:
+            self._refresh.add(self.entity_id, self._overrides.get(
+                CONF_REFRESH_INTERVAL, self._aarlo_config.get(CONF_REFRESH_INTERVAL, REFRESH_INTERVAL)
+            ))
+
+    async def async_will_remove_from_hass(self):
+        if self._cancel_snapshot_timeout is not None:
+            self._cancel_snapshot_timeout()
+            self._cancel_snapshot_timeout = None
+        self._images.remove(self._camera.device_id)
+        if self._refresh is not None:
+            self._refresh.remove(self.entity_id)
+        remove_entity_from_registry(self.hass, self)
 
     async def handle_async_mjpeg_stream(self, request):
-        """Generate an HTTP MJPEG stream from the camera."""
-        video = await self.hass.async_add_executor_job(
-            getattr, self._camera, "last_video"
-        )
+        """Generate an HTTP MJPEG stream from the camera.
+
+        ffmpeg is only loaded the first time someone asks for a stream.
+        """
+        from haffmpeg.camera import CameraMjpeg
+        from homeassistant.components.ffmpeg import DATA_FFMPEG
+
+        video = await async_run_blocking(self.hass, getattr, self._camera, "last_video")
 
         if not video:
             error_msg = (
@@ -433,7 +540,8 @@ class ArloCam(Camera):
             _LOGGER.error(error_msg)
             return
 
-        stream = CameraMjpeg(self._ffmpeg.binary)
+        ffmpeg = self.hass.data[DATA_FFMPEG]
+        stream = CameraMjpeg(ffmpeg.binary)
         await stream.open_camera(video.video_url, extra_cmd=self._ffmpeg_arguments)
 
         try:
@@ -442,7 +550,7 @@ class ArloCam(Camera):
                 self.hass,
                 request,
                 stream_reader,
-                self._ffmpeg.ffmpeg_stream_content_type,
+                ffmpeg.ffmpeg_stream_content_type,
             )
         finally:
             try:
@@ -474,6 +582,20 @@ class ArloCam(Camera):
     def turn_on(self) -> None:
         self._camera.turn_on()
 
+    async def async_turn_off(self) -> None:
+        await async_run_command(self.hass, self.device_id, PRIORITY_CONTROL, self.turn_off)
+
+    async def async_turn_on(self) -> None:
+        await async_run_command(self.hass, self.device_id, PRIORITY_CONTROL, self.turn_on)
+
+    @property
+    def next_refresh(self):
+        """When the scheduler will next refresh the image, if it will."""
+        when = self._refresh.next_refresh(self.entity_id) if self._refresh is not None else None
+        if when is None:
+            return None
+        return datetime.fromtimestamp(when, timezone.utc).isoformat()
+
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
@@ -502,6 +624,8 @@ class ArloCam(Camera):
                 (ATTR_LAST_VIDEO, self.last_video_url),
                 (ATTR_TIME_ZONE, self._camera.timezone),
                 (ATTR_STATE, self._camera.state),
+                (ATTR_CIRCUIT_BREAKER, get_circuit_state(self.hass, self._camera.device_id)),
+                (ATTR_NEXT_REFRESH, self.next_refresh),
             )
             if value is not None
         }
@@ -515,7 +639,7 @@ class ArloCam(Camera):
             "device_model": self._camera.model_id,
         })
 
-        return attrs
+        return trim_attributes(attrs, self._lean_attributes)
 
     async def stream_source(self):
         """Return the source of the stream.
@@ -524,18 +648,64 @@ class ArloCam(Camera):
         to the original Arlo one. This means we get a `rtsps` stream back which the stream
         component can handle.
         """
-        return await self.hass.async_add_executor_job(self._camera.get_stream, "arlo")
+        return await async_track_outcome(self.hass, "stream", async_run_command(
+            self.hass, self.device_id, PRIORITY_MEDIA, self._camera.get_stream, "arlo", failed=no_result
+        ))
 
     async def async_stream_source(self, user_agent=None):
-        return await self.hass.async_add_executor_job(
-            self._camera.get_stream, user_agent
-        )
+        return await async_track_outcome(self.hass, "stream", async_run_command(
+            self.hass, self.device_id, PRIORITY_MEDIA, self._camera.get_stream, user_agent, failed=no_result
+        ))
+
+    def last_image(self, data=None):
+        """Return the stored image, storing `data` or pyaarlo's image first.
+
+        pyaarlo loads its cached image without telling us so the first
+        reader picks it up.
+        """
+        device_id = self._camera.device_id
+        image = self._images.get(device_id)
+        if data is not None or image is None:
+            if data is None:
+                data = self._camera.last_image_from_cache
+            image = self._images.put(device_id, self._camera.last_image_source, data) or image
+        return image
 
     def camera_image(
         self, width: int | None = None, height: int | None = None
     ) -> bytes | None:
         """Return a still image response from the camera."""
-        return self._camera.last_image_from_cache
+        image = self.last_image()
+        return image.data if image is not None else None
+
+    def _scale_camera_image(self, image, bucket):
+        """Scale the image to fit bucket and cache the result."""
+        scaled = scale_jpeg_camera_image(Image(self.content_type, image.data), bucket[0], bucket[1])
+        self._images.put_variant(self._camera.device_id, image.generation, bucket, scaled)
+        _LOGGER.debug(f"{self._attr_unique_id} scaled image {image.generation} to {bucket}, "
+                      f"{len(image.data)} -> {len(scaled)} bytes")
+        return scaled
+
+    async def async_camera_image(
+        self, width: int | None = None, height: int | None = None
+    ) -> bytes | None:
+        """Return a still image, scaled down if a smaller size was asked for.
+
+        Scaled versions are cached per size bucket until the image changes.
+        """
+        bucket = image_bucket(width, height)
+        if bucket is None:
+            return await async_run_blocking(self.hass, self.camera_image)
+
+        image = await async_run_blocking(self.hass, self.last_image)
+        if image is None:
+            return None
+        scaled = self._images.get_variant(self._camera.device_id, image.generation, bucket)
+        if scaled is None:
+            scaled = await self.hass.async_add_executor_job(
+                self._scale_camera_image, image, bucket
+            )
+        return scaled
 
     @property
     def last_video(self):
@@ -578,6 +748,12 @@ class ArloCam(Camera):
         self._attr_motion_detection_enabled = False
         self.set_base_station_mode(STATE_ALARM_ARLO_DISARMED)
 
+    async def async_enable_motion_detection(self):
+        await async_run_command(self.hass, self.device_id, PRIORITY_SAFETY, self.enable_motion_detection)
+
+    async def async_disable_motion_detection(self):
+        await async_run_command(self.hass, self.device_id, PRIORITY_SAFETY, self.disable_motion_detection)
+
     def _attach_hidden_stream(self, duration):
         _LOGGER.info(f"{self._attr_unique_id} attaching hidden stream for duration {duration}")
 
@@ -592,8 +768,50 @@ class ArloCam(Camera):
         _LOGGER.debug("waiting on stream connect")
         return self._camera.wait_for_user_stream()
 
+    def _snapshot_method(self):
+        """How to take the next snapshot.
+
+        A `stream_snapshot` setting for this camera wins, then what we've
+        learnt about the camera and then the global `stream_snapshot`.
+        """
+        stream_snapshot = self._overrides.get(CONF_STREAM_SNAPSHOT)
+        if stream_snapshot is None:
+            if self._snapshots is not None:
+                return self._snapshots.choose(self._camera.device_id)
+            stream_snapshot = self._aarlo_config.get(CONF_STREAM_SNAPSHOT)
+        return METHOD_STREAM if stream_snapshot else METHOD_FULL_FRAME
+
+    @callback
+    def _time_snapshot_out(self, request):
+        """Count the snapshot as failed if it hasn't arrived when pyaarlo gives up on it."""
+        if self._cancel_snapshot_timeout is not None:
+            self._cancel_snapshot_timeout()
+        timeout = self._overrides.get(
+            CONF_SNAPSHOT_TIMEOUT, self._aarlo_config.get(CONF_SNAPSHOT_TIMEOUT, SNAPSHOT_TIMEOUT)
+        )
+
+        @callback
+        def _timed_out(_now):
+            self._cancel_snapshot_timeout = None
+            self._snapshots.abandon(self._camera.device_id, request)
+
+        self._cancel_snapshot_timeout = async_call_later(self.hass, timeout, _timed_out)
+
     def _start_snapshot_stream(self):
-        if self._stream_snapshot:
+        method = self._snapshot_method()
+        if self._snapshots is not None:
+            overrides = self._overrides
+            if method == METHOD_STREAM_THUMBNAIL:
+                overrides = {**overrides, CONF_STREAM_SNAPSHOT_STOP: THUMBNAIL_STREAM_STOP}
+            # Only hand the camera new settings when the method changes them.
+            if overrides != self._device_overrides:
+                PyaarloCfg.override_device(self._camera, overrides)
+                self._device_overrides = overrides
+            request = self._snapshots.start(self._camera.device_id, method)
+            self.hass.loop.call_soon_threadsafe(self._time_snapshot_out, request)
+            _LOGGER.debug(f"{self._attr_unique_id} snapshot using {method}")
+
+        if method != METHOD_FULL_FRAME:
             source = self._camera.start_snapshot_stream()
             if source is not None:
                 self._camera.wait_for_user_stream()
@@ -605,26 +823,29 @@ class ArloCam(Camera):
         self._camera.request_snapshot()
 
     async def async_request_snapshot(self):
-        return await self.hass.async_add_executor_job(self.request_snapshot)
+        return await async_run_command(self.hass, self.device_id, PRIORITY_MEDIA, self.request_snapshot)
 
     def get_snapshot(self):
         self._start_snapshot_stream()
-        return self._camera.get_snapshot()
+        image = self.last_image(self._camera.get_snapshot())
+        return image.data if image is not None else None
 
     async def async_get_snapshot(self):
-        return await self.hass.async_add_executor_job(self.get_snapshot)
+        return await async_track_outcome(self.hass, "snapshot", async_run_command(
+            self.hass, self.device_id, PRIORITY_MEDIA, self.get_snapshot, failed=no_result
+        ))
 
     def get_video(self):
         return self._camera.get_video()
 
     async def async_get_video(self):
-        return await self.hass.async_add_executor_job(self.get_video)
+        return await async_run_command(self.hass, self.device_id, PRIORITY_MEDIA, self.get_video)
 
     def stop_activity(self):
         return self._camera.stop_activity()
 
     async def async_stop_activity(self):
-        return await self.hass.async_add_executor_job(self.stop_activity)
+        return await async_run_command(self.hass, self.device_id, PRIORITY_CONTROL, self.stop_activity)
 
     def siren_on(self, duration=30, volume=10):
         if self._camera.has_capability(SIREN_STATE_KEY):
@@ -643,10 +864,12 @@ class ArloCam(Camera):
         return False
 
     async def async_siren_on(self, duration, volume):
-        return await self.hass.async_add_executor_job(self.siren_on, duration, volume)
+        return await async_run_command(
+            self.hass, self.device_id, PRIORITY_SAFETY, self.siren_on, duration, volume
+        )
 
     async def async_siren_off(self):
-        return await self.hass.async_add_executor_job(self.siren_off)
+        return await async_run_command(self.hass, self.device_id, PRIORITY_SAFETY, self.siren_off)
 
     def start_recording(self, duration=30):
         """ Create a recording in the Arlo library.
@@ -673,13 +896,16 @@ class ArloCam(Camera):
         self._camera.stop_recording_stream()
 
     async def async_start_recording(self, duration):
-        return await self.hass.async_add_executor_job(self.start_recording, duration)
+        return await async_run_command(
+            self.hass, self.device_id, PRIORITY_MEDIA, self.start_recording, duration, failed=no_result
+        )
 
     async def async_stop_recording(self):
-        return await self.hass.async_add_executor_job(self.stop_recording)
+        return await async_run_command(self.hass, self.device_id, PRIORITY_CONTROL, self.stop_recording)
 
 
 @websocket_api.async_response
+@timed_websocket
 async def websocket_video_url(hass, connection, msg):
     try:
         camera = get_entity_from_domain(hass, CAMERA_DOMAIN, msg["entity_id"])
@@ -708,12 +934,16 @@ async def websocket_video_url(hass, connection, msg):
 
 
 @websocket_api.async_response
+@timed_websocket
 async def websocket_library(hass, connection, msg):
     try:
         camera = get_entity_from_domain(hass, CAMERA_DOMAIN, msg["entity_id"])
         videos = []
         _LOGGER.debug("library+" + str(msg["at_most"]))
-        for v in camera.last_n_videos(msg["at_most"]):
+        library = await async_run_command(
+            hass, camera.device_id, PRIORITY_MEDIA, camera.last_n_videos, msg["at_most"]
+        )
+        for v in library:
             videos.append(
                 {
                     "created_at": v.created_at,
@@ -751,6 +981,44 @@ async def websocket_library(hass, connection, msg):
 
 
 @websocket_api.async_response
+@timed_websocket
+async def websocket_event_history(hass, connection, msg):
+    try:
+        history = hass.data.get(COMPONENT_HISTORY)
+        if history is None:
+            raise HomeAssistantError("event history is not turned on")
+        device_ids = [
+            get_device_from_domain(hass, [CAMERA_DOMAIN, BINARY_SENSOR_DOMAIN], entity_id).device_id
+            for entity_id in msg.get("entity_id", [])
+        ]
+        start, end = msg.get("start"), msg.get("end")
+        events = await hass.async_add_executor_job(partial(
+            history.query,
+            start=dt_util.as_timestamp(start) if start is not None else None,
+            end=dt_util.as_timestamp(end) if end is not None else None,
+            events=msg.get("event_types"),
+            device_ids=device_ids,
+            object_type=msg.get("object_type"),
+            limit=msg["at_most"],
+        ))
+        for event in events:
+            event["at"] = dt_util.utc_from_timestamp(event["at"]).isoformat()
+        connection.send_message(
+            websocket_api.result_message(msg["id"], {"events": events})
+        )
+    except HomeAssistantError as error:
+        connection.send_message(
+            websocket_api.error_message(
+                msg["id"],
+                "event_history_ws",
+                "Unable to fetch event history ({})".format(str(error)),
+            )
+        )
+        _LOGGER.warning("event history websocket failed")
+
+
+@websocket_api.async_response
+@timed_websocket
 async def websocket_stream_url(hass, connection, msg):
     try:
         camera = get_entity_from_domain(hass, CAMERA_DOMAIN, msg["entity_id"])
@@ -778,7 +1046,10 @@ async def websocket_stream_url(hass, connection, msg):
 
 
 @websocket_api.async_response
+@timed_websocket
 async def websocket_snapshot_image(hass, connection, msg):
+    import base64
+
     try:
         camera = get_entity_from_domain(hass, CAMERA_DOMAIN, msg["entity_id"])
         _LOGGER.debug("snapshot_image for " + str(camera.unique_id))
@@ -805,6 +1076,7 @@ async def websocket_snapshot_image(hass, connection, msg):
 
 
 @websocket_api.async_response
+@timed_websocket
 async def websocket_request_snapshot(hass, connection, msg):
     try:
         camera = get_entity_from_domain(hass, CAMERA_DOMAIN, msg["entity_id"])
@@ -826,7 +1098,10 @@ async def websocket_request_snapshot(hass, connection, msg):
 
 
 @websocket_api.async_response
+@timed_websocket
 async def websocket_video_data(hass, connection, msg):
+    import base64
+
     try:
         camera = get_entity_from_domain(hass, CAMERA_DOMAIN, msg["entity_id"])
         _LOGGER.debug("video_data for " + str(camera.unique_id))
@@ -853,6 +1128,7 @@ async def websocket_video_data(hass, connection, msg):
 
 
 @websocket_api.async_response
+@timed_websocket
 async def websocket_stop_activity(hass, connection, msg):
     try:
         camera = get_entity_from_domain(hass, CAMERA_DOMAIN, msg["entity_id"])
@@ -874,6 +1150,7 @@ async def websocket_stop_activity(hass, connection, msg):
 
 
 @websocket_api.async_response
+@timed_websocket
 async def websocket_siren_on(hass, connection, msg):
     try:
         camera = get_entity_from_domain(hass, CAMERA_DOMAIN, msg["entity_id"])
@@ -895,6 +1172,7 @@ async def websocket_siren_on(hass, connection, msg):
 
 
 @websocket_api.async_response
+@timed_websocket
 async def websocket_siren_off(hass, connection, msg):
     try:
         camera = get_entity_from_domain(hass, CAMERA_DOMAIN, msg["entity_id"])
@@ -915,13 +1193,19 @@ async def websocket_siren_off(hass, connection, msg):
         _LOGGER.warning("{} siren off websocket failed".format(msg["entity_id"]))
 
 
-def camera_snapshot_service(hass, call):
-    for entity_id in call.data["entity_id"]:
+def _write_file(filename, data):
+    with open(filename, "wb") as out_file:
+        out_file.write(data)
+
+
+async def async_camera_snapshot_service(hass, call):
+
+    async def _snapshot(entity_id):
         try:
             _LOGGER.info("{} snapshot".format(entity_id))
             camera = get_entity_from_domain(hass, CAMERA_DOMAIN, entity_id)
-            camera.get_snapshot()
-            hass.bus.fire(
+            await camera.async_get_snapshot()
+            hass.bus.async_fire(
                 "aarlo_snapshot_ready",
                 {
                     "entity_id": entity_id,
@@ -931,9 +1215,12 @@ def camera_snapshot_service(hass, call):
         except HomeAssistantError:
             _LOGGER.warning("{} snapshot service failed".format(entity_id))
 
+    await asyncio.gather(*[_snapshot(entity_id) for entity_id in call.data["entity_id"]])
+
 
-def camera_snapshot_to_file_service(hass, call):
-    for entity_id in call.data["entity_id"]:
+async def async_camera_snapshot_to_file_service(hass, call):
+
+    async def _snapshot_to_file(entity_id):
         try:
             camera = get_entity_from_domain(hass, CAMERA_DOMAIN, entity_id)
             filename = call.data[ATTR_FILENAME]
@@ -947,11 +1234,10 @@ def camera_snapshot_to_file_service(hass, call):
                 return
 
             # Get and write snapshot
-            snapshot = camera.get_snapshot()
-            with open(snapshot_file, "wb") as out_file:
-                out_file.write(snapshot)
+            snapshot = await camera.async_get_snapshot()
+            await hass.async_add_executor_job(_write_file, snapshot_file, snapshot)
 
-            hass.bus.fire(
+            hass.bus.async_fire(
                 "aarlo_snapshot_ready",
                 {
                     "entity_id": entity_id,
@@ -964,9 +1250,12 @@ def camera_snapshot_to_file_service(hass, call):
         except HomeAssistantError:
             _LOGGER.warning("{} snapshot to file service failed".format(entity_id))
 
+    await asyncio.gather(*[_snapshot_to_file(entity_id) for entity_id in call.data["entity_id"]])
+
 
-def camera_video_to_file_service(hass, call):
-    for entity_id in call.data["entity_id"]:
+async def async_camera_video_to_file_service(hass, call):
+
+    async def _video_to_file(entity_id):
         try:
             camera = get_entity_from_domain(hass, CAMERA_DOMAIN, entity_id)
             filename = call.data[ATTR_FILENAME]
@@ -980,11 +1269,10 @@ def camera_video_to_file_service(hass, call):
                 return
 
             # Get and write video
-            video = camera.get_video()
-            with open(video_file, "wb") as out_file:
-                out_file.write(video)
+            video = await camera.async_get_video()
+            await hass.async_add_executor_job(_write_file, video_file, video)
 
-            hass.bus.fire(
+            hass.bus.async_fire(
                 "aarlo_video_ready", {"entity_id": entity_id, "file": video_file}
             )
         except OSError as err:
@@ -993,31 +1281,42 @@ def camera_video_to_file_service(hass, call):
             _LOGGER.warning("{} video to file service failed".format(entity_id))
         _LOGGER.debug("{0} video to file finished".format(entity_id))
 
+    await asyncio.gather(*[_video_to_file(entity_id) for entity_id in call.data["entity_id"]])
+
 
-def camera_stop_activity_service(hass, call):
-    for entity_id in call.data["entity_id"]:
+async def async_camera_stop_activity_service(hass, call):
+
+    async def _stop_activity(entity_id):
         try:
             _LOGGER.info("{} stop activity".format(entity_id))
-            get_entity_from_domain(hass, CAMERA_DOMAIN, entity_id).stop_activity()
+            await get_entity_from_domain(hass, CAMERA_DOMAIN, entity_id).async_stop_activity()
         except HomeAssistantError:
             _LOGGER.warning("{} stop activity service failed".format(entity_id))
 
+    await asyncio.gather(*[_stop_activity(entity_id) for entity_id in call.data["entity_id"]])
+
 
-def camera_start_recording_service(hass, call):
-    for entity_id in call.data["entity_id"]:
+async def async_camera_start_recording_service(hass, call):
+    duration = call.data[ATTR_DURATION]
+
+    async def _start_recording(entity_id):
         try:
-            duration = call.data[ATTR_DURATION]
             _LOGGER.info("{} start recording(duration={})".format(entity_id, duration))
             camera = get_entity_from_domain(hass, CAMERA_DOMAIN, entity_id)
-            camera.start_recording(duration=duration)
+            await camera.async_start_recording(duration=duration)
         except HomeAssistantError as e:
             _LOGGER.warning(f"{entity_id} start recording service failed - {str(e)}")
 
+    await asyncio.gather(*[_start_recording(entity_id) for entity_id in call.data["entity_id"]])
+
 
-def camera_stop_recording_service(hass, call):
-    for entity_id in call.data["entity_id"]:
+async def async_camera_stop_recording_service(hass, call):
+
+    async def _stop_recording(entity_id):
         try:
             _LOGGER.info("{} stop recording".format(entity_id))
-            get_entity_from_domain(hass, CAMERA_DOMAIN, entity_id).stop_recording()
+            await get_entity_from_domain(hass, CAMERA_DOMAIN, entity_id).async_stop_recording()
         except HomeAssistantError as e:
             _LOGGER.warning(f"{entity_id} stop recording service failed - {str(e)}")
+
+    await asyncio.gather(*[_stop_recording(entity_id) for entity_id in call.data["entity_id"]])
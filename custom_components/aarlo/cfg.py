@@ -8,13 +8,15 @@ where the user can configure things.
 There are 2 pieces:
 
 - `BlendedCfg`; this class is responsible for loading the new file based
-  configuration and merging it with the flow data and options.
+  configuration and merging it with the flow data and options. The parsed
+  file is cached until its modification time or size changes.
 
 - `UpgradeCfg`; A helper class to import configuration from the old YAML
   layout.
 """
 
 import aiofiles
+import aiofiles.os
 import copy
 import logging
 
@@ -84,12 +86,38 @@ SNAPSHOTS_DEFAULT = False
 SILENT_MODE_DEFAULT = False
 SNAPSHOT_TIMEOUT_DEFAULT = timedelta(seconds=60)
 
+# What a camera can change in the `cameras:` section.
+CAMERA_OVERRIDES_SCHEMA = vol.Schema({
+    vol.Optional(CONF_STREAM_SNAPSHOT): cv.boolean,
+    vol.Optional(CONF_STREAM_SNAPSHOT_STOP): cv.positive_int,
+    vol.Optional(CONF_SNAPSHOT_CHECKS): vol.All(cv.ensure_list, [cv.positive_int]),
+    vol.Optional(CONF_SNAPSHOT_TIMEOUT): cv.time_period,
+    vol.Optional(CONF_USER_STREAM_DELAY): cv.positive_int,
+    vol.Optional(CONF_FFMPEG_ARGUMENTS): cv.string,
+    vol.Optional(CONF_REFRESH_INTERVAL): cv.positive_int,
+})
+
+# The camera overrides pyaarlo reads, rather than us.
+CAMERA_OVERRIDES_PYAARLO = [
+    CONF_SNAPSHOT_CHECKS,
+    CONF_SNAPSHOT_TIMEOUT,
+    CONF_STREAM_SNAPSHOT_STOP,
+    CONF_USER_STREAM_DELAY,
+]
+
 # This is the current aarlo main config.
 AARLO_SCHEMA = vol.Schema({
     vol.Optional(CONF_HOST, default=DEFAULT_HOST): cv.url,
     vol.Optional(CONF_AUTH_HOST, default=DEFAULT_AUTH_HOST): cv.url,
     vol.Optional(CONF_SCAN_INTERVAL, default=SCAN_INTERVAL): cv.time_period,
     vol.Optional(CONF_PACKET_DUMP, default=PACKET_DUMP): cv.boolean,
+    vol.Optional(CONF_PACKET_DUMP_MAX_SIZE, default=PACKET_DUMP_MAX_SIZE): cv.positive_int,
+    vol.Optional(CONF_PACKET_DUMP_MAX_AGE, default=PACKET_DUMP_MAX_AGE): cv.positive_int,
+    vol.Optional(CONF_PACKET_DUMP_BACKUPS, default=PACKET_DUMP_BACKUPS): cv.positive_int,
+    vol.Optional(CONF_PACKET_DUMP_SAMPLE, default=PACKET_DUMP_SAMPLE): vol.All(
+        vol.Coerce(float), vol.Range(min=0.0, max=1.0)
+    ),
+    vol.Optional(CONF_PACKET_DUMP_QUEUE, default=PACKET_DUMP_QUEUE): cv.positive_int,
     vol.Optional(CONF_CACHE_VIDEOS, default=CACHE_VIDEOS): cv.boolean,
     vol.Optional(CONF_DB_MOTION_TIME, default=DB_MOTION_TIME): cv.time_period,
     vol.Optional(CONF_DB_DING_TIME, default=DB_DING_TIME): cv.time_period,
@@ -131,6 +159,29 @@ AARLO_SCHEMA = vol.Schema({
     vol.Optional(CONF_MQTT_HOST, default=MQTT_HOST): cv.string,
     vol.Optional(CONF_MQTT_HOSTNAME_CHECK, default=DEFAULT_MQTT_HOSTNAME_CHECK): cv.boolean,
     vol.Optional(CONF_MQTT_TRANSPORT, default=DEFAULT_MQTT_TRANSPORT): cv.string,
+    vol.Optional(CONF_SIREN_DEADLINE, default=SIREN_DEADLINE): cv.positive_int,
+    vol.Optional(CONF_COMMAND_CONCURRENCY, default=COMMAND_CONCURRENCY): cv.positive_int,
+    vol.Optional(CONF_EXECUTOR_WORKERS, default=EXECUTOR_WORKERS): cv.positive_int,
+    vol.Optional(CONF_EXECUTOR_QUEUE, default=EXECUTOR_QUEUE): cv.positive_int,
+    vol.Optional(CONF_BREAKER_FAILURES, default=BREAKER_FAILURES): cv.positive_int,
+    vol.Optional(CONF_BREAKER_BACKOFF, default=BREAKER_BACKOFF): cv.positive_int,
+    vol.Optional(CONF_REQUEST_RATES, default={}): vol.Schema({
+        vol.Optional(name): vol.All(vol.Coerce(float), vol.Range(min=0.01))
+        for name in ("control", "media")
+    }),
+    vol.Optional(CONF_DIAGNOSTIC_SENSORS, default=False): cv.boolean,
+    vol.Optional(CONF_STATE_ATTRIBUTES, default=STATE_ATTRIBUTES): vol.In(
+        [STATE_ATTRIBUTES_FULL, STATE_ATTRIBUTES_LEAN]
+    ),
+    vol.Optional(CONF_CONFIG_WATCH, default=CONFIG_WATCH): cv.boolean,
+    vol.Optional(CONF_CAMERAS, default={}): vol.Schema({cv.string: CAMERA_OVERRIDES_SCHEMA}),
+    vol.Optional(CONF_ADAPTIVE_SNAPSHOTS, default=ADAPTIVE_SNAPSHOTS): cv.boolean,
+    vol.Optional(CONF_REFRESH_INTERVAL, default=REFRESH_INTERVAL): cv.positive_int,
+    vol.Optional(CONF_REFRESH_BUDGET, default=REFRESH_BUDGET): cv.positive_int,
+    vol.Optional(CONF_EVENT_HISTORY, default=EVENT_HISTORY): cv.boolean,
+    vol.Optional(CONF_EVENT_HISTORY_RETENTION, default=EVENT_HISTORY_RETENTION): cv.positive_int,
+    vol.Optional(CONF_ACTIVITY_SENSORS, default=ACTIVITY_SENSORS): cv.boolean,
+    vol.Optional(CONF_BATTERY_SENSORS, default=BATTERY_SENSORS): cv.boolean,
 
     # Deprecated
     vol.Optional(CONF_HIDE_DEPRECATED_SERVICES, default=True): cv.boolean,
@@ -148,6 +199,14 @@ AARLO_FULL_SCHEMA = AARLO_SCHEMA.extend({
     vol.Optional(CONF_TFA_PASSWORD, default=DEFAULT_TFA_PASSWORD): cv.string,
 })
 
+# Options only Home Assistant reads, and reads as it goes. A change to these in
+# aarlo.yaml is applied without reloading the integration. pyaarlo has no way
+# to change its options once it's running so its options aren't here.
+AARLO_SCHEMA_LIVE = [
+    CONF_SAVE_UPDATES_TO,
+    CONF_STREAM_SNAPSHOT,
+]
+
 AARLO_SCHEMA_ONLY_IN_CONFIG = [
     CONF_USERNAME,
     CONF_PASSWORD,
@@ -285,8 +344,37 @@ def _default_config_file(hass) -> str:
     return hass.config.path("aarlo.yaml")
 
 
+# Parsed config files; file name -> ((modification time, size), contents).
+_yaml_cache = {}
+
+# The defaults never change, work them out once.
+_aarlo_defaults = None
+
+
+async def _async_file_key(file_name):
+    """What changes when a file is written; `None` if it isn't there."""
+    try:
+        stat = await aiofiles.os.stat(file_name)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 async def _async_load_yaml(file_name):
     _LOGGER.debug("_async_load_yaml1 file_name for %s", file_name)
+    key = await _async_file_key(file_name)
+    cached = _yaml_cache.get(file_name)
+    if key is not None and cached is not None and cached[0] == key:
+        _LOGGER.debug("_async_load_yaml cached for %s", file_name)
+        return copy.deepcopy(cached[1])
+
+    contents = await _async_parse_yaml(file_name)
+    if key is not None:
+        _yaml_cache[file_name] = (key, copy.deepcopy(contents))
+    return contents
+
+
+async def _async_parse_yaml(file_name):
     try:
         async with aiofiles.open(file_name, 'r') as yaml_file:
             _LOGGER.debug("_async_load_yaml2 file_name for %s", file_name)
@@ -339,6 +427,24 @@ def _extract_monitored_conditions(config_in, prefix):
     }
 
 
+def camera_overrides(config, *names):
+    """Merge a camera's entries from the `cameras:` section.
+
+    A camera can be listed by entity id or serial number; `names` are tried
+    in order and later ones win.
+    """
+    cameras = {str(name): value for name, value in (config.get(CONF_CAMERAS) or {}).items()}
+    overrides = {}
+    for name in names:
+        if not name or name not in cameras:
+            continue
+        try:
+            overrides.update(CAMERA_OVERRIDES_SCHEMA(cameras[name] or {}))
+        except vol.Invalid as err:
+            _LOGGER.error(f"ignoring cameras/{name} in aarlo.yaml: {err}")
+    return overrides
+
+
 class BlendedCfg(object):
     """Helper class to get at Arlo configuration options.
 
@@ -362,7 +468,10 @@ class BlendedCfg(object):
 
         # Bring in all the defaults then overwrite them. I'm trying to decouple
         # the pyaarlo config from this config.
-        self._main_config = AARLO_SCHEMA({})
+        global _aarlo_defaults
+        if _aarlo_defaults is None:
+            _aarlo_defaults = AARLO_SCHEMA({})
+        self._main_config = copy.deepcopy(_aarlo_defaults)
         self._main_config.update(config.get(COMPONENT_DOMAIN, {}))
 
         _LOGGER.debug(f"l-config-file={_default_config_file(self._hass)}")
@@ -390,6 +499,23 @@ class BlendedCfg(object):
         await self._async_load()
         self._merge(data, options)
 
+    async def async_file_key(self):
+        """Changes whenever aarlo.yaml is written."""
+        return await _async_file_key(_default_config_file(self._hass))
+
+    @staticmethod
+    def live_changes(old, new):
+        """Work out what changed between two domain configs.
+
+        Returns the changed options that can be applied as we run and the
+        names of those that need the integration reloading.
+        """
+        changed = {
+            key for key in set(old) | set(new) if old.get(key) != new.get(key)
+        }
+        live = {key: new.get(key) for key in changed if key in AARLO_SCHEMA_LIVE}
+        return live, sorted(changed - set(live))
+
     @property
     def domain_config(self):
         return self._main_config
@@ -492,6 +618,34 @@ class UpgradeCfg(object):
         return options
 
 
+class _DeviceCfg(object):
+    """pyaarlo's config with some options changed."""
+
+    def __init__(self, cfg, options):
+        self._cfg = cfg
+        self._options = options
+
+    def __getattr__(self, name):
+        if name in self._options:
+            return self._options[name]
+        return getattr(self._cfg, name)
+
+
+class _DeviceArlo(object):
+    """What a pyaarlo device with its own config sees as `PyArlo`."""
+
+    def __init__(self, arlo, options):
+        self.arlo = arlo
+        self._options = options
+
+    @property
+    def cfg(self):
+        return _DeviceCfg(self.arlo.cfg, self._options)
+
+    def __getattr__(self, name):
+        return getattr(self.arlo, name)
+
+
 class PyaarloCfg(object):
     """Produce the Pyaarlo config the passed current settings.
     """
@@ -502,19 +656,49 @@ class PyaarloCfg(object):
         # Copy over and convert time deltas.
         options = {k: _fix_value(v) for k, v in config.items()}
 
-        # Fix up known naming inconsistencies. And add a needed setting.
+        # Fix up known naming inconsistencies. And add a needed setting. We
+        # write the packet dump ourselves, see `packet_dump.py`.
         options.update({
-            "dump": config.get(CONF_PACKET_DUMP),
+            "dump": False,
             "storage_dir": config.get(CONF_CONF_DIR),
 
             "wait_for_initial_setup": False
         })
 
         # Fix up defaults.
-        if options["storage_dir"] == "":
-            options["storage_dir"] = hass.config.config_dir + "/.aarlo"
+        options["storage_dir"] = PyaarloCfg.storage_dir(hass, config)
 
         _LOGGER.debug(f"config={config}")
         _LOGGER.debug(f"options={options}")
 
         return options
+
+    @staticmethod
+    def storage_dir(hass, config):
+        return config.get(CONF_CONF_DIR) or hass.config.config_dir + "/.aarlo"
+
+    @staticmethod
+    def override_device(device, overrides):
+        """Give one pyaarlo device its own values for some options.
+
+        pyaarlo devices read options from `PyArlo.cfg` as they need them so
+        the device is handed a stand-in `PyArlo` that answers with the
+        overrides. Settings changed on the real config still show through.
+
+        pyaarlo has no way to do this so we swap the device's private `_arlo`;
+        if that has gone the settings are ignored, with a warning.
+        """
+        options = {
+            k: _fix_value(v) for k, v in overrides.items() if k in CAMERA_OVERRIDES_PYAARLO
+        }
+        arlo = getattr(device, "_arlo", None)
+        if arlo is None:
+            if options:
+                _LOGGER.warning(
+                    f"can't give {getattr(device, 'name', device)} its own {', '.join(sorted(options))}, "
+                    "has pyaarlo changed?"
+                )
+            return
+        if isinstance(arlo, _DeviceArlo):
+            arlo = arlo.arlo
+        device._arlo = _DeviceArlo(arlo, options) if options else arlo
@@ -0,0 +1,177 @@
+"""
+Prioritised queue for blocking device commands.
+
+Every command we send to Arlo is a blocking pyaarlo call. Rather than throw
+them all at the executor and hope, we queue them here:
+
+- commands have a priority class; safety (sirens, mode changes) beats control
+  (lights, switches, restarts) which beats media (snapshots, streams, videos)
+- a device runs one control or media command at a time; safety commands have
+  their own lane so a long snapshot can't hold up a siren
+- at most `max_active` commands run at once and media commands always leave a
+  slot free for the other classes
+- we keep track of how long each class spends waiting in the queue
+- a caller that stops waiting doesn't stop the pyaarlo call, the executor
+  thread can't be interrupted, so the device keeps its lane until it returns
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from functools import partial
+
+
+PRIORITY_SAFETY = 0
+PRIORITY_CONTROL = 1
+PRIORITY_MEDIA = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_SAFETY: "safety",
+    PRIORITY_CONTROL: "control",
+    PRIORITY_MEDIA: "media",
+}
+
+DEFAULT_MAX_ACTIVE = 8
+
+
+class _Command(object):
+    __slots__ = ("priority", "seq", "device_id", "future", "queued_at")
+
+    def __init__(self, priority, seq, device_id, future):
+        self.priority = priority
+        self.seq = seq
+        self.device_id = device_id
+        self.future = future
+        self.queued_at = time.monotonic()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    @property
+    def lane(self):
+        return (self.device_id, self.priority == PRIORITY_SAFETY)
+
+
+class _WaitTimes(object):
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "average": round(self.total / self.count, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+        }
+
+
+class ArloCommandQueue(object):
+    """Run blocking commands in priority order.
+
+    `run_job` turns a blocking function into an awaitable, for example
+    `hass.async_add_executor_job`. All methods must be called from the event
+    loop.
+    """
+
+    def __init__(self, run_job, max_active=DEFAULT_MAX_ACTIVE):
+        self._run_job = run_job
+        self._max_active = max(1, max_active)
+        self._max_media = max(1, self._max_active - 1)
+        self._seq = itertools.count()
+        self._waiting = []
+        self._busy = set()
+        self._active = 0
+        self._active_media = 0
+        self._peak_waiting = 0
+        self._waits = {name: _WaitTimes() for name in PRIORITY_NAMES.values()}
+
+    def _can_start(self, command):
+        if command.lane in self._busy:
+            return False
+        if command.priority == PRIORITY_MEDIA and self._active_media >= self._max_media:
+            return False
+        return True
+
+    def _start(self, command):
+        self._active += 1
+        if command.priority == PRIORITY_MEDIA:
+            self._active_media += 1
+        self._busy.add(command.lane)
+        command.future.set_result(None)
+
+    def _finish(self, command):
+        self._active -= 1
+        if command.priority == PRIORITY_MEDIA:
+            self._active_media -= 1
+        self._busy.discard(command.lane)
+        self._dispatch()
+
+    def _job_done(self, command, job):
+        if not job.cancelled():
+            # Nobody may be waiting for the result any more.
+            job.exception()
+        self._finish(command)
+
+    def _dispatch(self):
+        blocked = []
+        while self._waiting and self._active < self._max_active:
+            command = heapq.heappop(self._waiting)
+            if command.future.done():
+                # The caller gave up waiting.
+                continue
+            if self._can_start(command):
+                self._start(command)
+            else:
+                blocked.append(command)
+        for command in blocked:
+            heapq.heappush(self._waiting, command)
+
+    async def async_run(self, device_id, priority, func):
+        """Queue `func` for `device_id` and return its result once run."""
+        command = _Command(priority, next(self._seq), device_id, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiting, command)
+        self._peak_waiting = max(self._peak_waiting, len(self._waiting))
+        self._dispatch()
+
+        try:
+            await command.future
+        except asyncio.CancelledError:
+            # We were given a slot but didn't get to use it.
+            if command.future.done() and not command.future.cancelled():
+                self._finish(command)
+            raise
+
+        self._waits[PRIORITY_NAMES[priority]].add(time.monotonic() - command.queued_at)
+        job = asyncio.ensure_future(self._run_job(func))
+        job.add_done_callback(partial(self._job_done, command))
+        return await asyncio.shield(job)
+
+    @property
+    def active(self):
+        return self._active
+
+    @property
+    def waiting(self):
+        return len(self._waiting)
+
+    def wait_times(self, priority):
+        return self._waits[PRIORITY_NAMES[priority]].as_dict()
+
+    def as_dict(self):
+        return {
+            "max_active": self._max_active,
+            "active": self._active,
+            "waiting": len(self._waiting),
+            "peak_waiting": self._peak_waiting,
+            "wait_times": {name: waits.as_dict() for name, waits in self._waits.items()},
+        }
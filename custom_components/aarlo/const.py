@@ -6,15 +6,37 @@ COMPONENT_DOMAIN = "aarlo"
 COMPONENT_DATA = "aarlo-data"
 COMPONENT_SERVICES = "aarlo-services"
 COMPONENT_CONFIG = "aarlo-config"
+COMPONENT_ENTITIES = "aarlo-entities"
+COMPONENT_STATS = "aarlo-stats"
+COMPONENT_COMMANDS = "aarlo-commands"
+COMPONENT_EXECUTOR = "aarlo-executor"
+COMPONENT_BREAKERS = "aarlo-breakers"
+COMPONENT_LIMITER = "aarlo-limiter"
+COMPONENT_TRACER = "aarlo-tracer"
+COMPONENT_PACKET_DUMP = "aarlo-packet-dump"
+COMPONENT_IMAGES = "aarlo-images"
+COMPONENT_SNAPSHOTS = "aarlo-snapshots"
+COMPONENT_REFRESH = "aarlo-refresh"
+COMPONENT_HISTORY = "aarlo-history"
+COMPONENT_ACTIVITY = "aarlo-activity"
+COMPONENT_BATTERY = "aarlo-battery"
 COMPONENT_ATTRIBUTION = "Data provided by my.arlo.com"
 COMPONENT_BRAND = "Arlo"
 
+SIGNAL_ACTIVITY_UPDATED = "aarlo_activity_updated"
+SIGNAL_BATTERY_UPDATED = "aarlo_battery_updated"
+
 NOTIFICATION_ID = "aarlo_notification"
 NOTIFICATION_TITLE = "aarlo Component Setup"
 
 # All config.
 CONF_ADD_AARLO_PREFIX = "add_aarlo_prefix"
 CONF_PACKET_DUMP = "packet_dump"
+CONF_PACKET_DUMP_MAX_SIZE = "packet_dump_max_size"
+CONF_PACKET_DUMP_MAX_AGE = "packet_dump_max_age"
+CONF_PACKET_DUMP_BACKUPS = "packet_dump_backups"
+CONF_PACKET_DUMP_SAMPLE = "packet_dump_sample"
+CONF_PACKET_DUMP_QUEUE = "packet_dump_queue"
 CONF_CACHE_VIDEOS = "cache_videos"
 CONF_DB_MOTION_TIME = "db_motion_time"
 CONF_DB_DING_TIME = "db_ding_time"
@@ -58,6 +80,25 @@ CONF_CIPHER_LIST = "cipher_list"
 CONF_MQTT_HOST = "mqtt_host"
 CONF_MQTT_HOSTNAME_CHECK = "mqtt_hostname_check"
 CONF_MQTT_TRANSPORT = "mqtt_transport"
+CONF_SIREN_DEADLINE = "siren_deadline"
+CONF_COMMAND_CONCURRENCY = "command_concurrency"
+CONF_EXECUTOR_WORKERS = "executor_workers"
+CONF_EXECUTOR_QUEUE = "executor_queue"
+CONF_BREAKER_FAILURES = "breaker_failures"
+CONF_BREAKER_BACKOFF = "breaker_backoff"
+CONF_REQUEST_RATES = "request_rates"
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"
+CONF_STATE_ATTRIBUTES = "state_attributes"
+CONF_CONFIG_WATCH = "config_watch"
+CONF_CAMERAS = "cameras"
+CONF_ADAPTIVE_SNAPSHOTS = "adaptive_snapshots"
+CONF_REFRESH_INTERVAL = "refresh_interval"
+CONF_REFRESH_BUDGET = "refresh_budget"
+CONF_EVENT_HISTORY = "event_history"
+CONF_EVENT_HISTORY_RETENTION = "event_history_retention"
+CONF_ACTIVITY_SENSORS = "activity_sensors"
+CONF_BATTERY_SENSORS = "battery_sensors"
+CONF_FFMPEG_ARGUMENTS = "ffmpeg_arguments"
 
 # Deprecated
 CONF_HIDE_DEPRECATED_SERVICES = "hide_deprecated_services"
@@ -68,6 +109,11 @@ CONF_HTTP_MAX_SIZE = "http_max_size"
 
 SCAN_INTERVAL = timedelta(seconds=60)
 PACKET_DUMP = False
+PACKET_DUMP_MAX_SIZE = 10
+PACKET_DUMP_MAX_AGE = 24
+PACKET_DUMP_BACKUPS = 5
+PACKET_DUMP_SAMPLE = 1.0
+PACKET_DUMP_QUEUE = 1000
 CACHE_VIDEOS = False
 DB_MOTION_TIME = timedelta(seconds=30)
 DB_DING_TIME = timedelta(seconds=10)
@@ -109,10 +155,46 @@ DEFAULT_BACKEND = "auto"
 DEFAULT_CIPHER_LIST = ""
 DEFAULT_MQTT_HOSTNAME_CHECK = True
 DEFAULT_MQTT_TRANSPORT = "tcp"
+SIREN_DEADLINE = 5
+COMMAND_CONCURRENCY = 8
+EXECUTOR_WORKERS = 8
+EXECUTOR_QUEUE = 32
+BREAKER_FAILURES = 3
+BREAKER_BACKOFF = 30
+STATE_ATTRIBUTES_FULL = "full"
+STATE_ATTRIBUTES_LEAN = "lean"
+STATE_ATTRIBUTES = STATE_ATTRIBUTES_FULL
+CONFIG_WATCH = False
+CONFIG_WATCH_INTERVAL = timedelta(seconds=10)
+ADAPTIVE_SNAPSHOTS = False
+SNAPSHOTS_STORAGE_KEY = "aarlo.snapshots"
+SNAPSHOTS_STORAGE_VERSION = 1
+SNAPSHOTS_SAVE_DELAY = 60
+REFRESH_INTERVAL = 0
+REFRESH_BUDGET = 48
+REFRESH_TICK = timedelta(seconds=15)
+EVENT_HISTORY = False
+EVENT_HISTORY_RETENTION = 30
+ACTIVITY_SENSORS = False
+ACTIVITY_TICK = timedelta(minutes=1)
+BATTERY_SENSORS = False
+BATTERY_STORAGE_KEY = "aarlo.battery"
+BATTERY_STORAGE_VERSION = 1
+BATTERY_SAVE_DELAY = 300
 
 # All attributes
 ATTR_BATTERY_TECH = "battery_tech"
 ATTR_CHARGER_TYPE = "charger_type"
+ATTR_CIRCUIT_BREAKER = "circuit_breaker"
+ATTR_NEXT_REFRESH = "next_refresh"
+
+# Attributes saying what a device is. They never change and the device
+# registry has them too; the lean attribute set leaves them out.
+STATIC_ATTRIBUTES = frozenset({"name", "device_brand", "device_id", "device_model", "device_name"})
+
+# Attributes every platform keeps out of the recorder. Each platform adds the
+# ones it has that change often but aren't worth a history.
+UNRECORDED_ATTRIBUTES = STATIC_ATTRIBUTES | frozenset({ATTR_CIRCUIT_BREAKER})
 
 # Alarm Specifics
 STATE_ALARM_ARLO_DISARMED = "disarmed"
@@ -0,0 +1,117 @@
+"""
+Diagnostics for Aarlo.
+
+Reports the configuration, with credentials removed, the devices we know
+about and the counters each part of the integration keeps about itself.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    COMPONENT_ACTIVITY,
+    COMPONENT_BATTERY,
+    COMPONENT_BREAKERS,
+    COMPONENT_COMMANDS,
+    COMPONENT_CONFIG,
+    COMPONENT_DATA,
+    COMPONENT_DOMAIN,
+    COMPONENT_EXECUTOR,
+    COMPONENT_HISTORY,
+    COMPONENT_IMAGES,
+    COMPONENT_LIMITER,
+    COMPONENT_PACKET_DUMP,
+    COMPONENT_REFRESH,
+    COMPONENT_SNAPSHOTS,
+    COMPONENT_STATS,
+    COMPONENT_TRACER,
+    CONF_TFA_HOST,
+    CONF_TFA_PASSWORD,
+    CONF_TFA_USERNAME,
+)
+
+TO_REDACT = {
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    CONF_TFA_HOST,
+    CONF_TFA_PASSWORD,
+    CONF_TFA_USERNAME,
+}
+
+
+def _plain(config):
+    """Turn values JSON can't handle, like time periods, into strings."""
+    return {
+        key: value if isinstance(value, (str, int, float, bool, list, dict, type(None))) else str(value)
+        for key, value in config.items()
+    }
+
+
+def _as_dict(hass, key):
+    value = hass.data.get(key)
+    return value.as_dict() if value is not None else None
+
+
+def _success_rates(counters):
+    """Work out ok/(ok+failed) for every counter pair."""
+    rates = {}
+    for name, ok in counters.items():
+        if not name.endswith("/ok"):
+            continue
+        base = name[:-len("/ok")]
+        total = ok + counters.get(f"{base}/failed", 0)
+        rates[base] = round(ok / total, 3) if total else None
+    for name in counters:
+        if name.endswith("/failed") and name[:-len("/failed")] not in rates:
+            rates[name[:-len("/failed")]] = 0.0
+    return rates
+
+
+def _devices(arlo):
+    return [
+        {
+            "name": device.name,
+            "device_id": device.device_id,
+            "model_id": device.model_id,
+            "state": device.state,
+        }
+        for device in arlo.cameras + arlo.base_stations + arlo.doorbells + arlo.lights
+    ]
+
+
+async def async_get_config_entry_diagnostics(
+        hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    stats = _as_dict(hass, COMPONENT_STATS) or {"counters": {}, "timers": {}}
+    arlo = hass.data.get(COMPONENT_DATA)
+    config = hass.data.get(COMPONENT_CONFIG, {})
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "config": async_redact_data(_plain(config.get(COMPONENT_DOMAIN, {})), TO_REDACT),
+        "devices": _devices(arlo) if arlo is not None else [],
+        "executor": _as_dict(hass, COMPONENT_EXECUTOR),
+        "commands": _as_dict(hass, COMPONENT_COMMANDS),
+        "breakers": _as_dict(hass, COMPONENT_BREAKERS),
+        "limiter": _as_dict(hass, COMPONENT_LIMITER),
+        "stats": stats,
+        "latency": _as_dict(hass, COMPONENT_TRACER),
+        "packet_dump": _as_dict(hass, COMPONENT_PACKET_DUMP),
+        "images": _as_dict(hass, COMPONENT_IMAGES),
+        "snapshots": _as_dict(hass, COMPONENT_SNAPSHOTS),
+        "refresh": _as_dict(hass, COMPONENT_REFRESH),
+        "history": _as_dict(hass, COMPONENT_HISTORY),
+        "activity": _as_dict(hass, COMPONENT_ACTIVITY),
+        "battery": _as_dict(hass, COMPONENT_BATTERY),
+        "success_rates": _success_rates(stats["counters"]),
+    }
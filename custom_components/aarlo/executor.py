@@ -0,0 +1,146 @@
+"""
+A thread pool just for Aarlo.
+
+Arlo calls can block for a long time; `get_snapshot` waits up to
+`snapshot_timeout` and `start_recording` waits for a stream to connect. If we
+used Home Assistant's shared executor a slow Arlo cloud could tie up threads
+every other integration needs. So we run our blocking calls here instead.
+
+The pool is bounded: at most `max_workers` jobs run and `max_queue` wait. Once
+both are used up new jobs are refused with `ArloExecutorFull` rather than
+piling up behind a cloud that isn't answering.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_WORKERS = 8
+DEFAULT_QUEUE = 32
+
+
+class ArloExecutorFull(RuntimeError):
+    """There is no room left in the executor."""
+
+
+def call_site(func):
+    """A short name for what `func` will run, for example `ArloCam.get_snapshot`."""
+    while isinstance(func, functools.partial):
+        func = func.func
+    return getattr(func, "__qualname__", None) or type(func).__name__
+
+
+class ArloExecutor(object):
+    """A bounded thread pool that keeps track of how busy it is."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, max_queue=DEFAULT_QUEUE, name="aarlo"):
+        self._name = name
+        self._max_workers = max(1, max_workers)
+        self._max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._pending = 0
+        self._active = 0
+        self._peak_pending = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_time = 0.0
+        self._run_time = 0.0
+        self._sites = {}
+
+    @property
+    def capacity(self):
+        return self._max_workers + self._max_queue
+
+    def submit(self, func, *args):
+        """Run `func(*args)` in the pool, return a concurrent future.
+
+        Raises `ArloExecutorFull` if the pool and its queue are full.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self._name} executor is shut down")
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise ArloExecutorFull(
+                    f"{self._name} executor is full: {self._active} running, "
+                    f"{self._pending - self._active} queued"
+                )
+            self._pending += 1
+            self._submitted += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+        queued_at = time.monotonic()
+        site = call_site(func)
+
+        def _run():
+            started = time.monotonic()
+            with self._lock:
+                self._active += 1
+                self._wait_time += started - queued_at
+            failed = True
+            try:
+                result = func(*args)
+                failed = False
+                return result
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self._active -= 1
+                    self._pending -= 1
+                    self._completed += 1
+                    self._failed += 1 if failed else 0
+                    self._run_time += elapsed
+                    count, total = self._sites.get(site, (0, 0.0))
+                    self._sites[site] = (count + 1, total + elapsed)
+
+        return self._pool.submit(_run)
+
+    async def async_run(self, func, *args):
+        """Run `func(*args)` in the pool and wait for the result."""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            self._closed = True
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    @property
+    def active(self):
+        return self._active
+
+    @property
+    def queued(self):
+        return self._pending - self._active
+
+    @property
+    def saturation(self):
+        """How full the pool and queue are, 0.0 to 1.0."""
+        return self._pending / self.capacity
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "max_workers": self._max_workers,
+                "max_queue": self._max_queue,
+                "active": self._active,
+                "queued": self._pending - self._active,
+                "peak_pending": self._peak_pending,
+                "saturation": round(self._pending / self.capacity, 3),
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "failed": self._failed,
+                "wait_time": round(self._wait_time, 6),
+                "run_time": round(self._run_time, 6),
+                "sites": {
+                    site: {"count": count, "total": round(total, 6)}
+                    for site, (count, total) in sorted(self._sites.items())
+                },
+            }
@@ -0,0 +1,93 @@
+"""
+Run the same command against several devices at once.
+
+Used for sirens; when an alarm goes off we want every siren sounding at the
+same time, not one after the other. Each job is started in parallel and we
+wait until all finish or a deadline passes. The result records how long each
+device took and which ones lagged behind.
+
+Jobs that miss the deadline are not cancelled - the underlying executor
+threads can't be interrupted - we just stop waiting for them. Their latency
+is still recorded when they finish.
+"""
+
+import asyncio
+import statistics
+import time
+
+
+# A device is a straggler if it took this many times longer than the median,
+# and more than the minimum time.
+STRAGGLER_FACTOR = 2.0
+STRAGGLER_MINIMUM = 0.5
+
+
+class ArloFanOutResult(object):
+    """What happened to each job in a fan out."""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.elapsed = 0.0
+        self.latencies = {}
+        self.errors = {}
+        self.timed_out = []
+
+    @property
+    def median(self):
+        if not self.latencies:
+            return 0.0
+        return statistics.median(self.latencies.values())
+
+    @property
+    def stragglers(self):
+        """Devices that timed out or were much slower than the rest."""
+        limit = max(STRAGGLER_MINIMUM, self.median * STRAGGLER_FACTOR)
+        slow = [
+            name for name, latency in self.latencies.items()
+            if latency > limit and name not in self.timed_out
+        ]
+        return sorted(slow) + sorted(self.timed_out)
+
+    @property
+    def ok(self):
+        return not self.errors and not self.timed_out
+
+    def as_dict(self):
+        return {
+            "deadline": self.deadline,
+            "elapsed": round(self.elapsed, 3),
+            "latencies": {name: round(latency, 3) for name, latency in self.latencies.items()},
+            "errors": {name: str(error) for name, error in self.errors.items()},
+            "timed_out": sorted(self.timed_out),
+            "stragglers": self.stragglers,
+        }
+
+
+async def async_fan_out(run_job, jobs, deadline, on_late=None):
+    """Run all `jobs` in parallel and wait at most `deadline` seconds.
+
+    `run_job(name, function)` turns a blocking function into an awaitable,
+    for example by passing it to `hass.async_add_executor_job`. `jobs` is a
+    list of `(name, function)` pairs. `on_late(name, latency)` is called as
+    each job that missed the deadline finishes.
+    """
+    result = ArloFanOutResult(deadline)
+    start = time.monotonic()
+
+    async def _run(name, func):
+        try:
+            await asyncio.shield(run_job(name, func))
+        except Exception as e:
+            result.errors[name] = e
+        latency = result.latencies[name] = time.monotonic() - start
+        if name in result.timed_out and on_late is not None:
+            on_late(name, latency)
+
+    tasks = {asyncio.ensure_future(_run(name, func)): name for name, func in jobs}
+    if tasks:
+        _done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            result.timed_out.append(tasks[task])
+
+    result.elapsed = time.monotonic() - start
+    return result
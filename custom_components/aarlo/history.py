@@ -0,0 +1,206 @@
+"""
+Keep a local history of motion, doorbell and capture events.
+
+Home Assistant's recorder only sees these as state changes and the Arlo
+library needs the cloud, neither is much good for "every person on the
+driveway last week". This keeps them in a SQLite database of our own:
+
+- events are queued and written, in batches, by a thread of our own; when
+  the queue is full events are dropped and counted rather than holding up
+  pyaarlo's callbacks
+- each event is a row of `at`, `device_id`, `event`, `object_type`,
+  `object_region` and `video_id`, indexed by time, by event and time and by
+  device and time; a video is only recorded once
+- events older than `retention` seconds are deleted once an hour
+- `query` reads with a connection of its own so it never waits on the writer
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_MOTION = "motion"
+EVENT_DING = "ding"
+EVENT_CAPTURE = "capture"
+EVENTS = (EVENT_MOTION, EVENT_DING, EVENT_CAPTURE)
+
+DEFAULT_RETENTION = 30 * 24 * 60 * 60
+DEFAULT_QUEUE = 1000
+DEFAULT_LIMIT = 100
+PRUNE_INTERVAL = 60 * 60
+
+COLUMNS = ("at", "device_id", "event", "object_type", "object_region", "video_id")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS events ("
+    " id INTEGER PRIMARY KEY,"
+    " at REAL NOT NULL,"
+    " device_id TEXT NOT NULL,"
+    " event TEXT NOT NULL,"
+    " object_type TEXT,"
+    " object_region TEXT,"
+    " video_id TEXT)",
+    "CREATE INDEX IF NOT EXISTS events_at ON events (at)",
+    "CREATE INDEX IF NOT EXISTS events_event_at ON events (event, at)",
+    "CREATE INDEX IF NOT EXISTS events_device_at ON events (device_id, at)",
+    # pyaarlo tells us about the last capture every time it starts.
+    "CREATE UNIQUE INDEX IF NOT EXISTS events_video ON events (device_id, event, video_id)",
+)
+
+_STOP = object()
+
+
+class ArloEventHistory(object):
+    """An append only event store written by its own thread."""
+
+    def __init__(self, filename, retention=DEFAULT_RETENTION, max_queue=DEFAULT_QUEUE,
+                 clock=time.time):
+        self._filename = filename
+        self._retention = retention
+        self._clock = clock
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._thread = None
+        self._db = None
+        self._pruned_at = 0.0
+
+        self._lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._pruned = 0
+        self._errors = 0
+
+    @property
+    def filename(self):
+        return self._filename
+
+    def _connect(self):
+        db = sqlite3.connect(self._filename, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def start(self):
+        """Create the database, if needed, and start the writer."""
+        os.makedirs(os.path.dirname(self._filename) or ".", exist_ok=True)
+        db = self._connect()
+        try:
+            with db:
+                for statement in SCHEMA:
+                    db.execute(statement)
+        finally:
+            db.close()
+        self._thread = threading.Thread(target=self._run, name="ArloEventHistory", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Write what's queued, close the database and wait for the thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def record(self, device_id, event, object_type=None, object_region=None, video_id=None, at=None):
+        """Queue an event. Never blocks; returns False if it wasn't kept."""
+        row = (
+            self._clock() if at is None else at, device_id, event,
+            object_type, None if object_region is None else str(object_region), video_id,
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+        return True
+
+    def _write(self, rows):
+        with self._db:
+            written = self._db.executemany(
+                f"INSERT OR IGNORE INTO events ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)", rows
+            ).rowcount
+        with self._lock:
+            self._written += written
+
+    def _prune(self):
+        now = self._clock()
+        if not self._retention or now - self._pruned_at < PRUNE_INTERVAL:
+            return
+        self._pruned_at = now
+        with self._db:
+            pruned = self._db.execute("DELETE FROM events WHERE at < ?", (now - self._retention,)).rowcount
+        with self._lock:
+            self._pruned += pruned
+
+    def _run(self):
+        self._db = self._connect()
+        stopping = False
+        while not stopping:
+            rows = [self._queue.get()]
+            # Write whatever else has built up in the same transaction.
+            while not self._queue.empty() and len(rows) < 500:
+                rows.append(self._queue.get_nowait())
+            if _STOP in rows:
+                rows.remove(_STOP)
+                stopping = True
+            try:
+                if rows:
+                    self._write(rows)
+                self._prune()
+            except sqlite3.Error as err:
+                _LOGGER.debug(f"event history write failed: {err}")
+                with self._lock:
+                    self._errors += 1
+        self._db.close()
+        self._db = None
+
+    def query(self, start=None, end=None, events=None, device_ids=None, object_type=None,
+              limit=DEFAULT_LIMIT):
+        """Events between `start` and `end`, newest first.
+
+        This blocks; run it in an executor.
+        """
+        where, args = [], []
+        if start is not None:
+            where.append("at >= ?")
+            args.append(start)
+        if end is not None:
+            where.append("at < ?")
+            args.append(end)
+        for column, values in (("event", events), ("device_id", device_ids)):
+            if values:
+                where.append(f"{column} IN ({', '.join('?' * len(values))})")
+                args.extend(values)
+        if object_type is not None:
+            where.append("object_type = ?")
+            args.append(object_type)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY at DESC LIMIT ?"
+        args.append(limit)
+
+        db = self._connect()
+        try:
+            return [dict(zip(COLUMNS, row)) for row in db.execute(sql, args)]
+        finally:
+            db.close()
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "filename": self._filename,
+                "retention": self._retention,
+                "written": self._written,
+                "pending": self._queue.qsize(),
+                "dropped": self._dropped,
+                "pruned": self._pruned,
+                "errors": self._errors,
+            }
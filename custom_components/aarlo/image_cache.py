@@ -0,0 +1,197 @@
+"""
+Store of camera images.
+
+Every consumer of a camera's last image, `camera_image`, the snapshot
+websocket and `save_updates_to`, reads it from one `ArloImageStore`. The
+store keeps a reference to the `bytes` pyaarlo handed us, it never copies
+it, and gives each new image a generation id.
+
+Dashboards ask for small tiles but Arlo hands us full resolution images. We
+scale each image once per size bucket and keep the result until a new image
+arrives.
+
+The scaling itself is done by the caller.
+"""
+
+import collections
+import threading
+
+
+# Requested sizes are rounded up to one of these. Anything bigger than the
+# largest bucket gets the full image.
+WIDTH_BUCKETS = (320, 640, 1280)
+HEIGHT_BUCKETS = (180, 360, 720)
+
+
+def _round_up(value, buckets):
+    if value is None or value <= 0:
+        return 0
+    for bucket in buckets:
+        if value <= bucket:
+            return bucket
+    return None
+
+
+def image_bucket(width=None, height=None):
+    """Map a requested size to a cache bucket.
+
+    Returns a `(width, height)` tuple, with 0 meaning "don't care", or `None`
+    if the full size image should be used.
+    """
+    if not width and not height:
+        return None
+    bucket_width = _round_up(width, WIDTH_BUCKETS)
+    bucket_height = _round_up(height, HEIGHT_BUCKETS)
+    if bucket_width is None or bucket_height is None:
+        return None
+    return bucket_width, bucket_height
+
+
+class ArloImageVariants(object):
+    """Per camera store of scaled images.
+
+    Variants are keyed by the image they were made from, its generation id,
+    and a bucket. When the image changes all variants are dropped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._source = None
+        self._variants = {}
+
+    def evict(self, source=None):
+        """Drop all variants, `source` becomes the current image source."""
+        with self._lock:
+            self._source = source
+            self._variants = {}
+
+    def get(self, source, bucket):
+        with self._lock:
+            if source != self._source:
+                return None
+            return self._variants.get(bucket)
+
+    def put(self, source, bucket, image):
+        """Store a variant.
+
+        Variants of an image that has already been replaced are ignored.
+        """
+        with self._lock:
+            if self._source is None:
+                self._source = source
+            if source != self._source:
+                return False
+            self._variants[bucket] = image
+            return True
+
+    @property
+    def source(self):
+        return self._source
+
+    @property
+    def count(self):
+        with self._lock:
+            return len(self._variants)
+
+    @property
+    def size(self):
+        """Total bytes held by the variants."""
+        with self._lock:
+            return sum(len(image) for image in self._variants.values())
+
+
+# One camera's last image. `data` is immutable and shared by every reader.
+ArloImage = collections.namedtuple("ArloImage", ["generation", "source", "data"])
+
+
+class ArloImageStore(object):
+    """The last image of every camera, and its scaled variants.
+
+    Generation ids increase across all cameras and are never reused so a
+    reader can tell if the image it's holding is still current.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._images = {}
+        self._variants = {}
+
+    def put(self, device_id, source, data):
+        """Make `data` the camera's current image and return it.
+
+        Handing back the image already stored doesn't start a new
+        generation, pyaarlo repeats itself after a snapshot.
+        """
+        if data is None:
+            return None
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        with self._lock:
+            current = self._images.get(device_id)
+            if current is not None and current.data is data:
+                if source and source != current.source:
+                    current = current._replace(source=source)
+                    self._images[device_id] = current
+                return current
+            self._generation += 1
+            image = ArloImage(self._generation, source, data)
+            self._images[device_id] = image
+            # Evict under our lock so a newer image can't be evicted first.
+            self._variants.setdefault(device_id, ArloImageVariants()).evict(image.generation)
+        return image
+
+    def get(self, device_id):
+        with self._lock:
+            return self._images.get(device_id)
+
+    def view(self, device_id):
+        """A zero copy view of the current image, or `None`."""
+        image = self.get(device_id)
+        return memoryview(image.data) if image is not None else None
+
+    def get_variant(self, device_id, generation, bucket):
+        with self._lock:
+            variants = self._variants.get(device_id)
+        return variants.get(generation, bucket) if variants is not None else None
+
+    def put_variant(self, device_id, generation, bucket, data):
+        with self._lock:
+            variants = self._variants.get(device_id)
+        return variants.put(generation, bucket, data) if variants is not None else False
+
+    def remove(self, device_id):
+        with self._lock:
+            self._images.pop(device_id, None)
+            self._variants.pop(device_id, None)
+
+    @property
+    def size(self):
+        """Total bytes held, full images and variants."""
+        with self._lock:
+            images = list(self._images.values())
+            variants = list(self._variants.values())
+        return sum(len(image.data) for image in images) + sum(variant.size for variant in variants)
+
+    def as_dict(self):
+        with self._lock:
+            generation = self._generation
+            images = dict(self._images)
+            variants = dict(self._variants)
+        cameras = {
+            device_id: {
+                "generation": image.generation,
+                "source": image.source,
+                "bytes": len(image.data),
+                "variants": variants[device_id].count if device_id in variants else 0,
+                "variant_bytes": variants[device_id].size if device_id in variants else 0,
+            }
+            for device_id, image in images.items()
+        }
+        return {
+            "generation": generation,
+            "images": len(cameras),
+            "image_bytes": sum(camera["bytes"] for camera in cameras.values()),
+            "variant_bytes": sum(camera["variant_bytes"] for camera in cameras.values()),
+            "cameras": cameras,
+        }
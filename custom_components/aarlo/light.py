@@ -43,6 +43,7 @@ from pyaarlo.constant import (
     SPOTLIGHT_KEY,
 )
 
+from .commands import PRIORITY_CONTROL
 from .const import (
     ATTR_BATTERY_TECH,
     ATTR_CHARGER_TYPE,
@@ -52,8 +53,9 @@ from .const import (
     COMPONENT_DATA,
     COMPONENT_DOMAIN,
     CONF_ADD_AARLO_PREFIX,
+    UNRECORDED_ATTRIBUTES,
 )
-from .utils import to_bool
+from .utils import async_run_command, lean_attributes, to_bool, trim_attributes
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -93,6 +95,7 @@ async def async_setup_entry(
 
 class ArloLight(LightEntity):
 
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES | frozenset({ATTR_BATTERY_TECH, ATTR_CHARGER_TYPE})
     _attr_min_color_temp_kelvin = DEFAULT_MIN_KELVIN
     _attr_max_color_temp_kelvin = DEFAULT_MAX_KELVIN
 
@@ -100,6 +103,7 @@ class ArloLight(LightEntity):
         """Initialize an Arlo light."""
 
         self._light = light
+        self._lean_attributes = lean_attributes(aarlo_config)
 
         self._attr_name = light.name
         self._attr_unique_id = light.entity_id
@@ -157,6 +161,12 @@ class ArloLight(LightEntity):
         self._light.turn_off()
         self._attr_is_on = False
 
+    async def async_turn_on(self, **kwargs):
+        await async_run_command(self.hass, self._light.device_id, PRIORITY_CONTROL, self.turn_on, **kwargs)
+
+    async def async_turn_off(self, **kwargs):
+        await async_run_command(self.hass, self._light.device_id, PRIORITY_CONTROL, self.turn_off, **kwargs)
+
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
@@ -181,7 +191,7 @@ class ArloLight(LightEntity):
             "device_model": self._light.model_id,
         })
 
-        return attrs
+        return trim_attributes(attrs, self._lean_attributes)
 
 
 class ArloNightLight(ArloLight):
@@ -0,0 +1,107 @@
+"""
+Rate limit the requests we make to Arlo.
+
+A dashboard full of cameras refreshing at once, plus a few automations, can
+send a burst of stream, snapshot and mode requests. Arlo throttles bursts and
+will sometimes drop the session. So every command first takes a token from a
+bucket for its class. Each class has its own rate and burst size. When a
+bucket is empty the command waits for a token; nothing is dropped.
+
+Safety commands, sirens, have no bucket. They are sent to every siren at
+once under a deadline and holding any of them back would miss it.
+"""
+
+import asyncio
+import threading
+import time
+
+
+# Requests per second and burst size for each command class. Classes not
+# listed aren't limited.
+DEFAULT_BUDGETS = {
+    "control": (1.0, 5),
+    "media": (0.5, 4),
+}
+
+
+class ArloTokenBucket(object):
+    """A token bucket that hands out reservations.
+
+    `reserve` always takes a token, letting the bucket go negative, and returns
+    how long the caller has to wait before using it. Callers are served in the
+    order they asked.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self.rate = max(0.001, float(rate))
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+        self.acquired = 0
+        self.throttled = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.acquired += 1
+            if delay > 0:
+                self.throttled += 1
+                self.total_delay += delay
+                self.max_delay = max(self.max_delay, delay)
+            return delay
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def as_dict(self):
+        tokens = self.tokens
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(tokens, 3),
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "total_delay": round(self.total_delay, 3),
+            "max_delay": round(self.max_delay, 3),
+        }
+
+
+class ArloRateLimiter(object):
+    """One token bucket per command class."""
+
+    def __init__(self, rates=None, clock=time.monotonic):
+        rates = rates or {}
+        self._buckets = {
+            name: ArloTokenBucket(rates.get(name, rate), burst, clock)
+            for name, (rate, burst) in DEFAULT_BUDGETS.items()
+        }
+
+    def reserve(self, name):
+        """Take a token for `name`, return how long to wait before using it."""
+        bucket = self._buckets.get(name)
+        return bucket.reserve() if bucket is not None else 0.0
+
+    async def async_acquire(self, name):
+        """Wait until a `name` request can be sent."""
+        delay = self.reserve(name)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def as_dict(self):
+        return {name: bucket.as_dict() for name, bucket in self._buckets.items()}
@@ -28,6 +28,7 @@ from homeassistant.config_entries import ConfigEntry
 
 from pyaarlo.constant import MEDIA_PLAYER_KEY
 
+from .commands import PRIORITY_CONTROL
 from .const import (
     COMPONENT_ATTRIBUTION,
     COMPONENT_BRAND,
@@ -35,7 +36,9 @@ from .const import (
     COMPONENT_DATA,
     COMPONENT_DOMAIN,
     CONF_ADD_AARLO_PREFIX,
+    UNRECORDED_ATTRIBUTES,
 )
+from .utils import async_run_command, lean_attributes, trim_attributes
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -88,6 +91,8 @@ async def async_setup_entry(
 class ArloMediaPlayer(MediaPlayerEntity):
     """Representation of an arlo media player."""
 
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES
+
     def __init__(self, device, aarlo_config):
         """Initialize an Arlo media player."""
 
@@ -95,6 +100,7 @@ class ArloMediaPlayer(MediaPlayerEntity):
         self._position = 0
         self._track_id = None
         self._playlist = []
+        self._lean_attributes = lean_attributes(aarlo_config)
 
         self._attr_name = device.name
         self._attr_unique_id = device.entity_id
@@ -206,14 +212,41 @@ class ArloMediaPlayer(MediaPlayerEntity):
         self._device.play_track()
         self._attr_state = MediaPlayerState.PLAYING
 
+    async def _async_command(self, func, *args, **kwargs):
+        await async_run_command(self.hass, self._device.device_id, PRIORITY_CONTROL, func, *args, **kwargs)
+
+    async def async_set_shuffle(self, shuffle):
+        await self._async_command(self.set_shuffle, shuffle)
+
+    async def async_media_previous_track(self):
+        await self._async_command(self.media_previous_track)
+
+    async def async_media_next_track(self):
+        await self._async_command(self.media_next_track)
+
+    async def async_mute_volume(self, mute):
+        await self._async_command(self.mute_volume, mute)
+
+    async def async_set_volume_level(self, volume):
+        await self._async_command(self.set_volume_level, volume)
+
+    async def async_media_play(self):
+        await self._async_command(self.media_play)
+
+    async def async_media_pause(self):
+        await self._async_command(self.media_pause)
+
+    async def async_play_media(self, media_type, media_id, **kwargs):
+        await self._async_command(self.play_media, media_type, media_id, **kwargs)
+
     @property
     def extra_state_attributes(self):
         """Return the device state attributes."""
-        return {
+        return trim_attributes({
             ATTR_ATTRIBUTION: COMPONENT_ATTRIBUTION,
             "name": self._attr_name,
             "device_brand": COMPONENT_BRAND,
             "device_name": self._device.name,
             "device_id": self._device.device_id,
             "device_model": self._device.model_id,
-        }
+        }, self._lean_attributes)
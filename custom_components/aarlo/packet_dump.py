@@ -0,0 +1,222 @@
+"""
+Save Arlo packets without getting in the way.
+
+pyaarlo's own `dump` appends every packet, pretty printed, to a file that
+never stops growing and it does so on the event thread. This writer is
+cheap enough to leave on:
+
+- packets are queued and written by a thread of our own; when the queue is
+  full packets are dropped and counted rather than holding up events
+- only `sample` of the packets are kept, 1.0 keeps them all
+- records are length framed JSON, `{"at": <seconds>, "packet": {...}}`,
+  inside a gzip stream; the stream is flushed after `flush_records` records
+  or `flush_interval` seconds, whichever comes first, so a crash loses very
+  little without paying for a flush on every packet
+- the file is rotated once it reaches `max_size` bytes or `max_age` seconds
+  and `backups` old files are kept; `packets.dump.gz.1` is the newest
+
+`replay.load_packets` reads the files back.
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import struct
+import threading
+import time
+
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 10 * 1024 * 1024
+DEFAULT_MAX_AGE = 24 * 60 * 60
+DEFAULT_BACKUPS = 5
+DEFAULT_SAMPLE = 1.0
+DEFAULT_QUEUE = 1000
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_FLUSH_RECORDS = 100
+
+FRAME = struct.Struct(">I")
+
+_STOP = object()
+
+
+def encode_record(at, packet):
+    """One length framed record."""
+    data = json.dumps({"at": at, "packet": packet}, separators=(",", ":"), default=str).encode()
+    return FRAME.pack(len(data)) + data
+
+
+class ArloPacketDump(object):
+    """A size and age rotated, compressed packet log written by its own thread."""
+
+    def __init__(self, filename, max_size=DEFAULT_MAX_SIZE, max_age=DEFAULT_MAX_AGE,
+                 backups=DEFAULT_BACKUPS, sample=DEFAULT_SAMPLE, max_queue=DEFAULT_QUEUE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, flush_records=DEFAULT_FLUSH_RECORDS,
+                 clock=time.time, rand=random.random):
+        self._filename = filename
+        self._max_size = max_size
+        self._max_age = max_age
+        self._backups = max(0, backups)
+        self._sample = min(1.0, max(0.0, sample))
+        self._flush_interval = max(0.0, flush_interval)
+        self._flush_records = max(1, flush_records)
+        self._clock = clock
+        self._rand = rand
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._thread = None
+
+        self._raw = None
+        self._gzip = None
+        self._opened_at = 0.0
+        self._unflushed = 0
+        self._flush_at = 0.0
+
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._written = 0
+        self._dropped = 0
+        self._skipped = 0
+        self._rotations = 0
+        self._errors = 0
+
+    @property
+    def filename(self):
+        return self._filename
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="ArloPacketDump", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Write what's queued, close the file and wait for the thread.
+
+        Waits at most `timeout` seconds; if the writer can't keep up what's
+        left in the queue is lost.
+        """
+        if self._thread is None:
+            return
+        give_up_at = time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            _LOGGER.warning("packet dump writer isn't keeping up, not waiting for it")
+        else:
+            self._thread.join(max(0.0, give_up_at - time.monotonic()))
+        self._thread = None
+
+    def write(self, packet):
+        """Queue a packet. Never blocks; returns False if it wasn't kept."""
+        if self._sample < 1.0 and self._rand() >= self._sample:
+            with self._lock:
+                self._skipped += 1
+            return False
+        try:
+            self._queue.put_nowait((self._clock(), packet))
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+        with self._lock:
+            self._queued += 1
+        return True
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self._filename) or ".", exist_ok=True)
+        self._raw = open(self._filename, "ab")
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="ab")
+        self._opened_at = self._clock()
+
+    def _close(self):
+        gzip_file, raw, self._gzip, self._raw = self._gzip, self._raw, None, None
+        self._unflushed = 0
+        if gzip_file is not None:
+            try:
+                gzip_file.close()
+            finally:
+                raw.close()
+
+    def _needs_rotation(self):
+        if self._raw is None:
+            return False
+        if self._max_size and self._raw.tell() >= self._max_size:
+            return True
+        return bool(self._max_age) and self._clock() - self._opened_at >= self._max_age
+
+    def _rotate(self):
+        self._close()
+        if self._backups == 0:
+            os.remove(self._filename)
+        else:
+            for i in range(self._backups - 1, 0, -1):
+                older = f"{self._filename}.{i}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self._filename}.{i + 1}")
+            os.replace(self._filename, f"{self._filename}.1")
+        with self._lock:
+            self._rotations += 1
+
+    def _write(self, at, packet):
+        if self._needs_rotation():
+            self._rotate()
+        if self._gzip is None:
+            self._open()
+        self._gzip.write(encode_record(at, packet))
+        if self._unflushed == 0:
+            self._flush_at = time.monotonic() + self._flush_interval
+        self._unflushed += 1
+        with self._lock:
+            self._written += 1
+
+    def _flush_in(self):
+        """How long until the unflushed records are due out, None if there aren't any."""
+        if self._unflushed == 0:
+            return None
+        if self._unflushed >= self._flush_records:
+            return 0.0
+        return max(0.0, self._flush_at - time.monotonic())
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self._flush_in())
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            try:
+                if item is not None:
+                    self._write(*item)
+                if self._flush_in() == 0.0:
+                    self._gzip.flush()
+                    self._unflushed = 0
+            except Exception as err:
+                _LOGGER.debug(f"packet dump failed: {err}")
+                with self._lock:
+                    self._errors += 1
+                self._safe_close()
+        self._safe_close()
+
+    def _safe_close(self):
+        try:
+            self._close()
+        except Exception as err:
+            _LOGGER.debug(f"packet dump close failed: {err}")
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "filename": self._filename,
+                "sample": self._sample,
+                "queued": self._queued,
+                "written": self._written,
+                "pending": self._queue.qsize(),
+                "dropped": self._dropped,
+                "skipped": self._skipped,
+                "rotations": self._rotations,
+                "errors": self._errors,
+            }
@@ -0,0 +1,153 @@
+"""
+Keep camera images fresh without flattening batteries.
+
+Cameras with a refresh interval get a snapshot requested every interval.
+Each snapshot wakes the camera so battery cameras get a daily budget of
+wake ups:
+
+- wired or charging cameras have no limit
+- other cameras get `budget` wake ups a day at full charge, scaled down
+  with the battery level, and none once it drops to `CRITICAL_BATTERY`
+
+The interval is stretched to fit the budget. Cameras are spread across their
+interval, by a hash of their id, and no two refreshes happen within
+`spacing` seconds of each other. A camera whose image is newer than its
+interval, from a capture say, is left alone until that image is due a
+refresh.
+"""
+
+import collections
+import threading
+import time
+import zlib
+
+
+DAY = 24 * 60 * 60
+
+DEFAULT_BUDGET = 48
+DEFAULT_SPACING = 10
+CRITICAL_BATTERY = 10
+
+
+def daily_budget(budget, battery_level=None, is_charging=False, has_charger=False):
+    """How many wake ups a day a camera can have, `None` means no limit."""
+    if has_charger or is_charging:
+        return None
+    if battery_level is None:
+        return budget
+    if battery_level <= CRITICAL_BATTERY:
+        return 0
+    return max(1, int(budget * min(battery_level, 100) / 100))
+
+
+class ArloRefreshScheduler(object):
+    """When to refresh each camera's image."""
+
+    def __init__(self, budget=DEFAULT_BUDGET, spacing=DEFAULT_SPACING, clock=time.time):
+        self._lock = threading.Lock()
+        self._budget = budget
+        self._spacing = spacing
+        self._clock = clock
+        self._cameras = {}
+        self._last_wake = None
+
+    def add(self, camera_id, interval):
+        """Refresh `camera_id` every `interval` seconds; 0 stops refreshing."""
+        with self._lock:
+            if not interval:
+                self._cameras.pop(camera_id, None)
+                return
+            offset = zlib.crc32(camera_id.encode()) % 1000 / 1000 * interval
+            self._cameras[camera_id] = {
+                "interval": interval,
+                "next": self._clock() + offset,
+                "image_at": None,
+                "budget": self._budget,
+                "wakes": collections.deque(),
+                "skipped": 0,
+            }
+
+    def remove(self, camera_id):
+        with self._lock:
+            self._cameras.pop(camera_id, None)
+
+    def image_updated(self, camera_id):
+        with self._lock:
+            camera = self._cameras.get(camera_id)
+            if camera is not None:
+                camera["image_at"] = self._clock()
+
+    def next_refresh(self, camera_id):
+        with self._lock:
+            camera = self._cameras.get(camera_id)
+            return camera["next"] if camera is not None else None
+
+    @staticmethod
+    def _interval(camera):
+        """The configured interval, stretched to fit the budget."""
+        budget = camera["budget"]
+        if budget is None:
+            return camera["interval"]
+        if budget == 0:
+            return None
+        return max(camera["interval"], DAY / budget)
+
+    def due(self, power=None):
+        """Which cameras to refresh now.
+
+        `power(camera_id)` returns `(battery_level, is_charging, has_charger)`.
+        The cameras returned count as woken.
+        """
+        now = self._clock()
+        refresh = []
+        with self._lock:
+            for camera_id, camera in sorted(self._cameras.items(), key=lambda item: item[1]["next"]):
+                if camera["next"] > now:
+                    continue
+                if power is not None:
+                    camera["budget"] = daily_budget(self._budget, *power(camera_id))
+                interval = self._interval(camera)
+                if interval is None:
+                    camera["next"] = now + camera["interval"]
+                    camera["skipped"] += 1
+                    continue
+
+                # A recent capture is as good as a refresh.
+                if camera["image_at"] is not None and now - camera["image_at"] < interval:
+                    camera["next"] = camera["image_at"] + interval
+                    camera["skipped"] += 1
+                    continue
+
+                # Out of wake ups; wait for the oldest to be a day old.
+                wakes = camera["wakes"]
+                while wakes and wakes[0] <= now - DAY:
+                    wakes.popleft()
+                if camera["budget"] is not None and len(wakes) >= camera["budget"]:
+                    camera["next"] = wakes[0] + DAY
+                    continue
+
+                # One camera at a time.
+                if self._last_wake is not None and now - self._last_wake < self._spacing:
+                    camera["next"] = self._last_wake + self._spacing
+                    continue
+
+                wakes.append(now)
+                camera["next"] = now + interval
+                self._last_wake = now
+                refresh.append(camera_id)
+        return refresh
+
+    def as_dict(self):
+        day_ago = self._clock() - DAY
+        with self._lock:
+            return {
+                camera_id: {
+                    "interval": camera["interval"],
+                    "effective_interval": self._interval(camera),
+                    "budget": camera["budget"],
+                    "wakes_today": sum(1 for wake in camera["wakes"] if wake > day_ago),
+                    "skipped": camera["skipped"],
+                    "next": camera["next"],
+                }
+                for camera_id, camera in self._cameras.items()
+            }
@@ -0,0 +1,67 @@
+"""
+Quick lookup of Aarlo entities.
+
+Services and websockets are passed entity ids. Rather than search the Home
+Assistant entity components every time we keep a map of entity id to the
+Aarlo entity and the pyaarlo device behind it. Entities add themselves when
+they are added to Home Assistant and remove themselves when they go.
+"""
+
+import threading
+
+
+class ArloEntityRegistry(object):
+    """Map of entity id to (entity, device)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entities = {}
+
+    def add(self, entity_id, entity, device):
+        with self._lock:
+            self._entities[entity_id] = (entity, device)
+
+    def remove(self, entity_id, entity=None):
+        """Remove an entity.
+
+        If `entity` is given the entry is only removed if it still belongs to
+        that entity.
+        """
+        with self._lock:
+            current = self._entities.get(entity_id)
+            if current is None:
+                return
+            if entity is not None and current[0] is not entity:
+                return
+            del self._entities[entity_id]
+
+    def _lookup(self, entity_id, domains):
+        if domains is not None:
+            domains = domains if isinstance(domains, (list, tuple, set)) else [domains]
+            if entity_id.split(".", 1)[0] not in domains:
+                return None
+        return self._entities.get(entity_id)
+
+    def entity(self, entity_id, domains=None):
+        """Return the entity, optionally checking it is in one of `domains`."""
+        found = self._lookup(entity_id, domains)
+        return found[0] if found is not None else None
+
+    def device(self, entity_id, domains=None):
+        """Return the pyaarlo device behind the entity."""
+        found = self._lookup(entity_id, domains)
+        return found[1] if found is not None else None
+
+    def entities(self, domains=None):
+        with self._lock:
+            items = list(self._entities.items())
+        return [
+            entity for entity_id, (entity, _device) in items
+            if self._lookup(entity_id, domains) is not None
+        ]
+
+    def __contains__(self, entity_id):
+        return entity_id in self._entities
+
+    def __len__(self):
+        return len(self._entities)
@@ -0,0 +1,294 @@
+"""
+Replay recorded Arlo event streams.
+
+`inject_response` feeds a single packet. This reads whole recordings and
+feeds them back either as fast as possible or with the gaps they were
+recorded with, so the callback path can be exercised and measured with a
+realistic stream. Recordings are read a packet at a time, so long ones
+don't have to fit in memory.
+
+Three formats are understood:
+
+- the `packet_dump` file pyaarlo writes; each packet is preceded by
+  `YYYY-MM-DD HH:MM:SS.ffffff: ` and pretty printed, possibly over several
+  lines
+- JSON; a list of packets, or one packet per line. A packet can be wrapped
+  as `{"at": <seconds>, "packet": {...}}` to give it a time
+- what `packet_dump.ArloPacketDump` writes; gzip compressed, length framed
+  JSON records in the wrapped form above
+"""
+
+import ast
+import asyncio
+import itertools
+import json
+import os
+import re
+import struct
+import time
+import zlib
+from datetime import datetime
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+FRAME = struct.Struct(">I")
+CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 100
+DUMP_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+DUMP_LINE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+): ?(.*)$")
+
+
+def _dump_entry(stamp, text):
+    """Turn one dump entry into (seconds, packet), None if it isn't a packet."""
+    try:
+        packet = ast.literal_eval(text.strip())
+    except (ValueError, SyntaxError):
+        return None
+    if not isinstance(packet, dict):
+        return None
+    return datetime.strptime(stamp, DUMP_TIME_FORMAT).timestamp(), packet
+
+
+def iter_packet_dump(lines):
+    """Parse pyaarlo packet dump lines into (seconds, packet) as they are read."""
+    stamp, entry = None, []
+    for line in lines:
+        match = DUMP_LINE.match(line)
+        if match is None:
+            entry.append(line)
+            continue
+        if stamp is not None:
+            packet = _dump_entry(stamp, "\n".join(entry))
+            if packet is not None:
+                yield packet
+        stamp, entry = match.group(1), [match.group(2)]
+    if stamp is not None:
+        packet = _dump_entry(stamp, "\n".join(entry))
+        if packet is not None:
+            yield packet
+
+
+def parse_packet_dump(text):
+    """Parse a pyaarlo packet dump into a list of (seconds, packet)."""
+    return list(iter_packet_dump(text.splitlines()))
+
+
+def _json_entry(entry):
+    if isinstance(entry, dict) and "packet" in entry:
+        return entry.get("at"), entry["packet"]
+    return None, entry
+
+
+def parse_packet_json(text):
+    """Parse a JSON recording into a list of (seconds or None, packet)."""
+    text = text.strip()
+    if not text:
+        return []
+    try:
+        entries = json.loads(text)
+    except ValueError:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if not isinstance(entries, list):
+        entries = [entries]
+    return [_json_entry(entry) for entry in entries]
+
+
+def parse_packets(text):
+    """Parse either text recording format."""
+    for line in text.splitlines():
+        if line.strip():
+            if DUMP_LINE.match(line):
+                return parse_packet_dump(text)
+            break
+    return parse_packet_json(text)
+
+
+def gunzip(data):
+    """Undo gzip, member by member; the last member may not be finished."""
+    return b"".join(_iter_gunzip([data]))
+
+
+def _iter_gunzip(chunks):
+    """Undo gzip a chunk at a time; the last member may not be finished."""
+    decompressor = zlib.decompressobj(wbits=31)
+    for data in chunks:
+        while data:
+            try:
+                yield decompressor.decompress(data)
+            except zlib.error:
+                return
+            if not decompressor.eof:
+                break
+            # On to the next member.
+            data = decompressor.unused_data
+            decompressor = zlib.decompressobj(wbits=31)
+
+
+def _iter_records(chunks):
+    """Split a stream of bytes into length framed records."""
+    buffer = b""
+    for data in chunks:
+        buffer += data
+        offset = 0
+        while offset + FRAME.size <= len(buffer):
+            (length,) = FRAME.unpack_from(buffer, offset)
+            if offset + FRAME.size + length > len(buffer):
+                break
+            offset += FRAME.size
+            yield _json_entry(json.loads(buffer[offset:offset + length]))
+            offset += length
+        buffer = buffer[offset:]
+
+
+def parse_packet_records(data):
+    """Parse length framed records into a list of (seconds, packet).
+
+    A record cut short, by a crash say, is ignored.
+    """
+    return list(_iter_records([data]))
+
+
+def _iter_chunks(file, size=CHUNK_SIZE):
+    while True:
+        data = file.read(size)
+        if not data:
+            return
+        yield data
+
+
+def iter_packet_file(filename):
+    """Read a recording of any format a packet at a time.
+
+    Only a JSON list has to be read in one go.
+    """
+    with open(filename, "rb") as file:
+        if file.peek(2)[:2] == GZIP_MAGIC:
+            yield from _iter_records(_iter_gunzip(_iter_chunks(file)))
+            return
+
+    with open(filename) as file:
+        first = ""
+        for first in file:
+            if first.strip():
+                break
+        if DUMP_LINE.match(first):
+            yield from iter_packet_dump(itertools.chain([first], (line.rstrip("\n") for line in file)))
+        elif first.lstrip().startswith("["):
+            yield from parse_packet_json(first + file.read())
+        else:
+            for line in itertools.chain([first], file):
+                if line.strip():
+                    yield _json_entry(json.loads(line))
+
+
+def iter_packet_files(path):
+    """Read a recording, or every recording in a directory, oldest file first."""
+    if not os.path.isdir(path):
+        yield from iter_packet_file(path)
+        return
+    filenames = [os.path.join(path, name) for name in os.listdir(path)]
+    for filename in sorted(filter(os.path.isfile, filenames), key=os.path.getmtime):
+        yield from iter_packet_file(filename)
+
+
+def load_packets(filename):
+    return list(iter_packet_file(filename))
+
+
+async def async_iter_blocking(iterator, run, batch=BATCH_SIZE):
+    """Pull from a blocking iterator `batch` items at a time using `run`.
+
+    `run(func)` should run `func` somewhere it's allowed to block, an
+    executor for example, and return its result.
+    """
+    iterator = iter(iterator)
+    while True:
+        items = await run(lambda: list(itertools.islice(iterator, batch)))
+        if not items:
+            return
+        for item in items:
+            yield item
+
+
+class LoopLagProbe(object):
+    """Wake up every `interval` seconds and note how late we were."""
+
+    def __init__(self, interval=0.005):
+        self._interval = interval
+        self._task = None
+        self.samples = 0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    async def _run(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self._interval)
+            lag = max(0.0, time.monotonic() - start - self._interval)
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+async def _aiter(packets):
+    if hasattr(packets, "__aiter__"):
+        async for packet in packets:
+            yield packet
+    else:
+        for packet in packets:
+            yield packet
+
+
+async def async_replay(packets, inject, speed=None, clock=time.monotonic, sleep=asyncio.sleep):
+    """Feed `packets`, (seconds, packet) pairs, to `inject`.
+
+    `packets` can be a list, an iterator or an async iterator so a long
+    recording doesn't have to be read up front. With `speed` None packets
+    are sent back to back. Otherwise the recorded gaps are kept, divided by
+    `speed`; so 1.0 is real time and 10.0 ten times faster. Untimed packets
+    follow the one before. `inject` can be a plain function or a coroutine
+    function.
+
+    Returns how many packets were sent, how long it took and how late the
+    latest packet was compared to the recording.
+    """
+    start = clock()
+    first = None
+    offset = 0.0
+    late = 0.0
+    count = 0
+    async for at, packet in _aiter(packets):
+        if at is not None:
+            if first is None:
+                first = at
+            offset = max(offset, at - first)
+        if speed is not None:
+            due = start + offset / speed
+            wait = due - clock()
+            if wait > 0:
+                await sleep(wait)
+            late = max(late, clock() - due)
+        result = inject(packet)
+        if asyncio.iscoroutine(result):
+            await result
+        elif speed is None:
+            # Let everything else on the loop have a turn.
+            await sleep(0)
+        count += 1
+    elapsed = clock() - start
+    return {
+        "packets": count,
+        "elapsed": elapsed,
+        "rate": count / elapsed if elapsed > 0 else None,
+        "max_late": late,
+    }
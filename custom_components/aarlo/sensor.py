@@ -16,9 +16,10 @@ from homeassistant.const import (
     CONF_MONITORED_CONDITIONS,
     UnitOfTemperature,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.config_validation import PLATFORM_SCHEMA
-from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity, EntityCategory
 from homeassistant.components.sensor import (
     DOMAIN as SENSOR_DOMAIN,
     SensorDeviceClass
@@ -39,14 +40,27 @@ from pyaarlo.constant import (
     TOTAL_CAMERAS_KEY,
 )
 
+from .activity import SITE
 from .const import (
+    COMPONENT_ACTIVITY,
     COMPONENT_ATTRIBUTION,
+    COMPONENT_BATTERY,
     COMPONENT_BRAND,
+    COMPONENT_BREAKERS,
+    COMPONENT_COMMANDS,
     COMPONENT_CONFIG,
     COMPONENT_DATA,
     COMPONENT_DOMAIN,
-    CONF_ADD_AARLO_PREFIX
+    COMPONENT_EXECUTOR,
+    COMPONENT_LIMITER,
+    COMPONENT_STATS,
+    CONF_ADD_AARLO_PREFIX,
+    CONF_DIAGNOSTIC_SENSORS,
+    SIGNAL_ACTIVITY_UPDATED,
+    SIGNAL_BATTERY_UPDATED,
+    UNRECORDED_ATTRIBUTES
 )
+from .utils import battery_devices, lean_attributes, trim_attributes
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -112,6 +126,148 @@ SENSOR_TYPES = {
     },
 }
 
+
+def _executor_saturation(hass):
+    executor = hass.data.get(COMPONENT_EXECUTOR)
+    return round(executor.saturation * 100, 1) if executor is not None else None
+
+
+def _commands_waiting(hass):
+    commands = hass.data.get(COMPONENT_COMMANDS)
+    return commands.waiting if commands is not None else None
+
+
+def _throttled_requests(hass):
+    limiter = hass.data.get(COMPONENT_LIMITER)
+    if limiter is None:
+        return None
+    return sum(bucket["throttled"] for bucket in limiter.as_dict().values())
+
+
+def _open_breakers(hass):
+    breakers = hass.data.get(COMPONENT_BREAKERS)
+    if breakers is None:
+        return None
+    return sum(1 for breaker in breakers.as_dict().values() if breaker["state"] != "closed")
+
+
+def _callbacks_received(hass):
+    stats = hass.data.get(COMPONENT_STATS)
+    if stats is None:
+        return None
+    return sum(count for name, count in stats.as_dict()["counters"].items() if name.startswith("callback/"))
+
+
+def _snapshot_success_rate(hass):
+    stats = hass.data.get(COMPONENT_STATS)
+    if stats is None:
+        return None
+    ok = stats.counter("snapshot/ok")
+    total = ok + stats.counter("snapshot/failed")
+    return round(ok * 100 / total, 1) if total else None
+
+
+# Supported diagnostic sensors
+#  sensor_type: Home Assistant sensor type
+#    description: What the sensor does.
+#    units: Measurement unit.
+#    icon: Default ICON to use.
+#    value: Function returning the current value.
+DIAGNOSTIC_SENSOR_TYPES = {
+    "executor_saturation": {
+        "description": "Aarlo Executor Saturation",
+        "units": "%",
+        "icon": "mdi:gauge",
+        "value": _executor_saturation,
+    },
+    "commands_waiting": {
+        "description": "Aarlo Commands Waiting",
+        "icon": "mdi:tray-full",
+        "value": _commands_waiting,
+    },
+    "throttled_requests": {
+        "description": "Aarlo Throttled Requests",
+        "icon": "mdi:speedometer-slow",
+        "value": _throttled_requests,
+    },
+    "open_breakers": {
+        "description": "Aarlo Open Circuit Breakers",
+        "icon": "mdi:electric-switch",
+        "value": _open_breakers,
+    },
+    "callbacks_received": {
+        "description": "Aarlo Callbacks Received",
+        "icon": "mdi:call-received",
+        "value": _callbacks_received,
+    },
+    "snapshot_success_rate": {
+        "description": "Aarlo Snapshot Success Rate",
+        "units": "%",
+        "icon": "mdi:camera-iris",
+        "value": _snapshot_success_rate,
+    },
+}
+
+# Supported activity sensors, one per camera and one for the site
+#  sensor_type: Home Assistant sensor type
+#    description: What the sensor does.
+#    icon: Default ICON to use.
+#    value: Which count from the activity summary to show.
+#    object_type: Show the last day's count of this object type instead.
+ACTIVITY_SENSOR_TYPES = {
+    "captures_last_hour": {
+        "description": "Captures Last Hour",
+        "icon": "mdi:file-video",
+        "value": "last_hour",
+    },
+    "captures_last_day": {
+        "description": "Captures Last Day",
+        "icon": "mdi:file-video",
+        "value": "last_day",
+    },
+    "people_last_day": {
+        "description": "People Last Day",
+        "icon": "mdi:walk",
+        "object_type": "Person",
+    },
+    "vehicles_last_day": {
+        "description": "Vehicles Last Day",
+        "icon": "mdi:car",
+        "object_type": "Vehicle",
+    },
+    "animals_last_day": {
+        "description": "Animals Last Day",
+        "icon": "mdi:paw",
+        "object_type": "Animal",
+    },
+    "packages_last_day": {
+        "description": "Packages Last Day",
+        "icon": "mdi:package-variant-closed",
+        "object_type": "Package",
+    },
+}
+
+# Supported battery estimate sensors, one per battery device
+#  sensor_type: Home Assistant sensor type
+#    description: What the sensor does.
+#    units: Measurement unit.
+#    icon: Default ICON to use.
+#    value: Which value from the battery estimate to show.
+BATTERY_SENSOR_TYPES = {
+    "battery_drain": {
+        "description": "Battery Drain",
+        "units": "%/d",
+        "icon": "mdi:battery-minus",
+        "value": "drain_per_day",
+    },
+    "battery_time_to_empty": {
+        "description": "Battery Time To Empty",
+        "units": "d",
+        "icon": "mdi:battery-clock",
+        "value": "days_to_empty",
+    },
+}
+
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Required(CONF_MONITORED_CONDITIONS, default=list(SENSOR_TYPES)):
         vol.All(cv.ensure_list, [vol.In(SENSOR_TYPES)])
@@ -152,17 +308,36 @@ async def async_setup_entry(
                 if sensor.has_capability(sensor_value["key"]):
                     sensors.append(ArloSensor(arlo, sensor, aarlo_config, sensor_type, sensor_value))
 
+    if hass.data.get(COMPONENT_ACTIVITY) is not None:
+        for sensor_type, sensor_value in ACTIVITY_SENSOR_TYPES.items():
+            sensors.append(ArloActivitySensor(arlo, None, aarlo_config, sensor_type, sensor_value))
+            for camera in arlo.cameras:
+                sensors.append(ArloActivitySensor(arlo, camera, aarlo_config, sensor_type, sensor_value))
+
+    if hass.data.get(COMPONENT_BATTERY) is not None:
+        for device in battery_devices(arlo):
+            for sensor_type, sensor_value in BATTERY_SENSOR_TYPES.items():
+                sensors.append(ArloBatterySensor(device, aarlo_config, sensor_type, sensor_value))
+
+    if aarlo_config.get(CONF_DIAGNOSTIC_SENSORS, False):
+        for sensor_type, sensor_value in DIAGNOSTIC_SENSOR_TYPES.items():
+            sensors.append(ArloDiagnosticSensor(arlo, aarlo_config, sensor_type, sensor_value))
+
     async_add_entities(sensors)
 
 
 class ArloSensor(Entity):
     """An implementation of a Netgear Arlo IP sensor."""
 
+    # The last capture's links are signed and change every time.
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES | frozenset({"video_url", "thumbnail_url"})
+
     def __init__(self, arlo, device, aarlo_config, sensor_type, sensor_value):
         """Initialize an Arlo sensor."""
 
         self._sensor_type = sensor_type
         self._main_attr = sensor_value["key"]
+        self._lean_attributes = lean_attributes(aarlo_config)
 
         if device is None:
             self._attr_name = sensor_value["description"]
@@ -224,4 +399,174 @@ class ArloSensor(Entity):
             else:
                 attrs["object_type"] = None
 
-        return attrs
+        return trim_attributes(attrs, self._lean_attributes)
+
+
+class ArloDiagnosticSensor(Entity):
+    """A sensor showing one of Aarlo's internal counters."""
+
+    def __init__(self, arlo, aarlo_config, sensor_type, sensor_value):
+        """Initialize an Aarlo diagnostic sensor."""
+
+        self._value = sensor_value["value"]
+
+        self._attr_name = sensor_value["description"]
+        self._attr_unique_id = f"diagnostic_{sensor_type}"
+        if aarlo_config.get(CONF_ADD_AARLO_PREFIX, True):
+            self.entity_id = f"{SENSOR_DOMAIN}.{COMPONENT_DOMAIN}_{self._attr_unique_id}"
+
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_icon = sensor_value.get("icon", None)
+        self._attr_unit_of_measurement = sensor_value.get("units", None)
+        self._attr_should_poll = True
+        self._attr_state = None
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(COMPONENT_DOMAIN, arlo.device_id)},
+            manufacturer=COMPONENT_BRAND,
+        )
+
+        _LOGGER.info(f"ArloDiagnosticSensor: {self._attr_name} created")
+
+    async def async_update(self):
+        self._attr_state = self._value(self.hass)
+
+
+class ArloActivitySensor(Entity):
+    """Captures counted locally, for a camera or the whole site."""
+
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES
+
+    def __init__(self, arlo, device, aarlo_config, sensor_type, sensor_value):
+        """Initialize an Aarlo activity sensor."""
+
+        self._value = sensor_value.get("value")
+        self._object_type = sensor_value.get("object_type")
+        self._lean_attributes = lean_attributes(aarlo_config)
+
+        if device is None:
+            self._attr_name = sensor_value["description"]
+            self._attr_unique_id = sensor_type
+            self._device = arlo
+            self._device_id = SITE
+        else:
+            self._attr_name = f"{sensor_value['description']} {device.name}"
+            self._attr_unique_id = slugify(f"{sensor_value['description']}_{device.entity_id}")
+            self._device = device
+            self._device_id = device.device_id
+
+        if aarlo_config.get(CONF_ADD_AARLO_PREFIX, True):
+            self.entity_id = f"{SENSOR_DOMAIN}.{COMPONENT_DOMAIN}_{self._attr_unique_id}"
+
+        self._attr_icon = sensor_value.get("icon", None)
+        self._attr_should_poll = False
+        self._attr_state = None
+        self._summary = {}
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(COMPONENT_DOMAIN, self._device.device_id)},
+            manufacturer=COMPONENT_BRAND,
+        )
+
+        _LOGGER.info(f"ArloActivitySensor: {self._attr_name} created")
+
+    async def async_added_to_hass(self):
+        """Follow the counts; signalled with a camera's device id or, as they age, None."""
+
+        @callback
+        def update_state(device_id):
+            if device_id is None or self._device_id in (SITE, device_id):
+                self._update()
+                self.async_write_ha_state()
+
+        self._update()
+        self.async_on_remove(async_dispatcher_connect(self.hass, SIGNAL_ACTIVITY_UPDATED, update_state))
+
+    def _update(self):
+        activity = self.hass.data.get(COMPONENT_ACTIVITY)
+        if activity is None:
+            return
+        self._summary = activity.summary(self._device_id)
+        if self._object_type is not None:
+            self._attr_state = self._summary["object_types"].get(self._object_type, 0)
+        else:
+            self._attr_state = self._summary[self._value]
+
+    @property
+    def extra_state_attributes(self):
+        """Return the device state attributes."""
+        attrs = {
+            ATTR_ATTRIBUTION: COMPONENT_ATTRIBUTION,
+            "name": self._attr_name,
+            "device_brand": COMPONENT_BRAND,
+            "device_name": self._device.name,
+            "device_id": self._device.device_id,
+            "device_model": self._device.model_id,
+        }
+        if self._value == "last_day":
+            attrs["last_week"] = self._summary.get("last_week")
+        return trim_attributes(attrs, self._lean_attributes)
+
+
+class ArloBatterySensor(Entity):
+    """How fast a device's battery is draining, worked out locally."""
+
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES
+
+    def __init__(self, device, aarlo_config, sensor_type, sensor_value):
+        """Initialize an Aarlo battery estimate sensor."""
+
+        self._device = device
+        self._value = sensor_value["value"]
+        self._lean_attributes = lean_attributes(aarlo_config)
+
+        self._attr_name = f"{sensor_value['description']} {device.name}"
+        self._attr_unique_id = slugify(f"{sensor_value['description']}_{device.entity_id}")
+        if aarlo_config.get(CONF_ADD_AARLO_PREFIX, True):
+            self.entity_id = f"{SENSOR_DOMAIN}.{COMPONENT_DOMAIN}_{self._attr_unique_id}"
+
+        self._attr_icon = sensor_value.get("icon", None)
+        self._attr_unit_of_measurement = sensor_value.get("units", None)
+        self._attr_should_poll = False
+        self._attr_state = None
+        self._charging = False
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(COMPONENT_DOMAIN, self._device.device_id)},
+            manufacturer=COMPONENT_BRAND,
+        )
+
+        _LOGGER.info(f"ArloBatterySensor: {self._attr_name} created")
+
+    async def async_added_to_hass(self):
+        """Follow the estimate; signalled with the device id of each device that changes."""
+
+        @callback
+        def update_state(device_id):
+            if device_id == self._device.device_id:
+                self._update()
+                self.async_write_ha_state()
+
+        self._update()
+        self.async_on_remove(async_dispatcher_connect(self.hass, SIGNAL_BATTERY_UPDATED, update_state))
+
+    def _update(self):
+        estimator = self.hass.data.get(COMPONENT_BATTERY)
+        if estimator is None:
+            return
+        self._charging = estimator.is_charging(self._device.device_id)
+        self._attr_state = estimator.estimate(self._device.device_id)[self._value]
+
+    @property
+    def extra_state_attributes(self):
+        """Return the device state attributes."""
+        attrs = {
+            ATTR_ATTRIBUTION: COMPONENT_ATTRIBUTION,
+            "name": self._attr_name,
+            "device_brand": COMPONENT_BRAND,
+            "device_name": self._device.name,
+            "device_id": self._device.device_id,
+            "device_model": self._device.model_id,
+            "charging": self._charging,
+        }
+        return trim_attributes(attrs, self._lean_attributes)
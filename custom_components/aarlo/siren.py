@@ -8,6 +8,7 @@ https://www.home-assistant.io/integrations/light
 
 import logging
 from collections.abc import Callable
+from functools import partial
 
 from homeassistant.components.siren import (
     DOMAIN as SIREN_DOMAIN,
@@ -26,7 +27,7 @@ from pyaarlo.constant import (
 )
 
 from .const import *
-from .utils import to_bool
+from .utils import async_fan_out_sirens, to_bool
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -105,23 +106,27 @@ class AarloSirenBase(SirenEntity):
             _LOGGER.debug(f"register siren callbacks for {siren.name}")
             siren.add_attr_callback(SIREN_STATE_KEY, update_state)
 
-    def turn_on(self, **kwargs):
+    async def async_turn_on(self, **kwargs):
         """Turn the sirens on."""
         volume = int(kwargs.get("volume_level", 1.0) * 8)
         duration = kwargs.get("duration", 10)
+        jobs = []
         for siren in self._sirens:
             _LOGGER.debug(f"{self._attr_name} {siren.name} vol={volume}, dur={duration}")
-            siren.siren_on(duration=duration, volume=volume)
+            jobs.append((siren.name, siren.device_id, partial(siren.siren_on, duration=duration, volume=volume)))
+        await async_fan_out_sirens(self.hass, jobs)
 
         # Flip us on. update_state should confirm this.
         self._attr_is_on = True
-        self.schedule_update_ha_state()
+        self.async_write_ha_state()
 
-    def turn_off(self, **kwargs):
+    async def async_turn_off(self, **kwargs):
         """Turn the sirens off."""
+        jobs = []
         for siren in self._sirens:
             _LOGGER.debug(f"{self._attr_name} {siren.name} off")
-            siren.siren_off()
+            jobs.append((siren.name, siren.device_id, siren.siren_off))
+        await async_fan_out_sirens(self.hass, jobs)
 
 
 class AarloSiren(AarloSirenBase):
@@ -0,0 +1,179 @@
+"""
+Learn how best to take a snapshot with each camera.
+
+There are three ways to get a snapshot out of a camera and which works, and
+how quickly, depends on the model:
+
+- `full_frame`; ask the idle camera for a full frame snapshot
+- `stream`; start a stream and send the snapshot command
+- `stream_thumbnail`; as `stream` but stop the stream quickly, the thumbnail
+  Arlo makes as it stops turns into the snapshot
+
+Every snapshot is timed, from the request to the new image or until the
+request times out. For each camera and method the last `window`
+outcomes are kept and the method with the lowest expected wait, the median
+time of the snapshots that worked divided by how often it works, is used.
+Methods with fewer than `min_samples` outcomes are tried first and `explore`
+of the time another method is tried to see if it has got better.
+"""
+
+import collections
+import random
+import statistics
+import threading
+import time
+
+
+METHOD_FULL_FRAME = "full_frame"
+METHOD_STREAM = "stream"
+METHOD_STREAM_THUMBNAIL = "stream_thumbnail"
+METHODS = (METHOD_FULL_FRAME, METHOD_STREAM, METHOD_STREAM_THUMBNAIL)
+
+DEFAULT_WINDOW = 20
+DEFAULT_MIN_SAMPLES = 3
+DEFAULT_EXPLORE = 0.1
+
+# How long the stream runs for a `stream_thumbnail` snapshot, in seconds.
+THUMBNAIL_STREAM_STOP = 2
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+def _answers(method, image_source):
+    """Is an image from `image_source` the snapshot `method` asked for?"""
+    if image_source.startswith("snapshot/"):
+        return True
+    # The thumbnail made as the stream stops is saved as a capture.
+    return method == METHOD_STREAM_THUMBNAIL
+
+
+class ArloSnapshotStrategy(object):
+    """Snapshot outcomes for every camera and the method each should use."""
+
+    def __init__(self, window=DEFAULT_WINDOW, min_samples=DEFAULT_MIN_SAMPLES,
+                 explore=DEFAULT_EXPLORE, clock=time.monotonic, rand=random.random):
+        self._lock = threading.Lock()
+        self._window = max(1, window)
+        self._min_samples = min_samples
+        self._explore = explore
+        self._clock = clock
+        self._rand = rand
+        self._outcomes = {}
+        self._pending = {}
+        self._requests = 0
+
+        # Called, with no arguments, whenever there is something new to save.
+        self.on_change = None
+
+    def _samples(self, device_id, method):
+        cameras = self._outcomes.setdefault(device_id, {})
+        if method not in cameras:
+            cameras[method] = collections.deque(maxlen=self._window)
+        return cameras[method]
+
+    @staticmethod
+    def _score(samples):
+        """Expected seconds to a snapshot; `None` if it has never worked."""
+        latencies = [latency for ok, latency in samples if ok]
+        if not latencies:
+            return None
+        return statistics.median(latencies) * len(samples) / len(latencies)
+
+    def _best(self, device_id):
+        cameras = self._outcomes.get(device_id, {})
+        scores = [
+            (self._score(cameras[method]), method)
+            for method in METHODS if cameras.get(method)
+        ]
+        scores = [(score, method) for score, method in scores if score is not None]
+        return min(scores)[1] if scores else None
+
+    def choose(self, device_id):
+        """Which method to use for the next snapshot."""
+        with self._lock:
+            cameras = self._outcomes.get(device_id, {})
+            for method in METHODS:
+                if len(cameras.get(method, ())) < self._min_samples:
+                    return method
+            best = self._best(device_id) or METHOD_FULL_FRAME
+            if self._rand() < self._explore:
+                others = [method for method in METHODS if method != best]
+                return others[int(self._rand() * len(others)) % len(others)]
+            return best
+
+    def best(self, device_id):
+        with self._lock:
+            return self._best(device_id)
+
+    def start(self, device_id, method):
+        """A snapshot has been asked for; returns the request for `abandon`.
+
+        A snapshot still waiting from before has failed.
+        """
+        self.abandon(device_id)
+        with self._lock:
+            self._requests += 1
+            self._pending[device_id] = (method, self._clock(), self._requests)
+            return self._requests
+
+    def finished(self, device_id, image_source):
+        """A new image arrived; returns the method used if it's the snapshot we were waiting for."""
+        with self._lock:
+            pending = self._pending.get(device_id)
+            if pending is None or not _answers(pending[0], image_source):
+                return None
+            del self._pending[device_id]
+        method, started, _request = pending
+        self.record(device_id, method, True, self._clock() - started)
+        return method
+
+    def abandon(self, device_id, request=None):
+        """Give up on the snapshot we're waiting for, it counts as a failure.
+
+        With `request` only that request is given up on; it has timed out.
+        """
+        with self._lock:
+            pending = self._pending.get(device_id)
+            if pending is None or request not in (None, pending[2]):
+                return
+            del self._pending[device_id]
+        self.record(device_id, pending[0], False)
+
+    def record(self, device_id, method, ok, latency=None):
+        with self._lock:
+            self._samples(device_id, method).append((bool(ok), round(latency, 3) if ok else None))
+        if self.on_change is not None:
+            self.on_change()
+
+    def as_dict(self):
+        """Outcomes and what they add up to; `load` reads this back."""
+        with self._lock:
+            return {
+                device_id: {
+                    "best": self._best(device_id),
+                    "methods": {
+                        method: {
+                            "samples": [list(sample) for sample in samples],
+                            "success_rate": round(sum(ok for ok, _latency in samples) / len(samples), 3),
+                            "expected": _round(self._score(samples)),
+                        }
+                        for method, samples in cameras.items() if samples
+                    },
+                }
+                for device_id, cameras in self._outcomes.items()
+            }
+
+    def load(self, data):
+        """Pick up outcomes saved by `as_dict`, ignoring anything odd."""
+        with self._lock:
+            for device_id, camera in (data or {}).items():
+                for method, saved in camera.get("methods", {}).items():
+                    if method not in METHODS:
+                        continue
+                    samples = self._samples(device_id, method)
+                    for ok, latency in saved.get("samples", []):
+                        ok = bool(ok) and isinstance(latency, (int, float))
+                        samples.append((ok, latency if ok else None))
+        return self
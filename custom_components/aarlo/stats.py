@@ -0,0 +1,82 @@
+"""
+Simple counters and timers.
+
+Used to keep track of how often things happen inside the integration and how
+long they take. Everything is keyed by a short name, for example
+`service/siren_on`.
+"""
+
+import threading
+
+
+class ArloTimer(object):
+    """Running totals for one timed operation."""
+
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "average": round(self.average, 6),
+            "max": round(self.max, 6),
+            "last": round(self.last, 6),
+        }
+
+
+class ArloStats(object):
+    """A thread safe collection of counters and timers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timers = {}
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def time(self, name, seconds):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = ArloTimer()
+            timer.add(seconds)
+
+    def counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def timer(self, name):
+        with self._lock:
+            timer = self._timers.get(name)
+            return timer.as_dict() if timer is not None else None
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+            self._timers = {}
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "counters": dict(sorted(self._counters.items())),
+                "timers": {name: timer.as_dict() for name, timer in sorted(self._timers.items())},
+            }
@@ -8,6 +8,7 @@ https://www.home-assistant.io/integrations/switch/
 
 import logging
 from collections.abc import Callable
+from functools import partial
 from typing import Any
 from datetime import datetime
 
@@ -33,8 +34,9 @@ from pyaarlo.constant import (
     SIREN_STATE_KEY
 )
 
+from .commands import PRIORITY_CONTROL, PRIORITY_MEDIA, PRIORITY_SAFETY
 from .const import *
-from .utils import to_bool
+from .utils import async_fan_out_sirens, async_run_command, lean_attributes, to_bool, trim_attributes
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -115,10 +117,14 @@ async def async_setup_entry(
 class AarloSwitch(SwitchEntity):
     """Representation of an Aarlo switch."""
 
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES
+    _command_priority: int = PRIORITY_CONTROL
+
     def __init__(self, device, aarlo_config, name, identifier, icon):
         """Initialize the Aarlo switch device."""
         
         self._device = device
+        self._lean_attributes = lean_attributes(aarlo_config)
 
         self._attr_name = name
         self._attr_unique_id = slugify(identifier)
@@ -145,17 +151,27 @@ class AarloSwitch(SwitchEntity):
         """Turn the switch off."""
         _LOGGER.debug("implement turn off")
 
+    async def async_turn_on(self, **kwargs):
+        await async_run_command(
+            self.hass, self._device.device_id, self._command_priority, self.turn_on, **kwargs
+        )
+
+    async def async_turn_off(self, **kwargs):
+        await async_run_command(
+            self.hass, self._device.device_id, self._command_priority, self.turn_off, **kwargs
+        )
+
     @property
     def extra_state_attributes(self):
         """Return the device state attributes."""
-        return {
+        return trim_attributes({
             ATTR_ATTRIBUTION: COMPONENT_ATTRIBUTION,
             "name": self._attr_name,
             "device_brand": COMPONENT_BRAND,
             "device_name": self._device.name,
             "device_id": self._device.device_id,
             "device_model": self._device.model_id,
-        }
+        }, self._lean_attributes)
 
 
 class AarloSirenBaseSwitch(AarloSwitch):
@@ -177,30 +193,30 @@ class AarloSirenBaseSwitch(AarloSwitch):
 
     async def _async_stop_activity(self, *_args: Any) -> None:
         if self._on_until is not None:
-            self.do_off()
+            await self.async_do_off()
             self._on_until = None
 
-    def turn_on(self, **kwargs):
+    async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
         if self._on_until is None:
-            self.do_on()
+            await self.async_do_on()
             self._on_until = dt_util.utcnow() + self._on_for
             self._timer = async_track_point_in_time(
                 self.hass, HassJob(self._async_stop_activity), self._on_until
             )
             _LOGGER.debug("turned on")
 
-    def turn_off(self, **kwargs):
+    async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
         if self._allow_off:
-            self.do_off()
+            await self.async_do_off()
             self._on_until = None
             _LOGGER.debug("forced off")
 
-    def do_on(self):
+    async def async_do_on(self):
         _LOGGER.debug("implement do on")
 
-    def do_off(self):
+    async def async_do_off(self):
         _LOGGER.debug("implement do off")
 
 
@@ -233,15 +249,16 @@ class AarloSirenSwitch(AarloSirenBaseSwitch):
         _LOGGER.debug(f"register siren callbacks for {self._device.name}")
         self._device.add_attr_callback(SIREN_STATE_KEY, update_state)
 
-    def do_on(self):
+    async def async_do_on(self):
         _LOGGER.debug(f"turned siren {self._attr_name} on")
-        self._device.siren_on(
-            duration=self._on_for.total_seconds(), volume=self._volume
+        await async_run_command(
+            self.hass, self._device.device_id, PRIORITY_SAFETY,
+            self._device.siren_on, duration=self._on_for.total_seconds(), volume=self._volume
         )
 
-    def do_off(self):
+    async def async_do_off(self):
         _LOGGER.debug(f"turned siren {self._attr_name} off")
-        self._device.siren_off()
+        await async_run_command(self.hass, self._device.device_id, PRIORITY_SAFETY, self._device.siren_off)
 
 
 class AarloAllSirensSwitch(AarloSirenBaseSwitch):
@@ -278,20 +295,28 @@ class AarloAllSirensSwitch(AarloSirenBaseSwitch):
             _LOGGER.debug(f"register all siren callbacks for {device.name}")
             device.add_attr_callback(SIREN_STATE_KEY, update_state)
 
-    def do_on(self):
+    async def async_do_on(self):
+        jobs = []
         for device in self._devices:
             _LOGGER.debug(f"turned sirens on {device.name}")
-            device.siren_on(duration=self._on_for.total_seconds(), volume=self._volume)
+            jobs.append((device.name, device.device_id, partial(
+                device.siren_on, duration=self._on_for.total_seconds(), volume=self._volume
+            )))
+        await async_fan_out_sirens(self.hass, jobs)
 
-    def do_off(self):
+    async def async_do_off(self):
+        jobs = []
         for device in self._devices:
             _LOGGER.debug(f"turned sirens off {device.name}")
-            device.siren_off()
+            jobs.append((device.name, device.device_id, device.siren_off))
+        await async_fan_out_sirens(self.hass, jobs)
 
 
 class AarloSnapshotSwitch(AarloSwitch):
     """Representation of an Aarlo switch."""
 
+    _command_priority: int = PRIORITY_MEDIA
+
     def __init__(self, aarlo_config, config, camera):
         """Initialize the Aarlo snapshot switch device."""
         super().__init__(
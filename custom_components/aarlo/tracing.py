@@ -0,0 +1,131 @@
+"""
+Follow an Arlo event through the integration.
+
+When a motion event shows up late we want to know where the time went. We
+note when a packet for a device arrives from pyaarlo's event stream and then
+how long after that each of these happened:
+
+- `arlo`; the packet was sent, if Arlo put a time in it
+- `callback`; an entity callback ran
+- `state`; the entity's new state was written
+- `event`; an `aarlo_*` event was fired on the bus
+
+The most recent timings are kept per device, event type and stage and
+reported as percentiles.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+
+
+STAGE_ARLO = "arlo"
+STAGE_CALLBACK = "callback"
+STAGE_STATE = "state"
+STAGE_EVENT = "event"
+
+DEFAULT_WINDOW = 200
+
+# Anything this long after a packet is not caused by it.
+MAX_AGE = 60.0
+
+PACKET_EVENT = "packet"
+
+
+def packet_device_ids(packet):
+    """Return the ids of the devices a packet is about."""
+    ids = set()
+    if packet.get("from"):
+        ids.add(packet["from"])
+    resource = packet.get("resource", "")
+    if "/" in resource and not resource.startswith("subscriptions/"):
+        ids.add(resource.split("/")[1])
+    if resource == "devices":
+        ids.update(packet.get("devices", {}).keys())
+    return ids
+
+
+def packet_time(packet):
+    """Return when Arlo says it sent the packet, in epoch seconds, or None."""
+    for source in (packet, packet.get("properties")):
+        if not isinstance(source, dict):
+            continue
+        for key in ("timestamp", "utcCreatedDate"):
+            value = source.get(key)
+            if isinstance(value, (int, float)) and value > 0:
+                # Arlo mostly uses milliseconds.
+                return value / 1000 if value > 1e11 else float(value)
+    return None
+
+
+def percentile(ordered, fraction):
+    """Nearest rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class ArloTracer(object):
+    """Timings from packet arrival to each stage, per device and event."""
+
+    def __init__(self, window=DEFAULT_WINDOW, clock=time.monotonic, wall_clock=time.time):
+        self._lock = threading.Lock()
+        self._window = window
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._received = {}
+        self._last_event = {}
+        self._timings = {}
+
+    def _add(self, device_id, event, stage, seconds):
+        key = (device_id, event, stage)
+        timings = self._timings.get(key)
+        if timings is None:
+            timings = self._timings[key] = deque(maxlen=self._window)
+        timings.append(seconds)
+
+    def packet(self, packet):
+        """A packet arrived from Arlo."""
+        now = self._clock()
+        sent_at = packet_time(packet)
+        with self._lock:
+            for device_id in packet_device_ids(packet):
+                self._received[device_id] = now
+                if sent_at is not None:
+                    self._add(device_id, PACKET_EVENT, STAGE_ARLO, max(0.0, self._wall_clock() - sent_at))
+
+    def stage(self, device_id, event, stage):
+        """Record how long after the last packet `stage` of `event` happened.
+
+        If `event` is None the last event seen by a callback for the device is
+        used. Returns the time recorded or None if there was no recent packet.
+        """
+        now = self._clock()
+        with self._lock:
+            received = self._received.get(device_id)
+            if received is None or now - received > MAX_AGE:
+                return None
+            if stage == STAGE_CALLBACK:
+                self._last_event[device_id] = event
+            if event is None:
+                event = self._last_event.get(device_id)
+                if event is None:
+                    return None
+            self._add(device_id, event, stage, now - received)
+            return now - received
+
+    def as_dict(self):
+        with self._lock:
+            items = [(key, sorted(timings)) for key, timings in self._timings.items()]
+        report = {}
+        for (device_id, event, stage), ordered in sorted(items):
+            report.setdefault(device_id, {}).setdefault(event, {})[stage] = {
+                "count": len(ordered),
+                "p50": round(percentile(ordered, 0.50), 4),
+                "p90": round(percentile(ordered, 0.90), 4),
+                "p99": round(percentile(ordered, 0.99), 4),
+                "max": round(ordered[-1], 4),
+            }
+        return report
@@ -1,8 +1,32 @@
 import logging
+import time
+from functools import partial, wraps
 from traceback import extract_stack
 
 from homeassistant.exceptions import HomeAssistantError
+from pyaarlo.constant import BATTERY_KEY
 
+from .breaker import ArloCircuitOpen
+from .commands import PRIORITY_NAMES, PRIORITY_SAFETY
+from .const import (
+    COMPONENT_BREAKERS,
+    COMPONENT_COMMANDS,
+    COMPONENT_CONFIG,
+    COMPONENT_DOMAIN,
+    COMPONENT_ENTITIES,
+    COMPONENT_EXECUTOR,
+    COMPONENT_LIMITER,
+    COMPONENT_STATS,
+    COMPONENT_TRACER,
+    CONF_SIREN_DEADLINE,
+    CONF_STATE_ATTRIBUTES,
+    SIREN_DEADLINE,
+    STATE_ATTRIBUTES,
+    STATE_ATTRIBUTES_LEAN,
+    STATIC_ATTRIBUTES
+)
+from .executor import ArloExecutorFull
+from .fanout import async_fan_out
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,15 +44,251 @@ def is_homekit():
 
 
 def get_entity_from_domain(hass, domains, entity_id):
+    """Find an Aarlo entity in the registry.
+
+    Only entities from `domains` are returned.
+    """
+    domains = domains if isinstance(domains, list) else [domains]
+    registry = hass.data.get(COMPONENT_ENTITIES)
+    if registry is None:
+        raise HomeAssistantError("{} not set up".format(COMPONENT_ENTITIES))
+    entity = registry.entity(entity_id, domains)
+    if entity is None:
+        raise HomeAssistantError("{} not found in {}".format(entity_id, ",".join(domains)))
+    return entity
+
+
+def get_device_from_domain(hass, domains, entity_id):
+    """Find the pyaarlo device behind an Aarlo entity."""
     domains = domains if isinstance(domains, list) else [domains]
-    for domain in domains:
-        component = hass.data.get(domain)
-        if component is None:
-            raise HomeAssistantError("{} component not set up".format(domain))
-        entity = component.get_entity(entity_id)
-        if entity is not None:
-            return entity
-    raise HomeAssistantError("{} not found in {}".format(entity_id, ",".join(domains)))
+    registry = hass.data.get(COMPONENT_ENTITIES)
+    device = registry.device(entity_id, domains) if registry is not None else None
+    if device is None:
+        raise HomeAssistantError("{} not found in {}".format(entity_id, ",".join(domains)))
+    return device
+
+
+def add_entity_to_registry(hass, entity, device):
+    """Let the services and websockets find this entity."""
+    registry = hass.data.get(COMPONENT_ENTITIES)
+    if registry is not None:
+        registry.add(entity.entity_id, entity, device)
+
+
+def remove_entity_from_registry(hass, entity):
+    registry = hass.data.get(COMPONENT_ENTITIES)
+    if registry is not None:
+        registry.remove(entity.entity_id, entity)
+
+
+def async_service_handler(hass, handler, enabled=True):
+    """Turn `handler(hass, call)` into a timed service handler.
+
+    If `enabled` is False the service does nothing. What `handler` returns
+    is the service's response.
+    """
+
+    async def async_handle_service(call):
+        if not enabled:
+            return None
+        _LOGGER.info(f"{call.service} service called")
+        start = time.monotonic()
+        try:
+            return await handler(hass, call)
+        finally:
+            elapsed = time.monotonic() - start
+            stats = hass.data.get(COMPONENT_STATS)
+            if stats is not None:
+                stats.time(f"service/{call.service}", elapsed)
+            _LOGGER.debug(f"{call.service} service took {elapsed:.3f}s")
+
+    return async_handle_service
+
+
+async def async_run_blocking(hass, func, *args):
+    """Run a blocking call in the Aarlo executor.
+
+    Falls back to the Home Assistant executor if ours isn't set up. A full
+    executor is reported as a HomeAssistantError.
+    """
+    executor = hass.data.get(COMPONENT_EXECUTOR)
+    if executor is None:
+        return await hass.async_add_executor_job(func, *args)
+    try:
+        return await executor.async_run(func, *args)
+    except ArloExecutorFull as e:
+        _LOGGER.warning(f"{str(e)}, dropping {getattr(func, '__name__', func)}")
+        raise HomeAssistantError(str(e)) from e
+
+
+def no_result(result):
+    """pyaarlo's way of saying a call failed, a timed out stream say."""
+    return result is None
+
+
+async def async_run_command(hass, device_id, priority, func, *args, failed=None, **kwargs):
+    """Run a blocking pyaarlo call for `device_id` through the command queue.
+
+    `priority` is one of the `PRIORITY_` values from `commands`. Before the
+    queue is set up the call goes straight to the executor.
+
+    If the device's circuit breaker is open we fail straight away. Calls that
+    raise count against the breaker, as do results `failed` returns True for;
+    pyaarlo mostly reports failures by returning None or False. Other calls
+    reset it. Calls other than safety calls wait for the rate limiter before
+    joining the queue.
+    """
+    breaker = None
+    breakers = hass.data.get(COMPONENT_BREAKERS)
+    if breakers is not None:
+        try:
+            breaker = breakers.check(device_id)
+        except ArloCircuitOpen as e:
+            _LOGGER.debug(f"skipping {getattr(func, '__name__', func)}: {str(e)}")
+            raise HomeAssistantError(str(e)) from e
+
+    limiter = hass.data.get(COMPONENT_LIMITER)
+    if limiter is not None:
+        delay = await limiter.async_acquire(PRIORITY_NAMES[priority])
+        if delay > 0:
+            _LOGGER.debug(f"{getattr(func, '__name__', func)} throttled for {delay:.2f}s")
+
+    job = partial(func, *args, **kwargs) if args or kwargs else func
+    queue = hass.data.get(COMPONENT_COMMANDS)
+    try:
+        if queue is None:
+            result = await async_run_blocking(hass, job)
+        else:
+            result = await queue.async_run(device_id, priority, job)
+    except HomeAssistantError:
+        # Our own errors, like a full executor, aren't the device's fault.
+        raise
+    except Exception as e:
+        if breaker is not None:
+            breaker.failure(str(e) or type(e).__name__)
+        raise
+
+    if breaker is not None:
+        if failed is not None and failed(result):
+            breaker.failure(f"{getattr(func, '__name__', func)} returned {result}")
+        else:
+            breaker.success()
+    return result
+
+
+def get_circuit_state(hass, device_id):
+    """Return the state of the device's circuit breaker."""
+    breakers = hass.data.get(COMPONENT_BREAKERS)
+    return breakers.state(device_id) if breakers is not None else None
+
+
+async def async_fan_out_sirens(hass, jobs):
+    """Run siren jobs against all devices at once.
+
+    `jobs` is a list of `(name, device_id, function)` tuples. The commands
+    are queued as safety commands. We wait at most `siren_deadline` seconds,
+    log how long each device took and record the latencies in the stats;
+    devices that miss the deadline are recorded when they finish.
+    """
+    config = hass.data.get(COMPONENT_CONFIG, {}).get(COMPONENT_DOMAIN, {})
+    deadline = config.get(CONF_SIREN_DEADLINE, SIREN_DEADLINE)
+    device_ids = {name: device_id for name, device_id, _func in jobs}
+
+    stats = hass.data.get(COMPONENT_STATS)
+
+    def _run_job(name, func):
+        return async_run_command(hass, device_ids[name], PRIORITY_SAFETY, func)
+
+    def _late(name, latency):
+        _LOGGER.debug(f"siren {name} finished late ({latency:.3f}s)")
+        if stats is not None:
+            stats.time(f"siren/{name}", latency)
+
+    result = await async_fan_out(
+        _run_job, [(name, func) for name, _device_id, func in jobs], deadline, _late
+    )
+
+    if stats is not None:
+        for name, latency in result.latencies.items():
+            stats.time(f"siren/{name}", latency)
+        stats.count("siren/stragglers", len(result.stragglers))
+        stats.count("siren/timed_out", len(result.timed_out))
+
+    _LOGGER.debug(f"sirens fan out {result.as_dict()}")
+    if result.stragglers:
+        _LOGGER.warning(f"slow sirens {result.stragglers} "
+                        f"(median={result.median:.3f}s,deadline={deadline}s)")
+    for name, error in result.errors.items():
+        _LOGGER.warning(f"siren {name} failed {str(error)}")
+    return result
+
+
+def timed_websocket(handler):
+    """Count and time a websocket command handler."""
+
+    @wraps(handler)
+    async def _timed_handler(hass, connection, msg):
+        start = time.monotonic()
+        try:
+            await handler(hass, connection, msg)
+        finally:
+            stats = hass.data.get(COMPONENT_STATS)
+            if stats is not None:
+                stats.time(f"websocket/{msg['type']}", time.monotonic() - start)
+
+    return _timed_handler
+
+
+async def async_track_outcome(hass, name, awaitable):
+    """Time `awaitable` and count whether it produced a result.
+
+    Records `name/ok` or `name/failed` and a `name` timer in the stats. An
+    exception or a None result is a failure.
+    """
+    start = time.monotonic()
+    ok = False
+    try:
+        result = await awaitable
+        ok = not no_result(result)
+        return result
+    finally:
+        stats = hass.data.get(COMPONENT_STATS)
+        if stats is not None:
+            stats.time(name, time.monotonic() - start)
+            stats.count(f"{name}/{'ok' if ok else 'failed'}")
+
+
+def trace_stage(hass, device_id, event, stage):
+    """Note that `stage` of `event` happened for the device."""
+    tracer = hass.data.get(COMPONENT_TRACER)
+    if tracer is not None:
+        tracer.stage(device_id, event, stage)
+
+
+def battery_devices(arlo):
+    """Devices running on batteries, or that can.
+
+    Video doorbells are cameras and doorbells, each device is only returned
+    once.
+    """
+    devices = {}
+    for device in arlo.cameras + arlo.base_stations + arlo.doorbells + arlo.lights + arlo.sensors:
+        if device.has_capability(BATTERY_KEY) and not device.is_charger_only:
+            devices.setdefault(device.device_id, device)
+    return list(devices.values())
+
+
+def lean_attributes(aarlo_config):
+    """Does the config ask for the lean attribute set?"""
+    return aarlo_config.get(CONF_STATE_ATTRIBUTES, STATE_ATTRIBUTES) == STATE_ATTRIBUTES_LEAN
+
+
+def trim_attributes(attrs, lean):
+    """Drop the attributes saying what the device is from `attrs` if `lean`."""
+    if lean:
+        for name in STATIC_ATTRIBUTES:
+            attrs.pop(name, None)
+    return attrs
 
 
 def to_bool(value) -> bool:
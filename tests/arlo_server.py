@@ -0,0 +1,480 @@
+"""
+A local stand-in for the Arlo cloud.
+
+Enough of the Arlo web API for pyaarlo to log in, list devices, receive
+events over SSE, change modes, take snapshots, start streams and read the
+library; all without a network. Point pyaarlo, or the integration, at it
+with the `host` and `auth_host` options and `backend: sse`.
+
+    with ArloStandIn() as arlo_cloud:
+        arlo = PyArlo(host=arlo_cloud.url, auth_host=arlo_cloud.url, ...)
+
+Every response can be delayed with `latency` and requests can be made to
+fail with `fail()`. Requests are recorded in `requests`.
+
+Only the standard library is used.
+"""
+
+import json
+import queue
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+USER_ID = "STANDIN-USER"
+WEB_ID = USER_ID + "_web"
+
+# The smallest JPEG we can get away with.
+JPEG = bytes.fromhex(
+    "ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909080a0c"
+    "140d0c0b0b0c1912130f141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30313434341f27"
+    "393d38323c2e333432ffc0000b080001000101011100ffc4001f000001050101010101010000000000"
+    "0000000102030405060708090a0bffc400b5100002010303020403050504040000017d01020300041105"
+    "122131410613516107227114328191a1082342b1c11552d1f02433627282090a161718191a25262728"
+    "292a3435363738393a434445464748494a535455565758595a636465666768696a737475767778797a"
+    "838485868788898a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4c5c6c7"
+    "c8c9cad2d3d4d5d6d7d8d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8f9faffda0008010100003f"
+    "00fbd3ffd9"
+)
+
+DEFAULT_MODES = [
+    {"id": "mode0", "name": "", "type": "disarmed"},
+    {"id": "mode1", "name": "", "type": "armed"},
+    {"id": "mode2", "name": "Home", "type": "armed"},
+]
+
+
+def base_station(device_id, name="Base"):
+    return {
+        "deviceId": device_id,
+        "deviceName": name,
+        "deviceType": "basestation",
+        "modelId": "VMB4540",
+        "parentId": device_id,
+        "uniqueId": f"{USER_ID}_{device_id}",
+        "userId": USER_ID,
+        "xCloudId": f"XC-{device_id}",
+        "state": "provisioned",
+        "properties": {"connectionState": "available"},
+    }
+
+
+def camera(device_id, parent_id, name="Camera", model_id="VMC4040P"):
+    return {
+        "deviceId": device_id,
+        "deviceName": name,
+        "deviceType": "camera",
+        "modelId": model_id,
+        "parentId": parent_id,
+        "uniqueId": f"{USER_ID}_{device_id}",
+        "userId": USER_ID,
+        "xCloudId": f"XC-{parent_id}",
+        "state": "provisioned",
+        "presignedLastImageUrl": "",
+        "properties": {"connectionState": "available", "activityState": "idle", "batteryLevel": 90},
+    }
+
+
+def _success(data=None):
+    return {"success": True, "data": {} if data is None else data}
+
+
+def _meta(data):
+    return {"meta": {"code": 200}, "data": data}
+
+
+class ArloStandIn(object):
+    """A threaded HTTP server pretending to be Arlo.
+
+    `devices` is the device list returned to pyaarlo, it defaults to one base
+    station and one camera. `latency` delays every response by that many
+    seconds. A harmless packet is sent on idle event streams every
+    `heartbeat` seconds so clients notice when they've been asked to stop.
+    """
+
+    def __init__(self, devices=None, latency=0.0, snapshot_delay=0.05, heartbeat=0.5):
+        self.devices = devices if devices is not None else [
+            base_station("BASE0001"),
+            camera("CAM0001", "BASE0001", "Front Door"),
+        ]
+        self.latency = latency
+        self.snapshot_delay = snapshot_delay
+        self.heartbeat = heartbeat
+        self.requests = []
+        self.modes = {device["deviceId"]: "mode0" for device in self.devices
+                      if device["deviceType"] == "basestation"}
+        self.library = []
+        self._lock = threading.Lock()
+        self._failures = []
+        self._listeners = []
+        self._connections = {}
+        self._server = None
+        self._thread = None
+
+    # Set up.
+    def start(self):
+        handler = type("ArloStandInHandler", (_Handler,), {"standin": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ArloStandIn", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            listeners, self._listeners = self._listeners, []
+        for listener in listeners:
+            listener.put(None)
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=5)
+        # Kept alive connections would leave their handlers running.
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for thread, connection in connections.items():
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_args):
+        self.stop()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    # Test controls.
+    def fail(self, path, status=500, count=1):
+        """Make the next `count` requests starting with `path` return `status`."""
+        with self._lock:
+            self._failures.append([path, status, count])
+
+    def add_video(self, device_id, created=None):
+        """Add a recording to the library."""
+        created = int((created or time.time()) * 1000)
+        name = f"{device_id}-{created}"
+        self.library.append({
+            "name": name,
+            "deviceId": device_id,
+            "createdDate": time.strftime("%Y%m%d", time.localtime(created / 1000)),
+            "utcCreatedDate": created,
+            "localCreatedDate": created,
+            "mediaDurationSecond": 10,
+            "contentType": "video/mp4",
+            "presignedContentUrl": f"{self.url}/media/{name}.mp4",
+            "presignedThumbnailUrl": f"{self.url}/media/{name}.jpg",
+            "reason": "motionRecord",
+            "objCategory": "Person",
+            "objRegion": "",
+            "uniqueId": f"{USER_ID}_{device_id}",
+            "ownerId": USER_ID,
+        })
+
+    def push(self, packet):
+        """Send an event to every connected event stream."""
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener.put(packet)
+
+    def wait_for_listener(self, timeout=5.0):
+        end = time.monotonic() + timeout
+        while time.monotonic() < end:
+            with self._lock:
+                if self._listeners:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def device(self, device_id):
+        return next((device for device in self.devices if device["deviceId"] == device_id), None)
+
+    # Used by the handler.
+    def _failure(self, path):
+        with self._lock:
+            for failure in self._failures:
+                if path.startswith(failure[0]) and failure[2] > 0:
+                    failure[2] -= 1
+                    return failure[1]
+        return None
+
+    def _listen(self):
+        listener = queue.Queue()
+        with self._lock:
+            self._listeners.append(listener)
+        return listener
+
+    def _unlisten(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _later(self, delay, *packets):
+        def _push():
+            for packet in packets:
+                self.push(packet)
+
+        timer = threading.Timer(delay, _push)
+        timer.daemon = True
+        timer.start()
+
+    def _notify(self, device_id, body):
+        """Answer a notify the way a base station would, on the event stream."""
+        action = body.get("action")
+        resource = body.get("resource", "")
+        reply = {
+            "action": "is",
+            "from": device_id,
+            "to": body.get("from", WEB_ID),
+            "transId": body.get("transId"),
+            "resource": resource,
+        }
+        if action == "set" and resource == "modes":
+            mode = body.get("properties", {}).get("active")
+            if mode is not None:
+                self.modes[device_id] = mode
+            reply["properties"] = {"active": self.modes.get(device_id)}
+        elif action == "set":
+            reply["properties"] = body.get("properties", {})
+        elif action == "get" and resource == "modes":
+            reply["properties"] = {"active": self.modes.get(device_id), "modes": DEFAULT_MODES}
+        elif action == "get" and resource == "devices":
+            reply["devices"] = {
+                child["deviceId"]: dict(child.get("properties", {}))
+                for child in self.devices if child.get("parentId") == device_id
+            }
+        elif action == "get":
+            reply["properties"] = {}
+        else:
+            return
+        self._later(0, reply)
+
+    def _snapshot(self, device_id, streaming):
+        """Arlo answers a snapshot request on the event stream once the image is up.
+
+        Idle snapshots come back as `fullFrameSnapshotAvailable`, snapshots
+        taken while streaming as a media upload.
+        """
+        url = f"{self.url}/media/snapshots/{device_id}-{int(time.time() * 1000)}.jpg"
+        if streaming:
+            packet = {
+                "action": "is",
+                "resource": "mediaUploadNotification",
+                "deviceId": device_id,
+                "presignedContentUrl": url,
+            }
+        else:
+            packet = {
+                "action": "fullFrameSnapshotAvailable",
+                "from": device_id,
+                "resource": f"cameras/{device_id}",
+                "properties": {"presignedFullFrameSnapshotUrl": url},
+                "transId": f"standin!{uuid.uuid4()}",
+            }
+        # The camera goes idle before we hear about the image, so it has
+        # finished by the time pyaarlo hands the snapshot back.
+        self._later(self.snapshot_delay, {
+            "action": "is",
+            "from": device_id,
+            "resource": f"cameras/{device_id}",
+            "properties": {"activityState": "idle"},
+        }, packet)
+
+    def _media_upload(self, device_id):
+        """Arlo tells us when a new recording is in the library."""
+        self.add_video(device_id)
+        self._later(self.snapshot_delay, {
+            "action": "is",
+            "resource": "mediaUploadNotification",
+            "deviceId": device_id,
+            "presignedLastImageUrl": self.library[-1]["presignedThumbnailUrl"],
+            "presignedContentUrl": self.library[-1]["presignedContentUrl"],
+            "recordingStopped": True,
+        })
+
+    def _library(self, body):
+        date_from, date_to = body.get("dateFrom", "0"), body.get("dateTo", "99999999")
+        return [video for video in self.library if date_from <= video["createdDate"] <= date_to]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    standin = None
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.standin._lock:
+            self.standin._connections[threading.current_thread()] = self.connection
+
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            with self.standin._lock:
+                self.standin._connections.pop(threading.current_thread(), None)
+
+    def log_message(self, *_args):
+        pass
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        url = urlparse(self.path)
+        path, query = url.path, parse_qs(url.query)
+        body = self._body()
+        self.standin.requests.append((method, path, body))
+
+        if self.standin.latency:
+            time.sleep(self.standin.latency)
+        status = self.standin._failure(path)
+        if status is not None:
+            self._send(status, {"success": False, "data": {"error": status}})
+            return
+
+        if method == "OPTIONS":
+            self._send(200, b"", "text/plain")
+        elif path == "/hmsweb/client/subscribe":
+            self._stream()
+        elif path.startswith("/media/"):
+            self._send(200, JPEG if path.endswith(".jpg") else b"\0" * 1024,
+                       "image/jpeg" if path.endswith(".jpg") else "video/mp4")
+        else:
+            self._send(200, self._answer(method, path, query, body))
+
+    def _answer(self, method, path, _query, body):
+        standin = self.standin
+
+        # Logging in.
+        if path == "/api/auth":
+            return _meta({
+                "token": "standin-token",
+                "userId": USER_ID,
+                "expiresIn": int(time.time()) + 3600,
+                "authCompleted": True,
+            })
+        if path.startswith("/api/"):
+            return _meta({})
+        if path == "/hmsweb/users/session/v3":
+            return _success({"userId": USER_ID, "supportsMultiLocation": False})
+
+        # Devices and modes.
+        if path == "/hmsweb/v2/users/devices":
+            return _success(standin.devices)
+        if path == "/hmsweb/users/automation/definitions":
+            return _success({
+                f"{USER_ID}_{device_id}": {"modes": DEFAULT_MODES, "schedules": [], "olsonTimeZone": "UTC"}
+                for device_id in standin.modes
+            })
+        if path == "/hmsweb/users/devices/automation/active":
+            if method == "GET":
+                return _success([
+                    {"gatewayId": device_id, "uniqueId": f"{USER_ID}_{device_id}",
+                     "activeModes": [mode], "activeSchedules": []}
+                    for device_id, mode in standin.modes.items()
+                ])
+            for change in body.get("activeAutomations", []):
+                device_id = change.get("deviceId")
+                if device_id in standin.modes:
+                    standin.modes[device_id] = change.get("activeModes", [standin.modes[device_id]])[0]
+                    standin.push({"resource": "activeAutomations", device_id: {
+                        "activeModes": [standin.modes[device_id]], "activeSchedules": [],
+                    }})
+            return _success({})
+        if path.startswith("/hmsweb/users/devices/notify/"):
+            standin._notify(path.rsplit("/", 1)[1], body)
+            return _success({})
+
+        # Media.
+        if path == "/hmsweb/users/devices/fullFrameSnapshot":
+            standin._snapshot(body.get("resource", "/").split("/")[1], False)
+            return _success({})
+        if path == "/hmsweb/users/devices/takeSnapshot":
+            standin._snapshot(body.get("deviceId"), True)
+            return _success({})
+        if path == "/hmsweb/users/devices/startStream":
+            device_id = body.get("properties", {}).get("cameraId")
+            standin.push({
+                "action": "is",
+                "from": device_id,
+                "resource": f"cameras/{device_id}",
+                "properties": {"activityState": "userStreamActive"},
+            })
+            return _success({"url": f"rtsp://127.0.0.1:554/{device_id}?egressToken=standin"})
+        if path == "/hmsweb/users/devices/startRecord":
+            standin._media_upload(body.get("deviceId"))
+            return _success({})
+        if path == "/hmsweb/users/library":
+            return _success(standin._library(body))
+
+        return _success({})
+
+    def _stream(self):
+        """Hold the connection open and send events as they are pushed."""
+        listener = self.standin._listen()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        # Chunked, so the client sees each event as soon as it's sent.
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            self._chunk(self._event({"status": "connected"}))
+            while True:
+                try:
+                    packet = listener.get(timeout=self.standin.heartbeat)
+                except queue.Empty:
+                    packet = {"action": "is", "resource": f"subscriptions/{WEB_ID}"}
+                if packet is None:
+                    break
+                self._chunk(self._event(packet))
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.standin._unlisten(listener)
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    @staticmethod
+    def _event(packet):
+        return f"event: message\ndata: {json.dumps(packet)}\n\n".encode()
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_OPTIONS(self):
+        self._handle("OPTIONS")
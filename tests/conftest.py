@@ -0,0 +1,114 @@
+"""Shared test set up.
+
+The Home Assistant tests need `pip install pytest-homeassistant-custom-component`,
+the rest run without it. `setup_aarlo` sets the integration up from a config
+entry with `login` patched to hand back a fake, see `tests/fakes.py`.
+"""
+
+import contextlib
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Import our `custom_components` before Home Assistant looks in its test
+# config directory for one.
+import custom_components  # noqa: E402,F401
+
+ENTRY_DATA = {
+    "username": "user@example.com",
+    "password": "secret",
+    "add_aarlo_prefix": True,
+    "tfa_type": "push",
+    "tfa_source": "push",
+}
+
+
+def pytest_configure(config):
+    # pytest-homeassistant-custom-component needs pytest-asyncio in auto mode.
+    if hasattr(config.option, "asyncio_mode"):
+        config.option.asyncio_mode = "auto"
+
+
+@pytest.fixture
+def cloud(request):
+    """The Arlo stand-in, see `tests/arlo_server.py`."""
+    from tests.arlo_server import ArloStandIn
+
+    # The Home Assistant plugin blocks sockets.
+    if request.config.pluginmanager.hasplugin("socket"):
+        request.getfixturevalue("socket_enabled")
+
+    threads = set(threading.enumerate())
+    with ArloStandIn() as cloud:
+        yield cloud
+    # Wait for pyaarlo's threads, Home Assistant's executor threads aren't
+    # daemons. The background worker only sees it's been stopped when it
+    # wakes up so give it a nudge.
+    from pyaarlo.background import ArloBackgroundWorker
+
+    for thread in set(threading.enumerate()) - threads:
+        if isinstance(thread, ArloBackgroundWorker):
+            with thread._lock:
+                thread._lock.notify()
+        if thread.daemon:
+            thread.join(timeout=15)
+
+
+@pytest.fixture
+def aarlo_config_dir(hass, tmp_path):
+    """Give each test its own config directory; `aarlo.yaml` and `.aarlo` go here."""
+    hass.config.config_dir = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def write_aarlo_yaml(aarlo_config_dir):
+    """Write `aarlo.yaml`, one option per line."""
+
+    def _write(*lines):
+        filename = aarlo_config_dir / "aarlo.yaml"
+        filename.write_text("aarlo:\n" + "".join(f"  {line}\n" for line in lines))
+        # Make sure a rewrite shows even on coarse timestamps.
+        stat = filename.stat()
+        os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    return _write
+
+
+@pytest.fixture
+def aarlo_entry(hass, aarlo_config_dir, enable_custom_integrations):
+    """An aarlo config entry, added but not set up."""
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    entry = MockConfigEntry(domain="aarlo", data=ENTRY_DATA)
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+def setup_aarlo(hass, aarlo_entry, write_aarlo_yaml):
+    """Set the integration up; call with the fake `PyArlo` and `aarlo.yaml` lines.
+
+    Pass `None` for the fake to log in for real, against the stand-in say.
+    """
+
+    async def _setup(arlo, *lines):
+        if lines:
+            write_aarlo_yaml(*lines)
+        login = contextlib.nullcontext()
+        if arlo is not None:
+            login = patch("custom_components.aarlo.login", return_value=arlo)
+        with login:
+            assert await hass.config_entries.async_setup(aarlo_entry.entry_id)
+            await hass.async_block_till_done()
+        return aarlo_entry
+
+    return _setup
@@ -0,0 +1,349 @@
+"""
+A stand-in for pyaarlo.
+
+`FakeArlo` looks enough like a logged in `PyArlo` for the integration to set
+itself up, without talking to Arlo. Packets passed to `inject_response` are
+routed to devices the way pyaarlo's backend routes them and each device
+turns them into attribute callbacks.
+
+Methods the fakes don't implement are recorded in `FakeArlo.calls` and
+return None.
+"""
+
+import threading
+
+from pyaarlo.constant import (
+    ACTIVITY_STATE_KEY,
+    AIR_QUALITY_KEY,
+    AUDIO_DETECTED_KEY,
+    BATTERY_KEY,
+    BUTTON_PRESSED_KEY,
+    CAPTURED_TODAY_KEY,
+    CHARGING_KEY,
+    CONNECTION_KEY,
+    CONTACT_STATE_KEY,
+    CRY_DETECTION_KEY,
+    DEFAULT_RESOURCES,
+    DEVICE_ID_KEY,
+    DEVICE_NAME_KEY,
+    FLOODLIGHT_KEY,
+    HUMIDITY_KEY,
+    LAMP_STATE_KEY,
+    LAST_CAPTURE_KEY,
+    LAST_IMAGE_SRC_KEY,
+    MEDIA_PLAYER_KEY,
+    MODE_KEY,
+    MOTION_DETECTED_KEY,
+    NIGHTLIGHT_KEY,
+    PRIVACY_KEY,
+    RECENT_ACTIVITY_KEY,
+    SIGNAL_STR_KEY,
+    SILENT_MODE_KEY,
+    SIREN_STATE_KEY,
+    SPOTLIGHT_KEY,
+    TAMPER_STATE_KEY,
+    TEMPERATURE_KEY,
+    TOTAL_CAMERAS_KEY,
+)
+
+
+CAMERA_CAPABILITIES = {
+    ACTIVITY_STATE_KEY, AUDIO_DETECTED_KEY, BATTERY_KEY, CAPTURED_TODAY_KEY,
+    CONNECTION_KEY, LAST_CAPTURE_KEY, MOTION_DETECTED_KEY, PRIVACY_KEY,
+    RECENT_ACTIVITY_KEY, SIGNAL_STR_KEY, SIREN_STATE_KEY,
+}
+DOORBELL_CAPABILITIES = {
+    BATTERY_KEY, BUTTON_PRESSED_KEY, CONNECTION_KEY, MOTION_DETECTED_KEY,
+    SIGNAL_STR_KEY, SILENT_MODE_KEY,
+}
+LIGHT_CAPABILITIES = {BATTERY_KEY, CONNECTION_KEY, MOTION_DETECTED_KEY}
+SENSOR_CAPABILITIES = {
+    BATTERY_KEY, CONNECTION_KEY, CONTACT_STATE_KEY, MOTION_DETECTED_KEY,
+    TAMPER_STATE_KEY, TEMPERATURE_KEY,
+}
+BASE_CAPABILITIES = {CONNECTION_KEY, MODE_KEY, SIREN_STATE_KEY, TOTAL_CAMERAS_KEY}
+
+# What a mixed fleet looks like; (kind, model, capabilities, share of devices).
+FLEET_PROFILES = [
+    ("cameras", "VMC4040P", CAMERA_CAPABILITIES | {SPOTLIGHT_KEY}, 30),
+    ("cameras", "VMC2030", CAMERA_CAPABILITIES - {SIREN_STATE_KEY}, 15),
+    ("cameras", "FB1001", CAMERA_CAPABILITIES | {FLOODLIGHT_KEY}, 5),
+    ("cameras", "ABC1000", CAMERA_CAPABILITIES | {
+        AIR_QUALITY_KEY, CRY_DETECTION_KEY, HUMIDITY_KEY, MEDIA_PLAYER_KEY,
+        NIGHTLIGHT_KEY, TEMPERATURE_KEY,
+    }, 5),
+    ("doorbells", "AAD1001", DOORBELL_CAPABILITIES, 10),
+    ("lights", "AL1101", LIGHT_CAPABILITIES | {LAMP_STATE_KEY}, 15),
+    ("sensors", "MS1001", SENSOR_CAPABILITIES, 20),
+]
+
+# How many devices one base station looks after.
+FLEET_BASE_SIZE = 16
+
+# Envelope fields that aren't device attributes.
+ENVELOPE_KEYS = {"action", "from", "to", "resource", "transId", "properties"}
+
+
+class FakeDevice(object):
+    """A pyaarlo device; attributes, capabilities and callbacks."""
+
+    def __init__(self, arlo, kind, device_id, name, model_id, capabilities, parent=None, **attrs):
+        self._arlo = arlo
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self.kind = kind
+        self.device_id = device_id
+        self.unique_id = device_id
+        self.name = name
+        self.model_id = model_id
+        self.capabilities = set(capabilities)
+        self.parent = parent
+        self.attrs = {CONNECTION_KEY: "available", ACTIVITY_STATE_KEY: "idle", **attrs}
+        self.callbacks_run = 0
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def _record(*args, **kwargs):
+            self._arlo.calls.append((self.device_id, name, args, kwargs))
+
+        return _record
+
+    @property
+    def entity_id(self):
+        return self.name.lower().replace(" ", "_")
+
+    @property
+    def resource_id(self):
+        return f"{self.kind}/{self.device_id}"
+
+    def has_capability(self, cap):
+        return cap in self.capabilities
+
+    def attribute(self, attr, default=None):
+        return self.attrs.get(attr, default)
+
+    def add_attr_callback(self, attr, cb):
+        with self._lock:
+            self._callbacks.setdefault(attr, []).append(cb)
+
+    def set_attribute(self, attr, value):
+        """Save an attribute and run its callbacks, like pyaarlo does."""
+        self.attrs[attr] = value
+        with self._lock:
+            cbs = self._callbacks.get(attr, []) + self._callbacks.get("*", [])
+        for cb in cbs:
+            self.callbacks_run += 1
+            cb(self, attr, value)
+
+    def handle(self, _resource, event):
+        props = event.get("properties", event)
+        if not isinstance(props, dict):
+            return
+        for attr, value in props.items():
+            if attr not in ENVELOPE_KEYS:
+                self.set_attribute(attr, value)
+
+    # The properties the integration reads.
+    @property
+    def state(self):
+        if self.attrs.get(CONNECTION_KEY) != "available":
+            return self.attrs.get(CONNECTION_KEY)
+        return self.attrs.get(ACTIVITY_STATE_KEY, "idle")
+
+    @property
+    def battery_level(self):
+        return self.attrs.get(BATTERY_KEY, 100)
+
+    @property
+    def is_charging(self):
+        return bool(self.attrs.get(CHARGING_KEY, False))
+
+    @property
+    def is_charger_only(self):
+        return False
+
+    @property
+    def signal_strength(self):
+        return self.attrs.get(SIGNAL_STR_KEY, 3)
+
+    @property
+    def mode(self):
+        return self.attrs.get(MODE_KEY, "disarmed")
+
+    @property
+    def base_station(self):
+        return self.parent
+
+    @property
+    def last_image_source(self):
+        return self.attrs.get(LAST_IMAGE_SRC_KEY, "")
+
+    @property
+    def is_on(self):
+        return not self.attrs.get(PRIVACY_KEY, False)
+
+    timezone = "America/New_York"
+    battery_tech = "Rechargeable"
+    charger_type = None
+    has_charger = False
+    is_charger_only = False
+    is_charging = False
+    last_image = None
+    last_image_from_cache = None
+    last_video = None
+    last_capture_date_format = "%m-%d %H:%M"
+    is_taking_snapshot = False
+    was_recently_active = False
+    unseen_videos = 0
+    min_days_vdo_cache = 30
+    mirror_state = False
+    flip_state = False
+    powersave_mode = None
+    motion_detection_sensitivity = 80
+    chimes_are_silenced = False
+    calls_are_silenced = False
+    is_silenced = False
+    on_schedule = False
+    is_armed_away = False
+    is_armed_home = False
+    brightness = None
+
+
+class FakeBackend(object):
+    """Routes packets to devices like pyaarlo's `ArloBackEnd._event_dispatcher`."""
+
+    def __init__(self, arlo):
+        self._arlo = arlo
+
+    def _event_dispatcher(self, response):
+        resource = response.get("resource", "")
+        responses = []
+        if resource.startswith("subscriptions/"):
+            return
+        if resource == "activeAutomations":
+            for device_id in response:
+                if device_id != "resource":
+                    responses.append((device_id, resource, response[device_id]))
+        elif [x for x in DEFAULT_RESOURCES if resource.startswith(x + "/")]:
+            responses.append((resource.split("/")[1], resource, response))
+        elif resource == "devices":
+            for device_id, props in response.get("devices", {}).items():
+                responses.append((device_id, resource, props))
+        elif resource in DEFAULT_RESOURCES and isinstance(response.get("properties"), list):
+            for prop in response["properties"]:
+                responses.append((prop.get("serialNumber", response.get("from")), resource, prop))
+        else:
+            responses.append((response.get("from"), resource, response))
+
+        for device_id, resource, event in responses:
+            device = self._arlo.lookup(device_id)
+            if device is not None:
+                device.handle(resource, event)
+
+
+class FakeArlo(object):
+    """A logged in `PyArlo` with no network behind it."""
+
+    def __init__(self, name="aarlo", device_id="fake-user-id"):
+        self.name = name
+        self.device_id = device_id
+        self.model_id = "aarlo"
+        self.be = FakeBackend(self)
+        self.is_connected = True
+        self.last_error = None
+        self.calls = []
+        self.base_stations = []
+        self.cameras = []
+        self.doorbells = []
+        self.lights = []
+        self.sensors = []
+        self.locations = []
+        self._devices = {}
+
+    def add(self, kind, device_id, name, model_id, capabilities, parent=None, **attrs):
+        device = FakeDevice(self, kind, device_id, name, model_id, capabilities, parent, **attrs)
+        self._devices[device_id] = device
+        {
+            "basestations": self.base_stations,
+            "cameras": self.cameras,
+            "doorbells": self.doorbells,
+            "lights": self.lights,
+            "sensors": self.sensors,
+        }[kind].append(device)
+        return device
+
+    def lookup(self, device_id):
+        return self._devices.get(device_id)
+
+    def attribute(self, attr):
+        return None
+
+    def add_attr_callback(self, attr, cb):
+        pass
+
+    @property
+    def devices(self):
+        return [
+            {DEVICE_NAME_KEY: device.name, DEVICE_ID_KEY: device.device_id, "modelId": device.model_id}
+            for device in self._devices.values()
+        ]
+
+    @property
+    def callbacks_run(self):
+        return sum(device.callbacks_run for device in self._devices.values())
+
+    def inject_response(self, response):
+        self.be._event_dispatcher(response)
+
+    def _refresh_devices(self):
+        pass
+
+    def stop(self, logout=False):
+        self.is_connected = False
+
+
+def make_arlo(cameras=1, doorbells=1, lights=0, sensors=0):
+    """A small account; one base station and the devices hanging off it."""
+    arlo = FakeArlo()
+    base = arlo.add("basestations", "BASE0001", "Base", "VMB4540", BASE_CAPABILITIES)
+    for i in range(cameras):
+        arlo.add("cameras", f"CAM{i:04d}", f"Camera {i}", "VMC4040P", CAMERA_CAPABILITIES, base)
+    for i in range(doorbells):
+        arlo.add("doorbells", f"BELL{i:04d}", f"Doorbell {i}", "AAD1001", DOORBELL_CAPABILITIES, base)
+    for i in range(lights):
+        arlo.add("lights", f"LIGHT{i:04d}", f"Light {i}", "AL1101", LIGHT_CAPABILITIES, base)
+    for i in range(sensors):
+        arlo.add("sensors", f"SENSOR{i:04d}", f"Sensor {i}", "MS1001", SENSOR_CAPABILITIES, base)
+    return arlo
+
+
+def make_fleet(devices):
+    """An account with `devices` devices spread over enough base stations.
+
+    The mix follows `FLEET_PROFILES` and is the same for the same size.
+    """
+    arlo = FakeArlo()
+    total = sum(share for _kind, _model, _caps, share in FLEET_PROFILES)
+    bases = [
+        arlo.add("basestations", f"BASE{i:04d}", f"Base {i}", "VMB4540", BASE_CAPABILITIES)
+        for i in range(max(1, -(-devices // FLEET_BASE_SIZE)))
+    ]
+
+    # Hand out devices by largest remainder so the counts add up exactly.
+    counts = [devices * share // total for _kind, _model, _caps, share in FLEET_PROFILES]
+    remainders = sorted(
+        range(len(FLEET_PROFILES)),
+        key=lambda i: -(devices * FLEET_PROFILES[i][3] % total)
+    )
+    for i in remainders[:devices - sum(counts)]:
+        counts[i] += 1
+
+    n = 0
+    for (kind, model_id, capabilities, _share), count in zip(FLEET_PROFILES, counts):
+        for _ in range(count):
+            arlo.add(kind, f"{model_id}{n:05d}", f"{kind[:-1].title()} {n}", model_id, capabilities,
+                     bases[n % len(bases)], **{BATTERY_KEY: 20 + n % 80, SIGNAL_STR_KEY: 1 + n % 4})
+            n += 1
+    return arlo
@@ -0,0 +1,67 @@
+"""
+Measure the callback path while replaying a recorded event stream.
+
+`async_bench_replay` feeds packets to a `FakeArlo` and reports callbacks/s,
+state writes/s, how far the event loop fell behind and the memory used. It
+doesn't need Home Assistant; pass `listen` to count state writes when the
+platforms are loaded.
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+import asyncio
+import tracemalloc
+
+from replay import LoopLagProbe, async_replay
+
+
+PACKETS_DIR = os.path.join(os.path.dirname(__file__), "packets")
+
+
+def _per_second(count, elapsed):
+    return round(count / elapsed, 1) if elapsed > 0 else None
+
+
+async def async_bench_replay(arlo, packets, inject=None, speed=None, listen=None, settle=None):
+    """Replay `packets` into `arlo` and report what it cost.
+
+    `inject` defaults to `arlo.inject_response`. `listen(counter)` should
+    arrange for `counter()` to be called on every state write and return a
+    function that stops it. `settle()` is awaited after the last packet so
+    work it queued is counted.
+    """
+    state_writes = [0]
+
+    def _count_state_write(*_args):
+        state_writes[0] += 1
+
+    unlisten = listen(_count_state_write) if listen is not None else None
+    callbacks_before = arlo.callbacks_run
+    probe = LoopLagProbe()
+
+    tracemalloc.start()
+    probe.start()
+    try:
+        result = await async_replay(packets, inject or arlo.inject_response, speed)
+        await (settle() if settle is not None else asyncio.sleep(0))
+    finally:
+        await probe.stop()
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if unlisten is not None:
+            unlisten()
+
+    callbacks = arlo.callbacks_run - callbacks_before
+    return {
+        "packets": result["packets"],
+        "elapsed": round(result["elapsed"], 6),
+        "callbacks": callbacks,
+        "callbacks_per_s": _per_second(callbacks, result["elapsed"]),
+        "state_writes": state_writes[0],
+        "state_writes_per_s": _per_second(state_writes[0], result["elapsed"]),
+        "max_late": round(result["max_late"], 6),
+        "loop_lag_max": round(probe.max_lag, 6),
+        "loop_lag_mean": round(probe.total_lag / probe.samples, 6) if probe.samples else None,
+        "peak_memory": peak,
+    }
@@ -0,0 +1,77 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+from activity import DAY, HOUR, MINUTE, SITE, ArloActivityStats
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1_000 * DAY
+
+    def __call__(self):
+        return self.now
+
+
+def test_captures_are_counted_per_camera_and_site():
+    clock = Clock()
+    activity = ArloActivityStats(clock=clock)
+    activity.capture("CAM0001", "Person", "v1")
+    activity.capture("CAM0001", "Vehicle", "v2")
+    activity.capture("CAM0002", "Person", "v3")
+    # pyaarlo repeats the last capture when it starts.
+    assert not activity.capture("CAM0002", "Person", "v3")
+
+    assert activity.summary("CAM0001") == {
+        "last_hour": 2, "last_day": 2, "last_week": 2,
+        "object_types": {"Person": 1, "Vehicle": 1},
+    }
+    assert activity.summary(SITE)["last_hour"] == 3
+    assert activity.summary(SITE)["object_types"] == {"Person": 2, "Vehicle": 1}
+    assert activity.summary("CAM0003")["last_day"] == 0
+
+
+def test_counts_roll_off():
+    clock = Clock()
+    activity = ArloActivityStats(clock=clock)
+    activity.capture("CAM0001", "Person")
+    clock.now += 30 * MINUTE
+    activity.capture("CAM0001")
+
+    clock.now += 45 * MINUTE
+    summary = activity.summary("CAM0001")
+    assert (summary["last_hour"], summary["last_day"]) == (1, 2)
+
+    clock.now += DAY
+    summary = activity.summary("CAM0001")
+    assert (summary["last_hour"], summary["last_day"], summary["last_week"]) == (0, 0, 2)
+    assert summary["object_types"] == {}
+
+    clock.now += 7 * DAY
+    assert activity.summary(SITE)["last_week"] == 0
+
+
+def test_slots_are_reused():
+    clock = Clock()
+    activity = ArloActivityStats(clock=clock)
+    for _ in range(3 * 24):
+        activity.capture("CAM0001")
+        clock.now += HOUR
+    # The current hour has nothing in it yet.
+    assert activity.summary("CAM0001")["last_day"] == 23
+
+    # Old captures, from the library say, only count if they're recent enough.
+    activity.capture("CAM0002", at=clock.now - 2 * DAY)
+    activity.capture("CAM0002", at=clock.now - 8 * DAY)
+    assert activity.summary("CAM0002")["last_week"] == 1
+    assert activity.summary("CAM0002")["last_day"] == 0
+
+
+def test_each_new_capture_is_announced():
+    activity = ArloActivityStats(clock=Clock())
+    announced = []
+    activity.on_capture = announced.append
+    activity.capture("CAM0001", "Person", "v1")
+    activity.capture("CAM0001", "Person", "v1")
+    activity.capture("CAM0002")
+    assert announced == ["CAM0001", "CAM0002"]
@@ -0,0 +1,56 @@
+"""Check the activity sensors follow the captures.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`.
+"""
+
+import datetime
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.util import dt as dt_util
+from pyaarlo.constant import LAST_IMAGE_SRC_KEY
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from tests.fakes import make_arlo
+
+
+async def test_captures_are_pushed_and_age(hass, setup_aarlo):
+    from custom_components.aarlo.const import COMPONENT_ACTIVITY
+
+    arlo = make_arlo(cameras=2)
+    entry = await setup_aarlo(arlo, "activity_sensors: true")
+
+    def _state(entity_id):
+        return hass.states.get(entity_id).state
+
+    assert _state("sensor.aarlo_captures_last_hour") == "0"
+
+    camera = arlo.cameras[0]
+    camera.last_video = SimpleNamespace(
+        id="video-1", created_at=None, object_type="Person", object_region=None,
+        video_url=None, thumbnail_url=None,
+    )
+    await hass.async_add_executor_job(camera.set_attribute, LAST_IMAGE_SRC_KEY, "capture/1")
+    await hass.async_block_till_done()
+
+    # No polling; the capture shows straight away.
+    assert _state("sensor.aarlo_captures_last_hour") == "1"
+    assert _state("sensor.aarlo_captures_last_hour_camera_0") == "1"
+    assert _state("sensor.aarlo_captures_last_hour_camera_1") == "0"
+    assert _state("sensor.aarlo_people_last_day") == "1"
+    assert _state("sensor.aarlo_people_last_day_camera_0") == "1"
+    assert _state("sensor.aarlo_vehicles_last_day") == "0"
+
+    # An hour on the capture has aged out of the hour's count.
+    hass.data[COMPONENT_ACTIVITY]._clock = lambda: time.time() + 61 * 60
+    async_fire_time_changed(hass, dt_util.utcnow() + datetime.timedelta(minutes=1, seconds=1))
+    await hass.async_block_till_done()
+    assert _state("sensor.aarlo_captures_last_hour") == "0"
+    assert _state("sensor.aarlo_captures_last_day") == "1"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
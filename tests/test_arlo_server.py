@@ -0,0 +1,86 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+import time
+
+import pytest
+from pyaarlo import PyArlo
+
+
+def _login(cloud, tmp_path):
+    return PyArlo(
+        username="user@example.com",
+        password="secret",
+        host=cloud.url,
+        auth_host=cloud.url,
+        backend="sse",
+        http_backend="cloudscraper",
+        save_session=False,
+        save_state=False,
+        storage_dir=str(tmp_path),
+        request_timeout=5,
+    )
+
+
+def _wait_for(check, timeout=5.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if check():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def arlo(cloud, tmp_path):
+    arlo = _login(cloud, tmp_path)
+    yield arlo
+    arlo.stop()
+
+
+def test_login_and_devices(cloud, arlo):
+    assert arlo.is_connected
+    assert [camera.device_id for camera in arlo.cameras] == ["CAM0001"]
+    assert [base.device_id for base in arlo.base_stations] == ["BASE0001"]
+    assert ("POST", "/api/auth") in [(method, path) for method, path, _body in cloud.requests]
+
+
+def test_mode_change(cloud, arlo):
+    base = arlo.base_stations[0]
+    assert _wait_for(lambda: base.mode == "disarmed")
+    base.mode = "armed"
+    assert _wait_for(lambda: base.mode == "armed")
+    assert cloud.modes["BASE0001"] == "mode1"
+
+
+def test_snapshot(arlo):
+    camera = arlo.cameras[0]
+    assert camera.get_snapshot(timeout=5)
+    assert camera.last_image_source.startswith("snapshot/")
+    assert _wait_for(lambda: camera.state == "idle")
+
+
+def test_stream(arlo):
+    camera = arlo.cameras[0]
+    assert camera.get_stream() == "rtsps://127.0.0.1:554/CAM0001?egressToken=standin"
+    assert _wait_for(lambda: camera.is_streaming)
+
+
+def test_library(cloud, arlo):
+    camera = arlo.cameras[0]
+    cloud.add_video("CAM0001")
+    arlo.ml.load()
+    camera.update_media(wait=True)
+    assert camera.last_video is not None
+    assert camera.attribute("capturedToday") == 1
+
+
+def test_failure_and_latency(cloud, arlo):
+    camera = arlo.cameras[0]
+    cloud.fail("/hmsweb/users/devices/startStream")
+    assert camera.get_stream() is None
+
+    cloud.latency = 0.2
+    start = time.monotonic()
+    assert camera.get_stream() is not None
+    assert time.monotonic() - start >= 0.2
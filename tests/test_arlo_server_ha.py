@@ -0,0 +1,34 @@
+"""Set the integration up against the local Arlo stand-in.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`. No network is used, the
+integration is pointed at the stand-in with `host` and `auth_host` in
+`aarlo.yaml`.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+
+async def test_setup_against_standin(hass, cloud, setup_aarlo):
+    entry = await setup_aarlo(
+        None,
+        f"host: {cloud.url}",
+        f"auth_host: {cloud.url}",
+        "backend: sse",
+        "http_backend: cloudscraper",
+        "save_session: false",
+    )
+
+    assert hass.states.get("camera.aarlo_front_door") is not None
+    assert hass.states.get("alarm_control_panel.aarlo_base") is not None
+
+    await hass.services.async_call("aarlo", "camera_request_snapshot",
+                                   {"entity_id": "camera.aarlo_front_door"}, blocking=True)
+    await hass.async_block_till_done()
+    assert ("POST", "/hmsweb/users/devices/fullFrameSnapshot") in [
+        (method, path) for method, path, _body in cloud.requests
+    ]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
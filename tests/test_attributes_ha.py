@@ -0,0 +1,30 @@
+"""Check which attributes the recorder is asked to skip.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from tests.fakes import make_arlo
+
+
+@pytest.mark.parametrize("state_attributes", ["full", "lean"])
+async def test_state_attributes(hass, setup_aarlo, state_attributes):
+    from custom_components.aarlo.camera import ArloCam
+
+    await setup_aarlo(make_arlo(), f"state_attributes: {state_attributes}")
+
+    attrs = hass.states.get("camera.aarlo_camera_0").attributes
+    assert ("device_id" in attrs) == (state_attributes == "full")
+    assert "signal_strength" in attrs
+    assert {"device_id", "signal_strength", "last_video"} <= ArloCam._unrecorded_attributes
+
+
+def test_locally_worked_out_sensors_skip_the_recorder():
+    from custom_components.aarlo.sensor import ArloActivitySensor, ArloBatterySensor
+
+    assert "device_id" in ArloActivitySensor._unrecorded_attributes
+    assert "device_id" in ArloBatterySensor._unrecorded_attributes
@@ -0,0 +1,89 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+from battery import DAY, HOUR, ArloBatteryEstimator
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1_000 * DAY
+
+    def __call__(self):
+        return self.now
+
+
+def _drain(estimator, clock, device_id, levels, step=HOUR):
+    for level in levels:
+        estimator.reading(device_id, level)
+        clock.now += step
+
+
+def test_drain_rate_and_time_to_empty():
+    clock = Clock()
+    estimator = ArloBatteryEstimator(clock=clock)
+    # 2% a day, a reading every 6 hours.
+    _drain(estimator, clock, "CAM0001", [80, 79.5, 79, 78.5, 78, 77.5, 77, 76.5], step=6 * HOUR)
+
+    estimate = estimator.estimate("CAM0001")
+    assert estimate == {"drain_per_day": 2.0, "days_to_empty": 38.2}
+
+
+def test_odd_readings_are_shrugged_off():
+    clock = Clock()
+    estimator = ArloBatteryEstimator(clock=clock)
+    levels = [90 - i * 0.25 for i in range(24)]
+    levels[5] = 40
+    levels[17] = 10
+    _drain(estimator, clock, "CAM0001", levels, step=3 * HOUR)
+    assert estimator.estimate("CAM0001")["drain_per_day"] == 2.0
+
+
+def test_needs_enough_readings():
+    clock = Clock()
+    estimator = ArloBatteryEstimator(clock=clock)
+    _drain(estimator, clock, "CAM0001", [80, 79, 78], step=HOUR)
+    assert estimator.estimate("CAM0001") == {"drain_per_day": None, "days_to_empty": None}
+
+    # The same level isn't kept again until an hour has passed.
+    assert not estimator.reading("CAM0001", 78, at=clock.now - 30 * 60)
+    assert estimator.estimate("CAM0002")["drain_per_day"] is None
+
+
+def test_charging_and_battery_swaps_start_again():
+    clock = Clock()
+    saved = []
+    estimator = ArloBatteryEstimator(clock=clock)
+    estimator.on_change = lambda: saved.append(1)
+    updated = []
+    estimator.on_update = updated.append
+    _drain(estimator, clock, "CAM0001", [80, 79, 78, 77, 76, 75, 74, 73])
+    assert estimator.estimate("CAM0001")["drain_per_day"] == 24.0
+
+    estimator.reading("CAM0001", 73, is_charging=True)
+    assert estimator.is_charging("CAM0001")
+    assert estimator.estimate("CAM0001")["drain_per_day"] is None
+    assert len(saved) == 9
+    assert updated == ["CAM0001"] * 9
+
+    _drain(estimator, clock, "CAM0001", [100, 99, 98, 97, 96, 95, 94])
+    assert not estimator.is_charging("CAM0001")
+    assert estimator.as_dict()["CAM0001"]["readings"][0][1] == 100
+
+    # A fresh battery.
+    estimator.reading("CAM0001", 100)
+    assert len(estimator.as_dict()["CAM0001"]["readings"]) == 1
+
+
+def test_readings_survive_a_restart():
+    clock = Clock()
+    estimator = ArloBatteryEstimator(window=8, clock=clock)
+    _drain(estimator, clock, "CAM0001", range(90, 70, -1), step=2 * HOUR)
+    saved = estimator.as_dict()
+    assert len(saved["CAM0001"]["readings"]) == 8
+    saved["CAM0001"]["readings"].append(["soon", 3])
+
+    restored = ArloBatteryEstimator(window=8, clock=clock).load(saved)
+    assert restored.estimate("CAM0001") == estimator.estimate("CAM0001")
+    assert restored.estimate("CAM0001")["drain_per_day"] == 12.0
+    assert ArloBatteryEstimator().load(None).as_dict() == {}
@@ -0,0 +1,44 @@
+"""Check the battery estimate sensors follow the readings.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`.
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from pyaarlo.constant import BATTERY_KEY, CHARGING_KEY
+
+from tests.fakes import make_arlo
+
+
+async def test_estimates_are_pushed(hass, setup_aarlo):
+    from custom_components.aarlo.battery import HOUR
+    from custom_components.aarlo.const import COMPONENT_BATTERY
+
+    arlo = make_arlo()
+    entry = await setup_aarlo(arlo, "battery_sensors: true")
+    camera = arlo.cameras[0]
+    # Readings an hour apart, after the one taken at set up.
+    now = [time.time() + HOUR]
+    hass.data[COMPONENT_BATTERY]._clock = lambda: now[0]
+
+    drain = "sensor.aarlo_battery_drain_camera_0"
+    for level in range(80, 72, -1):
+        await hass.async_add_executor_job(camera.set_attribute, BATTERY_KEY, level)
+        now[0] += HOUR
+    await hass.async_block_till_done()
+
+    # No polling; the estimate shows as soon as there's enough to go on.
+    assert hass.states.get(drain).state == "24.0"
+
+    camera.is_charging = True
+    await hass.async_add_executor_job(camera.set_attribute, CHARGING_KEY, True)
+    await hass.async_block_till_done()
+    assert hass.states.get(drain).attributes["charging"] is True
+    assert hass.states.get(drain).state == "unknown"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,86 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+import pytest
+
+from breaker import (
+    ArloCircuitBreaker,
+    ArloCircuitBreakers,
+    ArloCircuitOpen,
+    MAX_BACKOFF,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN
+)
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_trips_after_failures_and_probes_after_backoff():
+    clock = Clock()
+    breaker = ArloCircuitBreaker(failures=2, backoff=30, clock=clock)
+    breaker.failure("timeout")
+    assert breaker.allow()
+    breaker.failure("timeout")
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == STATE_HALF_OPEN
+    # Only one probe at a time.
+    assert not breaker.allow()
+
+    breaker.success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_doubles_backoff():
+    clock = Clock()
+    breaker = ArloCircuitBreaker(failures=1, backoff=30, clock=clock)
+    breaker.failure("timeout")
+    for expected in (60, 120, 240, 480, MAX_BACKOFF, MAX_BACKOFF):
+        clock.now += 1000
+        assert breaker.allow()
+        breaker.failure("timeout")
+        assert breaker.as_dict()["backoff"] == expected
+
+
+def test_offline_devices_are_blocked_until_they_return():
+    clock = Clock()
+    breaker = ArloCircuitBreaker(clock=clock)
+    breaker.connection("thermalShutdownCold")
+    assert breaker.state == STATE_OPEN
+    assert breaker.reason == "thermalShutdownCold"
+    clock.now += 10000
+    assert not breaker.allow()
+
+    breaker.connection("available")
+    assert breaker.allow()
+
+
+def test_activity_allows_an_early_probe():
+    clock = Clock()
+    breaker = ArloCircuitBreaker(failures=1, backoff=300, clock=clock)
+    breaker.failure("timeout")
+    assert not breaker.allow()
+    breaker.activity()
+    assert breaker.allow()
+
+
+def test_collection_raises_when_open():
+    breakers = ArloCircuitBreakers(failures=1, backoff=30, clock=Clock())
+    breakers.check("camera1").failure("no answer")
+    with pytest.raises(ArloCircuitOpen, match="camera1"):
+        breakers.check("camera1")
+    breakers.check("camera2")
+    assert breakers.as_dict()["camera1"]["state"] == STATE_OPEN
+    assert breakers.state("camera2") == STATE_CLOSED
@@ -0,0 +1,34 @@
+"""Check what counts against a device's circuit breaker.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.exceptions import HomeAssistantError
+
+
+async def test_timed_out_calls_open_the_circuit(hass):
+    from custom_components.aarlo.breaker import ArloCircuitBreakers, STATE_CLOSED, STATE_OPEN
+    from custom_components.aarlo.commands import PRIORITY_MEDIA
+    from custom_components.aarlo.const import COMPONENT_BREAKERS
+    from custom_components.aarlo.utils import async_run_command, get_circuit_state, no_result
+
+    hass.data[COMPONENT_BREAKERS] = ArloCircuitBreakers(failures=2)
+
+    def get_stream():
+        return None
+
+    # Without a predicate only exceptions count.
+    for _ in range(3):
+        assert await async_run_command(hass, "CAM0000", PRIORITY_MEDIA, get_stream) is None
+    assert get_circuit_state(hass, "CAM0000") == STATE_CLOSED
+
+    for _ in range(2):
+        await async_run_command(hass, "CAM0000", PRIORITY_MEDIA, get_stream, failed=no_result)
+    assert get_circuit_state(hass, "CAM0000") == STATE_OPEN
+    with pytest.raises(HomeAssistantError, match="get_stream returned None"):
+        await async_run_command(hass, "CAM0000", PRIORITY_MEDIA, get_stream, failed=no_result)
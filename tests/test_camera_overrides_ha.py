@@ -0,0 +1,105 @@
+"""Check the per camera settings from aarlo.yaml.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`.
+"""
+
+import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from pyaarlo.cfg import ArloCfg
+
+from tests.fakes import make_arlo
+
+
+def test_overrides_are_merged_by_name():
+    from custom_components.aarlo.cfg import camera_overrides
+
+    config = {
+        "cameras": {
+            "camera.aarlo_front": {"snapshot_timeout": 90, "stream_snapshot": False},
+            "A1B2C3": {"stream_snapshot": "yes"},
+            "camera.aarlo_broken": {"snapshot_checks": "soon"},
+        }
+    }
+    overrides = camera_overrides(config, "front", "camera.aarlo_front", "A1B2C3")
+    assert overrides == {"snapshot_timeout": datetime.timedelta(seconds=90), "stream_snapshot": True}
+    assert camera_overrides(config, "camera.aarlo_broken") == {}
+    assert camera_overrides({}, "camera.aarlo_front") == {}
+
+
+def test_device_sees_its_own_pyaarlo_config():
+    from custom_components.aarlo.cfg import PyaarloCfg
+
+    arlo = SimpleNamespace(cfg=ArloCfg(MagicMock(), snapshot_timeout=60), name="arlo")
+    device = SimpleNamespace(_arlo=arlo)
+
+    PyaarloCfg.override_device(device, {
+        "snapshot_timeout": datetime.timedelta(seconds=20),
+        "stream_snapshot": True,
+    })
+    assert device._arlo.cfg.snapshot_timeout == 20
+    assert device._arlo.cfg.stream_snapshot_stop == arlo.cfg.stream_snapshot_stop
+    assert device._arlo.name == "arlo"
+    assert arlo.cfg.snapshot_timeout == 60
+
+    # Overriding again replaces, it doesn't stack.
+    PyaarloCfg.override_device(device, {"user_stream_delay": 3})
+    assert device._arlo.arlo is arlo
+    assert device._arlo.cfg.snapshot_timeout == 60
+    PyaarloCfg.override_device(device, {})
+    assert device._arlo is arlo
+
+
+def test_device_without_a_pyaarlo_to_swap(caplog):
+    from custom_components.aarlo.cfg import PyaarloCfg
+
+    device = SimpleNamespace(name="front")
+    PyaarloCfg.override_device(device, {"user_stream_delay": 3})
+    assert "can't give front its own user_stream_delay" in caplog.text
+    assert not hasattr(device, "_arlo")
+
+
+async def test_camera_uses_its_overrides(hass, setup_aarlo):
+    arlo = make_arlo(cameras=2)
+    entry = await setup_aarlo(
+        arlo,
+        "cameras:",
+        "  CAM0000:",
+        "    stream_snapshot: true",
+        "    ffmpeg_arguments: -q:v 5",
+        "    snapshot_timeout: 15",
+    )
+
+    from homeassistant.components.camera import DOMAIN
+    cameras = {camera.entity_id: camera for camera in hass.data[DOMAIN].entities}
+    tuned = cameras["camera.aarlo_camera_0"]
+    plain = cameras["camera.aarlo_camera_1"]
+    assert tuned._ffmpeg_arguments == "-q:v 5"
+    assert plain._ffmpeg_arguments != "-q:v 5"
+    assert arlo.cameras[0]._arlo._options == {"snapshot_timeout": 15}
+    assert arlo.cameras[1]._arlo is arlo
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_overrides_by_entity_id_without_the_prefix(hass, aarlo_entry, setup_aarlo):
+    hass.config_entries.async_update_entry(aarlo_entry, data={**aarlo_entry.data, "add_aarlo_prefix": False})
+    arlo = make_arlo(cameras=1)
+    entry = await setup_aarlo(
+        arlo,
+        "cameras:",
+        "  camera.camera_0:",
+        "    ffmpeg_arguments: -q:v 5",
+    )
+
+    from homeassistant.components.camera import DOMAIN
+    cameras = {camera.entity_id: camera for camera in hass.data[DOMAIN].entities}
+    assert cameras["camera.camera_0"]._ffmpeg_arguments == "-q:v 5"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,152 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from commands import (
+    ArloCommandQueue,
+    PRIORITY_CONTROL,
+    PRIORITY_MEDIA,
+    PRIORITY_SAFETY
+)
+
+
+def _run(main, max_active):
+
+    async def _main():
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=8)
+
+        def run_job(func):
+            return loop.run_in_executor(executor, func)
+
+        try:
+            return await main(ArloCommandQueue(run_job, max_active))
+        finally:
+            executor.shutdown(wait=False)
+
+    return asyncio.run(_main())
+
+
+def test_result_is_returned():
+
+    async def main(queue):
+        return await queue.async_run("camera1", PRIORITY_CONTROL, lambda: 42)
+
+    assert _run(main, 2) == 42
+
+
+def test_safety_jumps_the_queue():
+    order = []
+
+    def job(name):
+        def _job():
+            order.append(name)
+            time.sleep(0.05)
+        return _job
+
+    async def main(queue):
+        # Block the only slot then queue up work in reverse priority order.
+        first = asyncio.ensure_future(queue.async_run("camera1", PRIORITY_CONTROL, job("busy")))
+        await asyncio.sleep(0.01)
+        tasks = [
+            asyncio.ensure_future(queue.async_run("camera2", PRIORITY_MEDIA, job("snapshot"))),
+            asyncio.ensure_future(queue.async_run("camera3", PRIORITY_CONTROL, job("light"))),
+            asyncio.ensure_future(queue.async_run("camera4", PRIORITY_SAFETY, job("siren"))),
+        ]
+        await asyncio.gather(first, *tasks)
+        return queue
+
+    queue = _run(main, 1)
+    assert order == ["busy", "siren", "light", "snapshot"]
+    assert queue.wait_times(PRIORITY_SAFETY)["count"] == 1
+    assert queue.as_dict()["waiting"] == 0
+
+
+def test_one_command_per_device():
+    running = {"now": 0, "max": 0}
+
+    def job():
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        time.sleep(0.05)
+        running["now"] -= 1
+
+    async def main(queue):
+        await asyncio.gather(*[queue.async_run("camera1", PRIORITY_MEDIA, job) for _ in range(3)])
+
+    _run(main, 4)
+    assert running["max"] == 1
+
+
+def test_safety_is_not_blocked_by_device_media():
+
+    async def main(queue):
+        snapshot = asyncio.ensure_future(queue.async_run("camera1", PRIORITY_MEDIA, lambda: time.sleep(0.5)))
+        await asyncio.sleep(0.01)
+        start = time.monotonic()
+        await queue.async_run("camera1", PRIORITY_SAFETY, lambda: None)
+        elapsed = time.monotonic() - start
+        await snapshot
+        return elapsed
+
+    assert _run(main, 4) < 0.25
+
+
+def test_media_leaves_a_slot_free():
+
+    async def main(queue):
+        media = [
+            asyncio.ensure_future(queue.async_run(f"camera{i}", PRIORITY_MEDIA, lambda: time.sleep(0.3)))
+            for i in range(2)
+        ]
+        await asyncio.sleep(0.01)
+        active = queue.active
+        start = time.monotonic()
+        await queue.async_run("light1", PRIORITY_CONTROL, lambda: None)
+        elapsed = time.monotonic() - start
+        await asyncio.gather(*media)
+        return active, elapsed
+
+    active, elapsed = _run(main, 2)
+    assert active == 1
+    assert elapsed < 0.2
+
+
+def test_cancelled_waiters_free_their_place():
+
+    async def main(queue):
+        busy = asyncio.ensure_future(queue.async_run("camera1", PRIORITY_CONTROL, lambda: time.sleep(0.1)))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(queue.async_run("camera2", PRIORITY_CONTROL, lambda: None))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await busy
+        result = await queue.async_run("camera3", PRIORITY_CONTROL, lambda: "ok")
+        return result, queue.active, queue.waiting
+
+    assert _run(main, 1) == ("ok", 0, 0)
+
+
+def test_cancelled_callers_keep_the_lane_until_the_call_returns():
+    order = []
+
+    def job(name, seconds):
+        def _job():
+            time.sleep(seconds)
+            order.append(name)
+        return _job
+
+    async def main(queue):
+        snapshot = asyncio.ensure_future(queue.async_run("camera1", PRIORITY_MEDIA, job("snapshot", 0.2)))
+        await asyncio.sleep(0.05)
+        snapshot.cancel()
+        await asyncio.sleep(0.01)
+        active = queue.active
+        await queue.async_run("camera1", PRIORITY_CONTROL, job("light", 0))
+        return active, queue.active
+
+    assert _run(main, 4) == (1, 0)
+    assert order == ["snapshot", "light"]
@@ -0,0 +1,57 @@
+"""Check aarlo.yaml is cached and watched.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`.
+"""
+
+import datetime
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from tests.fakes import make_arlo
+
+
+async def test_parsed_config_is_cached(hass, write_aarlo_yaml):
+    from custom_components.aarlo import cfg
+
+    write_aarlo_yaml("save_updates_to: /tmp/one")
+    with patch.object(cfg, "parse_yaml", wraps=cfg.parse_yaml) as parse_yaml:
+        first = cfg.BlendedCfg(hass)
+        await first.async_load_and_merge({}, {})
+        second = cfg.BlendedCfg(hass)
+        await second.async_load_and_merge({}, {})
+        assert parse_yaml.call_count == 1
+        assert second.domain_config["save_updates_to"] == "/tmp/one"
+
+        write_aarlo_yaml("save_updates_to: /tmp/three")
+        await second.async_load_and_merge({}, {})
+        assert parse_yaml.call_count == 2
+        assert second.domain_config["save_updates_to"] == "/tmp/three"
+
+
+async def test_live_options_are_applied(hass, setup_aarlo, write_aarlo_yaml, caplog):
+    from custom_components.aarlo.const import COMPONENT_CONFIG
+
+    arlo = make_arlo()
+    entry = await setup_aarlo(arlo, "config_watch: true", "snapshot_timeout: 30")
+
+    write_aarlo_yaml("config_watch: true", "snapshot_timeout: 90",
+                     "stream_snapshot: true", "backend: sse")
+    async_fire_time_changed(hass, dt_util.utcnow() + datetime.timedelta(seconds=11))
+    # Interval callbacks run as background tasks.
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    domain_config = hass.data[COMPONENT_CONFIG]["aarlo"]
+    assert domain_config["stream_snapshot"] is True
+    # pyaarlo's options wait for a reload.
+    assert domain_config["backend"] != "sse"
+    assert domain_config["snapshot_timeout"] != 90
+    assert "aarlo.yaml changed backend, snapshot_timeout; reload Aarlo to apply" in caplog.text
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,45 @@
+"""Check the counters behind the diagnostics.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.helpers import entity_registry as er
+from pyaarlo.constant import MOTION_DETECTED_KEY
+
+from tests.fakes import make_arlo
+
+
+async def test_only_our_state_writes_are_counted(hass, setup_aarlo):
+    from custom_components.aarlo.const import COMPONENT_STATS
+
+    arlo = make_arlo()
+    entry = await setup_aarlo(arlo)
+    stats = hass.data[COMPONENT_STATS]
+
+    def _state_writes():
+        counters = stats.as_dict()["counters"]
+        return {name: count for name, count in counters.items() if name.startswith("state_write/")}
+
+    before = _state_writes()
+    await hass.async_add_executor_job(arlo.cameras[0].set_attribute, MOTION_DETECTED_KEY, True)
+    await hass.async_block_till_done()
+    assert sum(_state_writes().values()) > sum(before.values())
+
+    before = _state_writes()
+    hass.states.async_set("light.kitchen", "on")
+    await hass.async_block_till_done()
+    assert _state_writes() == before
+
+    # Entities that turn up later are counted too.
+    late = er.async_get(hass).async_get_or_create("sensor", "aarlo", "late", config_entry=entry)
+    await hass.async_block_till_done()
+    hass.states.async_set(late.entity_id, "1")
+    await hass.async_block_till_done()
+    assert _state_writes()["state_write/sensor"] == before.get("state_write/sensor", 0) + 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,71 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+import asyncio
+import threading
+
+import pytest
+
+from executor import ArloExecutor, ArloExecutorFull
+
+
+def test_runs_jobs_and_counts_them():
+    executor = ArloExecutor(max_workers=2, max_queue=2)
+    try:
+        assert asyncio.run(executor.async_run(lambda x: x * 2, 21)) == 42
+        stats = executor.as_dict()
+        assert stats["submitted"] == 1
+        assert stats["completed"] == 1
+        assert stats["failed"] == 0
+        assert stats["active"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_failures_are_counted():
+
+    def broken():
+        raise RuntimeError("no camera")
+
+    executor = ArloExecutor(max_workers=1, max_queue=0)
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(executor.async_run(broken))
+        assert executor.as_dict()["failed"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_full_executor_fails_fast():
+    release = threading.Event()
+    executor = ArloExecutor(max_workers=1, max_queue=1)
+    try:
+        futures = [executor.submit(release.wait) for _ in range(2)]
+        assert executor.saturation == 1.0
+        with pytest.raises(ArloExecutorFull):
+            executor.submit(lambda: None)
+        assert executor.as_dict()["rejected"] == 1
+        release.set()
+        for future in futures:
+            future.result(timeout=1)
+        assert executor.as_dict()["completed"] == 2
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_time_is_kept_per_call_site():
+    from functools import partial
+
+    class Camera(object):
+        def get_snapshot(self, timeout):
+            return timeout
+
+    executor = ArloExecutor(max_workers=1, max_queue=4)
+    try:
+        camera = Camera()
+        for _ in range(3):
+            executor.submit(partial(camera.get_snapshot, 1)).result(timeout=1)
+        assert executor.as_dict()["sites"]["test_time_is_kept_per_call_site.<locals>.Camera.get_snapshot"]["count"] == 3
+    finally:
+        executor.shutdown()
@@ -0,0 +1,60 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fanout import async_fan_out
+
+
+def _run(jobs, deadline, on_late=None):
+
+    async def _main():
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=8)
+
+        def run_job(_name, func):
+            return loop.run_in_executor(executor, func)
+
+        try:
+            return await async_fan_out(run_job, jobs, deadline, on_late)
+        finally:
+            executor.shutdown()
+            # Let the stragglers' callbacks run.
+            await asyncio.sleep(0.05)
+
+    return asyncio.run(_main())
+
+
+def test_jobs_run_in_parallel():
+    jobs = [(f"siren{i}", lambda: time.sleep(0.2)) for i in range(5)]
+    result = _run(jobs, 5)
+    assert result.ok
+    assert set(result.latencies) == {f"siren{i}" for i in range(5)}
+    assert result.elapsed < 0.6
+
+
+def test_deadline_flags_stragglers():
+    late = {}
+    jobs = [("fast", lambda: None), ("slow", lambda: time.sleep(0.5))]
+    result = _run(jobs, 0.2, lambda name, latency: late.update({name: latency}))
+    assert result.timed_out == ["slow"]
+    assert result.stragglers == ["slow"]
+    assert "fast" in result.latencies
+    assert not result.ok
+
+    # It wasn't cancelled, we heard when it finished.
+    assert list(late) == ["slow"]
+    assert late["slow"] >= 0.5
+    assert result.latencies["slow"] == late["slow"]
+
+
+def test_errors_are_reported():
+
+    def broken():
+        raise RuntimeError("no siren")
+
+    result = _run([("broken", broken)], 1)
+    assert "broken" in result.errors
+    assert result.as_dict()["errors"] == {"broken": "no siren"}
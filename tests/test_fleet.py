@@ -0,0 +1,26 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+from pyaarlo.constant import MEDIA_PLAYER_KEY
+
+from tests.fakes import FLEET_BASE_SIZE, make_fleet
+
+
+def _count(arlo):
+    return len(arlo.cameras) + len(arlo.doorbells) + len(arlo.lights) + len(arlo.sensors)
+
+
+def test_fleet_sizes_add_up():
+    for size in (1, 10, 100, 500):
+        arlo = make_fleet(size)
+        assert _count(arlo) == size
+        assert len(arlo.base_stations) == max(1, -(-size // FLEET_BASE_SIZE))
+        assert len(arlo.devices) == size + len(arlo.base_stations)
+
+
+def test_fleet_is_mixed_and_repeatable():
+    arlo = make_fleet(100)
+    assert len(arlo.cameras) > len(arlo.sensors) > 0
+    assert any(camera.has_capability(MEDIA_PLAYER_KEY) for camera in arlo.cameras)
+    assert len({device.device_id for device in arlo.cameras}) == len(arlo.cameras)
+    assert [d.device_id for d in make_fleet(100).cameras] == [d.device_id for d in arlo.cameras]
@@ -0,0 +1,65 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+from history import (
+    EVENT_CAPTURE,
+    EVENT_DING,
+    EVENT_MOTION,
+    PRUNE_INTERVAL,
+    ArloEventHistory,
+)
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_events_are_stored_and_queried(tmp_path):
+    history = ArloEventHistory(str(tmp_path / "aarlo" / "events.db"), retention=0).start()
+    history.record("CAM0001", EVENT_MOTION, at=100.0)
+    history.record("CAM0001", EVENT_CAPTURE, object_type="Person", object_region={"x": 1},
+                   video_id="v1", at=110.0)
+    history.record("CAM0002", EVENT_CAPTURE, object_type="Vehicle", video_id="v2", at=120.0)
+    history.record("BELL0001", EVENT_DING, at=130.0)
+    # Seen again when pyaarlo restarts.
+    history.record("CAM0001", EVENT_CAPTURE, object_type="Person", video_id="v1", at=110.0)
+    history.stop()
+
+    assert history.as_dict()["written"] == 4
+    everything = history.query()
+    assert [event["at"] for event in everything] == [130.0, 120.0, 110.0, 100.0]
+    assert everything[2] == {
+        "at": 110.0, "device_id": "CAM0001", "event": EVENT_CAPTURE,
+        "object_type": "Person", "object_region": "{'x': 1}", "video_id": "v1",
+    }
+
+    people = history.query(events=[EVENT_CAPTURE], object_type="Person")
+    assert [event["video_id"] for event in people] == ["v1"]
+    assert len(history.query(start=105.0, end=130.0)) == 2
+    assert len(history.query(device_ids=["CAM0001", "BELL0001"])) == 3
+    assert len(history.query(limit=1)) == 1
+
+
+def test_old_events_are_removed(tmp_path):
+    clock = Clock()
+    history = ArloEventHistory(str(tmp_path / "events.db"), retention=PRUNE_INTERVAL * 2,
+                               clock=clock).start()
+    history.record("CAM0001", EVENT_MOTION, at=clock.now - PRUNE_INTERVAL * 3)
+    history.record("CAM0001", EVENT_MOTION)
+    history.stop()
+
+    assert history.as_dict()["pruned"] == 1
+    assert len(history.query()) == 1
+
+
+def test_a_full_queue_drops_events(tmp_path):
+    history = ArloEventHistory(str(tmp_path / "events.db"), max_queue=2)
+    assert history.record("CAM0001", EVENT_MOTION)
+    assert history.record("CAM0001", EVENT_MOTION)
+    assert not history.record("CAM0001", EVENT_MOTION)
+    assert history.as_dict()["dropped"] == 1
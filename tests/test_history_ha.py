@@ -0,0 +1,59 @@
+"""Check events reach the event history and can be searched.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from pyaarlo.constant import BUTTON_PRESSED_KEY, LAST_IMAGE_SRC_KEY, MOTION_DETECTED_KEY
+
+from tests.fakes import make_arlo
+
+
+async def test_events_are_recorded_and_searched(hass, hass_ws_client, setup_aarlo):
+    from custom_components.aarlo.const import COMPONENT_HISTORY
+
+    arlo = make_arlo()
+    entry = await setup_aarlo(arlo, "event_history: true")
+
+    camera, doorbell = arlo.cameras[0], arlo.doorbells[0]
+    camera.last_video = SimpleNamespace(
+        id="video-1", created_at=None, object_type="Person", object_region="1,2,3,4",
+        video_url=None, thumbnail_url=None,
+    )
+    await hass.async_add_executor_job(camera.set_attribute, MOTION_DETECTED_KEY, True)
+    await hass.async_add_executor_job(camera.set_attribute, LAST_IMAGE_SRC_KEY, "capture/1")
+    await hass.async_add_executor_job(camera.set_attribute, LAST_IMAGE_SRC_KEY, "snapshot/2")
+    await hass.async_add_executor_job(doorbell.set_attribute, BUTTON_PRESSED_KEY, True)
+
+    # Let the writer catch up.
+    history = hass.data[COMPONENT_HISTORY]
+    await hass.async_add_executor_job(history.stop)
+    history.start()
+
+    client = await hass_ws_client(hass)
+    await client.send_json({
+        "id": 1,
+        "type": "aarlo_event_history",
+        "entity_id": "camera.aarlo_camera_0",
+        "event_types": ["capture"],
+    })
+    response = await client.receive_json()
+    assert response["success"]
+    events = response["result"]["events"]
+    assert [(event["event"], event["object_type"], event["video_id"]) for event in events] == [
+        ("capture", "Person", "video-1")
+    ]
+
+    await client.send_json({"id": 2, "type": "aarlo_event_history"})
+    response = await client.receive_json()
+    assert sorted(event["event"] for event in response["result"]["events"]) == [
+        "capture", "ding", "motion"
+    ]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,113 @@
+import sys, os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+from image_cache import ArloImageStore, ArloImageVariants, image_bucket
+
+
+def test_no_size_uses_full_image():
+    assert image_bucket() is None
+    assert image_bucket(None, None) is None
+
+
+def test_sizes_round_up_to_buckets():
+    assert image_bucket(300, None) == (320, 0)
+    assert image_bucket(321, 200) == (640, 360)
+    assert image_bucket(None, 720) == (0, 720)
+
+
+def test_oversized_request_uses_full_image():
+    assert image_bucket(2560, None) is None
+    assert image_bucket(640, 1080) is None
+
+
+def test_variants_are_keyed_by_source():
+    variants = ArloImageVariants()
+    assert variants.put("capture/1", (320, 0), b"small")
+    assert variants.get("capture/1", (320, 0)) == b"small"
+    assert variants.get("capture/1", (640, 0)) is None
+    assert variants.get("capture/2", (320, 0)) is None
+    assert variants.size == 5
+
+
+def test_new_source_evicts_variants():
+    variants = ArloImageVariants()
+    variants.put("capture/1", (320, 0), b"small")
+    variants.evict("snapshot/2")
+    assert variants.count == 0
+    assert variants.get("capture/1", (320, 0)) is None
+
+
+def test_stale_variant_is_not_stored():
+    variants = ArloImageVariants()
+    variants.evict("snapshot/2")
+    assert not variants.put("capture/1", (320, 0), b"small")
+    assert variants.count == 0
+
+
+def test_store_shares_one_copy():
+    store = ArloImageStore()
+    data = b"\xff\xd8" + b"x" * 100
+    image = store.put("CAM0001", "capture/1", data)
+    assert image.data is data
+    assert store.get("CAM0001").data is data
+    view = store.view("CAM0001")
+    assert view.obj is data and view.readonly
+    assert store.size == len(data)
+
+
+def test_store_generations():
+    store = ArloImageStore()
+    data = b"first"
+    first = store.put("CAM0001", "capture/1", data)
+    # The same image again, maybe with its source, is not a new generation.
+    assert store.put("CAM0001", "snapshot/2", data).generation == first.generation
+    assert store.get("CAM0001").source == "snapshot/2"
+    second = store.put("CAM0002", "capture/1", b"other")
+    third = store.put("CAM0001", "capture/3", bytearray(b"second"))
+    assert first.generation < second.generation < third.generation
+    assert isinstance(third.data, bytes)
+    assert store.put("CAM0001", "capture/4", None) is None
+
+
+def test_store_variants_follow_the_image():
+    store = ArloImageStore()
+    image = store.put("CAM0001", "capture/1", b"full image")
+    assert store.put_variant("CAM0001", image.generation, (320, 0), b"small")
+    assert store.get_variant("CAM0001", image.generation, (320, 0)) == b"small"
+    assert store.size == len(b"full image") + len(b"small")
+
+    newer = store.put("CAM0001", "capture/2", b"newer image")
+    assert store.get_variant("CAM0001", image.generation, (320, 0)) is None
+    assert not store.put_variant("CAM0001", image.generation, (320, 0), b"stale")
+    assert not store.put_variant("CAM0009", 1, (320, 0), b"unknown")
+
+    summary = store.as_dict()
+    assert summary["images"] == 1
+    assert summary["image_bytes"] == len(b"newer image")
+    assert summary["cameras"]["CAM0001"]["generation"] == newer.generation
+
+    store.remove("CAM0001")
+    assert store.get("CAM0001") is None and store.view("CAM0001") is None
+    assert store.size == 0
+
+
+def test_store_variants_follow_the_newest_of_racing_images(monkeypatch):
+    store = ArloImageStore()
+    evict = ArloImageVariants.evict
+
+    def slow_evict(variants, source=None):
+        # Hold up the first image's evict so the second can overtake it.
+        if source == 1:
+            time.sleep(0.2)
+        evict(variants, source)
+
+    monkeypatch.setattr(ArloImageVariants, "evict", slow_evict)
+    first = threading.Thread(target=store.put, args=("CAM0001", "capture/1", b"first"))
+    first.start()
+    time.sleep(0.05)
+    newest = store.put("CAM0001", "capture/2", b"second")
+    first.join()
+
+    assert store.put_variant("CAM0001", newest.generation, (320, 0), b"small")
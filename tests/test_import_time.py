@@ -0,0 +1,122 @@
+"""What importing the integration costs, `python -X importtime` style.
+
+Home Assistant and pyaarlo are imported first so only what Aarlo adds on top
+is counted. Run with `-s` to see the slowest modules. The budget, in
+milliseconds, can be changed with `AARLO_IMPORT_BUDGET_MS`; it's generous
+because the test machines vary, it's there to catch a heavy import creeping
+back in. Importing the package mustn't load the modules behind the options
+either, they're loaded once they're wanted.
+
+The import test needs Home Assistant installed.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+BUDGET_MS = float(os.environ.get("AARLO_IMPORT_BUDGET_MS", 500))
+MARKER = "aarlo-import-start"
+
+# Already loaded by the time Home Assistant gets to us.
+BASELINE = [
+    "homeassistant.core",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.components.camera",
+    "homeassistant.components.ffmpeg",
+    "homeassistant.components.websocket_api",
+    "pyaarlo",
+]
+MODULES = ["custom_components.aarlo", "custom_components.aarlo.camera"]
+
+# Only needed by rarely used code paths.
+DEFERRED = [
+    "custom_components.aarlo.packet_dump",
+    "custom_components.aarlo.replay",
+    "haffmpeg.camera",
+    "pprint",
+]
+
+# Only loaded once they're turned on, or once we've logged in.
+OPT_IN = [
+    "custom_components.aarlo.activity",
+    "custom_components.aarlo.battery",
+    "custom_components.aarlo.limiter",
+    "custom_components.aarlo.refresh",
+    "custom_components.aarlo.snapshots",
+    "custom_components.aarlo.tracing",
+]
+
+SCRIPT = f"""
+import importlib, json, sys
+for name in {BASELINE!r}:
+    importlib.import_module(name)
+before = set(sys.modules)
+sys.stderr.write("{MARKER}\\n")
+for name in {MODULES!r}:
+    importlib.import_module(name)
+    if name == "custom_components.aarlo":
+        package = sorted(set(sys.modules) - before)
+print(json.dumps([package, sorted(set(sys.modules) - before)]))
+"""
+
+
+def parse_importtime(text, marker=None):
+    """Turn `-X importtime` output into `[(module, self_us, cumulative_us)]`.
+
+    With `marker` only the imports after that line are returned.
+    """
+    imports = []
+    for line in text.splitlines():
+        if marker is not None:
+            if line.strip() == marker:
+                marker = None
+            continue
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        imports.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return imports
+
+
+def test_parse_importtime():
+    text = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   json.decoder\n"
+        "import time:       200 |        300 | json\n"
+        f"{MARKER}\n"
+        "import time:        50 |         50 |   custom_components.aarlo.const\n"
+        "import time:      1000 |       1050 | custom_components.aarlo\n"
+    )
+    assert len(parse_importtime(text)) == 4
+    assert parse_importtime(text, MARKER) == [
+        ("custom_components.aarlo.const", 50, 50),
+        ("custom_components.aarlo", 1000, 1050),
+    ]
+
+
+def test_import_time():
+    pytest.importorskip("homeassistant")
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    package, imported = (set(modules) for modules in json.loads(result.stdout))
+    imports = parse_importtime(result.stderr, MARKER)
+    total_ms = sum(self_us for _name, self_us, _cumulative in imports) / 1000
+
+    print(f"\naarlo import: {total_ms:.1f}ms, {len(imports)} modules")
+    for name, self_us, _cumulative in sorted(imports, key=lambda i: -i[1])[:10]:
+        print(f"  {self_us / 1000:8.1f}ms {name}")
+
+    assert not imported & set(DEFERRED)
+    assert not package & set(OPT_IN)
+    assert total_ms < BUDGET_MS
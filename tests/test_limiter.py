@@ -0,0 +1,60 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+import asyncio
+
+from limiter import ArloRateLimiter, ArloTokenBucket
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_burst_then_throttle():
+    clock = Clock()
+    bucket = ArloTokenBucket(rate=2.0, burst=3, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Queued requests get later and later slots instead of being dropped.
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+    assert bucket.throttled == 2
+
+
+def test_bucket_refills():
+    clock = Clock()
+    bucket = ArloTokenBucket(rate=1.0, burst=2, clock=clock)
+    bucket.reserve()
+    bucket.reserve()
+    clock.now += 10
+    assert bucket.tokens == 2
+    assert bucket.reserve() == 0.0
+
+
+def test_classes_have_their_own_budgets():
+    clock = Clock()
+    limiter = ArloRateLimiter({"media": 1.0}, clock=clock)
+    for _ in range(4):
+        limiter.reserve("media")
+    assert limiter.reserve("media") > 0
+    assert limiter.reserve("safety") == 0.0
+    stats = limiter.as_dict()
+    assert stats["media"]["rate"] == 1.0
+    assert stats["media"]["throttled"] == 1
+    assert "safety" not in stats
+
+
+def test_async_acquire_waits():
+    limiter = ArloRateLimiter({"control": 50.0})
+
+    async def main():
+        delays = [await limiter.async_acquire("control") for _ in range(7)]
+        return delays
+
+    delays = asyncio.run(main())
+    assert delays[:5] == [0.0] * 5
+    assert delays[5] > 0
@@ -0,0 +1,146 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+import threading
+import time
+
+from packet_dump import ArloPacketDump
+from replay import load_packets
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _packet(i):
+    return {"resource": "cameras/CAM0000", "from": "CAM0000", "properties": {"motionDetected": i % 2 == 0, "n": i}}
+
+
+def _write_slowly(dump, packets):
+    """Let the writer catch up after each packet."""
+    for packet in packets:
+        written = dump.as_dict()["written"]
+        dump.write(packet)
+        while dump.as_dict()["written"] == written:
+            time.sleep(0.001)
+
+
+def test_write_and_read_back(tmp_path):
+    filename = str(tmp_path / "packets.dump.gz")
+    dump = ArloPacketDump(filename).start()
+    for i in range(20):
+        assert dump.write(_packet(i))
+    dump.stop()
+
+    packets = load_packets(filename)
+    assert [packet["properties"]["n"] for _at, packet in packets] == list(range(20))
+    assert all(at is not None for at, _packet in packets)
+    assert dump.as_dict()["written"] == 20
+
+
+def test_appends_and_survives_a_torn_record(tmp_path):
+    filename = str(tmp_path / "packets.dump.gz")
+    for start in (0, 5):
+        dump = ArloPacketDump(filename).start()
+        for i in range(start, start + 5):
+            dump.write(_packet(i))
+        dump.stop()
+    with open(filename, "ab") as file:
+        file.write(b"\x1f\x8b\x08\x00garbage")
+
+    assert [packet["properties"]["n"] for _at, packet in load_packets(filename)] == list(range(10))
+
+
+def test_rotates_by_size_and_age(tmp_path):
+    filename = str(tmp_path / "packets.dump.gz")
+    clock = Clock()
+    dump = ArloPacketDump(filename, max_size=200, max_age=60, backups=2, flush_records=1, clock=clock).start()
+    _write_slowly(dump, [_packet(i) for i in range(50)])
+    dump.stop()
+    assert dump.as_dict()["rotations"] > 2
+    assert sorted(os.listdir(tmp_path)) == ["packets.dump.gz", "packets.dump.gz.1", "packets.dump.gz.2"]
+    # The newest file has the newest packets.
+    assert load_packets(filename)[-1][1]["properties"]["n"] == 49
+
+    dump = ArloPacketDump(filename, max_size=0, max_age=60, backups=2, clock=clock).start()
+    _write_slowly(dump, [_packet(0)])
+    clock.now += 61
+    _write_slowly(dump, [_packet(1)])
+    dump.stop()
+    assert [packet["properties"]["n"] for _at, packet in load_packets(filename)] == [1]
+
+
+def test_sampling_and_a_full_queue(tmp_path):
+    filename = str(tmp_path / "packets.dump.gz")
+    values = iter([0.05, 0.5, 0.09, 0.95])
+    dump = ArloPacketDump(filename, sample=0.1, rand=lambda: next(values))
+    kept = [dump.write(_packet(i)) for i in range(4)]
+    assert kept == [True, False, True, False]
+    assert dump.as_dict()["skipped"] == 2
+
+    # Nothing is draining the queue; writes are dropped, not blocked on.
+    dump = ArloPacketDump(filename, max_queue=3)
+    finished = threading.Event()
+
+    def _flood():
+        for i in range(10):
+            dump.write(_packet(i))
+        finished.set()
+
+    threading.Thread(target=_flood).start()
+    assert finished.wait(1)
+    assert dump.as_dict()["dropped"] == 7
+    dump.start()
+    dump.stop()
+    assert len(load_packets(filename)) == 3
+
+
+def test_flushes_when_quiet(tmp_path):
+    filename = str(tmp_path / "packets.dump.gz")
+    dump = ArloPacketDump(filename, flush_interval=0.05).start()
+    _write_slowly(dump, [_packet(0)])
+    # Readable while the file is still open.
+    deadline = time.monotonic() + 5
+    while not load_packets(filename) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [packet["properties"]["n"] for _at, packet in load_packets(filename)] == [0]
+    dump.stop()
+
+
+def test_survives_a_bad_write_and_never_holds_up_stop(tmp_path):
+    filename = str(tmp_path / "packets.dump.gz")
+    blocked = threading.Event()
+
+    def _misbehave(dump):
+        write = dump._write
+
+        def _write(at, packet):
+            if packet.get("boom"):
+                raise RuntimeError("boom")
+            if packet.get("block"):
+                blocked.wait(5)
+            write(at, packet)
+
+        dump._write = _write
+        return dump.start()
+
+    dump = _misbehave(ArloPacketDump(filename))
+    dump.write({"boom": True})
+    _write_slowly(dump, [_packet(0)])
+    assert dump.as_dict()["errors"] == 1
+    dump.stop()
+    assert [packet["properties"]["n"] for _at, packet in load_packets(filename)] == [0]
+
+    # A stuck writer and a full queue; stop still gives up in time.
+    dump = _misbehave(ArloPacketDump(filename, max_queue=2))
+    for _ in range(5):
+        dump.write({"block": True})
+    started = time.monotonic()
+    dump.stop(timeout=0.2)
+    assert time.monotonic() - started < 1
+    blocked.set()
@@ -0,0 +1,98 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+from refresh import DAY, ArloRefreshScheduler, daily_budget
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _run(scheduler, clock, seconds, step=15, power=None):
+    """Tick the scheduler for `seconds`; returns what was refreshed when."""
+    refreshed = []
+    end = clock.now + seconds
+    while clock.now < end:
+        for camera_id in scheduler.due(power):
+            refreshed.append((clock.now, camera_id))
+        clock.now += step
+    return refreshed
+
+
+def test_budget_follows_the_battery():
+    assert daily_budget(48, 100) == 48
+    assert daily_budget(48, 50) == 24
+    assert daily_budget(48, 11) == 5
+    assert daily_budget(48, 10) == 0
+    assert daily_budget(48, 5, is_charging=True) is None
+    assert daily_budget(48, None, has_charger=True) is None
+    assert daily_budget(48, None) == 48
+
+
+def test_cameras_are_staggered_and_spaced():
+    clock = Clock()
+    scheduler = ArloRefreshScheduler(budget=1000, spacing=10, clock=clock)
+    for camera in ("camera.aarlo_front", "camera.aarlo_back", "camera.aarlo_side"):
+        scheduler.add(camera, 600)
+
+    refreshed = _run(scheduler, clock, 1800, step=1)
+    times = [when for when, _camera in refreshed]
+    assert all(b - a >= 10 for a, b in zip(times, times[1:]))
+    for camera in ("camera.aarlo_front", "camera.aarlo_back", "camera.aarlo_side"):
+        assert 2 <= sum(1 for _when, c in refreshed if c == camera) <= 4
+
+    # Spread across the interval rather than bunched at the start.
+    first = sorted(scheduler.next_refresh(c) for c in ("camera.aarlo_front", "camera.aarlo_back"))
+    assert first[1] - first[0] > 10
+
+
+def test_a_fresh_image_is_left_alone():
+    clock = Clock()
+    scheduler = ArloRefreshScheduler(clock=clock)
+    scheduler.add("camera.aarlo_front", 3600)
+    clock.now = scheduler.next_refresh("camera.aarlo_front") - 60
+    scheduler.image_updated("camera.aarlo_front")
+    clock.now += 60
+
+    assert scheduler.due() == []
+    assert scheduler.next_refresh("camera.aarlo_front") == clock.now - 60 + 3600
+    assert scheduler.as_dict()["camera.aarlo_front"]["skipped"] == 1
+
+
+def test_battery_cameras_keep_to_their_budget():
+    clock = Clock()
+    scheduler = ArloRefreshScheduler(budget=48, clock=clock)
+    scheduler.add("camera.aarlo_battery", 60)
+    scheduler.add("camera.aarlo_wired", 600)
+    power = {
+        "camera.aarlo_battery": (50, False, False),
+        "camera.aarlo_wired": (None, False, True),
+    }
+
+    refreshed = _run(scheduler, clock, DAY, power=power.get)
+    # Half charged, half the budget; the interval stretches to fit.
+    assert sum(1 for _when, c in refreshed if c == "camera.aarlo_battery") <= 24
+    assert sum(1 for _when, c in refreshed if c == "camera.aarlo_wired") >= 140
+    assert scheduler.as_dict()["camera.aarlo_battery"]["effective_interval"] == DAY / 24
+
+    # Nearly flat, no more wake ups.
+    power["camera.aarlo_battery"] = (8, False, False)
+    refreshed = _run(scheduler, clock, DAY, power=power.get)
+    assert all(c != "camera.aarlo_battery" for _when, c in refreshed)
+
+
+def test_removing_a_camera():
+    clock = Clock()
+    scheduler = ArloRefreshScheduler(clock=clock)
+    scheduler.add("camera.aarlo_front", 60)
+    scheduler.add("camera.aarlo_back", 60)
+    scheduler.add("camera.aarlo_back", 0)
+    scheduler.remove("camera.aarlo_front")
+    assert scheduler.next_refresh("camera.aarlo_front") is None
+    assert _run(scheduler, clock, 600) == []
+    assert scheduler.as_dict() == {}
@@ -0,0 +1,42 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+from registry import ArloEntityRegistry
+
+
+def test_lookup_entity_and_device():
+    registry = ArloEntityRegistry()
+    camera, device = object(), object()
+    registry.add("camera.aarlo_front", camera, device)
+    assert registry.entity("camera.aarlo_front") is camera
+    assert registry.device("camera.aarlo_front") is device
+    assert "camera.aarlo_front" in registry
+
+
+def test_lookup_checks_domain():
+    registry = ArloEntityRegistry()
+    camera = object()
+    registry.add("camera.aarlo_front", camera, None)
+    assert registry.entity("camera.aarlo_front", "camera") is camera
+    assert registry.entity("camera.aarlo_front", ["alarm_control_panel", "camera"]) is camera
+    assert registry.entity("camera.aarlo_front", ["alarm_control_panel"]) is None
+    assert registry.entity("camera.aarlo_back", "camera") is None
+
+
+def test_remove_only_removes_owner():
+    registry = ArloEntityRegistry()
+    old, new = object(), object()
+    registry.add("camera.aarlo_front", new, None)
+    registry.remove("camera.aarlo_front", old)
+    assert registry.entity("camera.aarlo_front") is new
+    registry.remove("camera.aarlo_front", new)
+    assert len(registry) == 0
+
+
+def test_entities_filters_by_domain():
+    registry = ArloEntityRegistry()
+    camera, base = object(), object()
+    registry.add("camera.aarlo_front", camera, None)
+    registry.add("alarm_control_panel.aarlo_base", base, None)
+    assert registry.entities("camera") == [camera]
+    assert len(registry.entities()) == 2
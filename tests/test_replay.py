@@ -0,0 +1,108 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+import asyncio
+import json
+import time
+
+from replay import async_iter_blocking, async_replay, iter_packet_files, load_packets, parse_packets
+
+from tests.fakes import make_arlo
+from tests.replay_harness import PACKETS_DIR, async_bench_replay
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_parse_packet_dump():
+    packets = load_packets(os.path.join(PACKETS_DIR, "motion.dump"))
+    # The "event_thread start" line isn't a packet.
+    assert len(packets) == 7
+    at, packet = packets[1]
+    assert packet["resource"] == "cameras/CAM0000"
+    assert round(at - packets[0][0], 3) == 4.637
+
+
+def test_parse_packet_json():
+    lines = [
+        json.dumps({"at": 10.0, "packet": {"resource": "cameras/A"}}),
+        json.dumps({"resource": "cameras/B"}),
+    ]
+    assert parse_packets("\n".join(lines)) == [(10.0, {"resource": "cameras/A"}), (None, {"resource": "cameras/B"})]
+    assert parse_packets(json.dumps([{"resource": "cameras/A"}])) == [(None, {"resource": "cameras/A"})]
+
+
+def test_read_a_directory_oldest_first(tmp_path):
+    (tmp_path / "new.json").write_text(json.dumps({"at": 20.0, "packet": {"n": 3}}) + "\n")
+    with open(os.path.join(PACKETS_DIR, "motion.dump")) as dump:
+        (tmp_path / "old.dump").write_text(dump.read())
+    (tmp_path / "list.json").write_text(json.dumps([{"n": 1}, {"n": 2}]))
+    now = time.time()
+    for age, name in enumerate(["new.json", "list.json", "old.dump"]):
+        os.utime(tmp_path / name, (now - age * 60, now - age * 60))
+
+    packets = list(iter_packet_files(str(tmp_path)))
+    assert len(packets) == 10
+    assert packets[0][1]["resource"] == "subscriptions/USER-1_web"
+    assert [packet for _at, packet in packets[-3:]] == [{"n": 1}, {"n": 2}, {"n": 3}]
+
+
+def test_replay_from_a_blocking_reader():
+    clock = Clock()
+    sent = []
+    ran = []
+
+    async def run(func):
+        ran.append(func)
+        return func()
+
+    async def replay():
+        packets = async_iter_blocking(iter([(None, {"n": n}) for n in range(5)]), run, batch=2)
+        return await async_replay(packets, lambda packet: sent.append(packet["n"]), clock=clock, sleep=clock.sleep)
+
+    result = asyncio.run(replay())
+    assert sent == [0, 1, 2, 3, 4]
+    assert result["packets"] == 5
+    # Three batches and one more to find the end.
+    assert len(ran) == 4
+
+
+def test_replay_keeps_recorded_gaps():
+    clock = Clock()
+    sent = []
+
+    def inject(packet):
+        sent.append((clock.now, packet["n"]))
+
+    packets = [(100.0, {"n": 1}), (102.0, {"n": 2}), (None, {"n": 3}), (106.0, {"n": 4})]
+    result = asyncio.run(async_replay(packets, inject, speed=2.0, clock=clock, sleep=clock.sleep))
+    assert sent == [(0.0, 1), (1.0, 2), (1.0, 3), (3.0, 4)]
+    assert result["packets"] == 4
+    assert result["max_late"] == 0.0
+
+
+def test_replay_drives_callbacks():
+    arlo = make_arlo()
+    camera = arlo.lookup("CAM0000")
+    seen = []
+    camera.add_attr_callback("motionDetected", lambda _device, attr, value: seen.append(value))
+
+    packets = load_packets(os.path.join(PACKETS_DIR, "motion.dump"))
+    report = asyncio.run(async_bench_replay(arlo, packets))
+
+    assert seen == [True, False]
+    assert camera.attribute("batteryLevel") == 87
+    assert arlo.lookup("BASE0001").mode == "mode1"
+    assert report["packets"] == 7
+    assert report["callbacks"] == 2
+    assert report["state_writes"] == 0
+    assert report["peak_memory"] > 0
@@ -0,0 +1,67 @@
+"""Replay a recorded stream through the real platforms.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`. Run with `-s` to see
+the numbers.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.const import EVENT_STATE_CHANGED
+
+from tests.fakes import make_arlo
+from tests.replay_harness import PACKETS_DIR, async_bench_replay
+
+
+@pytest.mark.parametrize("speed", [None, 50.0])
+async def test_replay_through_platforms(hass, setup_aarlo, speed):
+    from replay import load_packets
+
+    arlo = make_arlo(cameras=2, doorbells=1, lights=1, sensors=1)
+    await setup_aarlo(arlo)
+
+    def _listen(counter):
+        return hass.bus.async_listen(EVENT_STATE_CHANGED, counter)
+
+    async def _inject(packet):
+        # pyaarlo runs callbacks on its own thread, so do we.
+        await hass.async_add_executor_job(arlo.inject_response, packet)
+
+    packets = load_packets(os.path.join(PACKETS_DIR, "motion.dump"))
+    report = await async_bench_replay(arlo, packets, _inject, speed, _listen, hass.async_block_till_done)
+
+    print(f"replay speed={speed}: {report}")
+    assert report["callbacks"] > 0
+    assert report["state_writes"] > 0
+
+
+async def test_replay_packets_service(hass, setup_aarlo):
+    arlo = make_arlo()
+    await setup_aarlo(arlo, "injection_service: true")
+    hass.config.allowlist_external_dirs = {PACKETS_DIR}
+
+    report = await hass.services.async_call(
+        "aarlo", "replay_packets", {"path": os.path.join(PACKETS_DIR, "motion.dump")},
+        blocking=True, return_response=True,
+    )
+
+    assert report["packets"] == 7
+    assert report["packets_per_s"] > 0
+    assert report["loop_lag_max"] >= 0
+    assert arlo.lookup("CAM0000").attribute("batteryLevel") == 87
+
+
+async def test_replay_packets_service_stays_in_allowed_paths(hass, setup_aarlo):
+    from homeassistant.exceptions import HomeAssistantError
+
+    await setup_aarlo(make_arlo(), "injection_service: true")
+
+    with pytest.raises(HomeAssistantError, match="no access to path"):
+        await hass.services.async_call(
+            "aarlo", "replay_packets", {"path": os.path.join(PACKETS_DIR, "motion.dump")},
+            blocking=True, return_response=True,
+        )
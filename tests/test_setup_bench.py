@@ -0,0 +1,102 @@
+"""Time `async_setup_entry` against synthetic fleets.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`. Run with `-s` to see
+the numbers. With `AARLO_BENCH_RECORD=1` each run is appended to
+`tests/benchmarks/setup_times.jsonl`; commit that file to track changes.
+"""
+
+import datetime
+import importlib
+import json
+import os
+import platform
+import time
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.const import EVENT_STATE_CHANGED, __version__ as HA_VERSION
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.aarlo import ARLO_PLATFORMS
+from custom_components.aarlo.const import COMPONENT_STATS
+
+from tests.fakes import make_fleet
+
+
+RESULTS = os.path.join(os.path.dirname(__file__), "benchmarks", "setup_times.jsonl")
+
+
+def _timed_platform(name, setup, timings):
+    """Wrap a platform's setup, noting construction and setup times."""
+
+    async def _setup(hass, entry, async_add_entities):
+        start = time.perf_counter()
+
+        def _add(entities, *args, **kwargs):
+            entities = list(entities)
+            timings[f"{name}/construct"] = time.perf_counter() - start
+            timings[f"{name}/entities"] = timings.get(f"{name}/entities", 0) + len(entities)
+            return async_add_entities(entities, *args, **kwargs)
+
+        await setup(hass, entry, _add)
+        timings[f"{name}/setup"] = time.perf_counter() - start
+
+    return _setup
+
+
+@pytest.mark.parametrize("devices", [10, 100, 500])
+async def test_setup_time(hass, aarlo_entry, devices):
+    arlo = make_fleet(devices)
+    timings = {}
+    patches = [patch("custom_components.aarlo.login", return_value=arlo)]
+    for name in ARLO_PLATFORMS:
+        module = importlib.import_module(f"custom_components.aarlo.{name}")
+        patches.append(patch.object(
+            module, "async_setup_entry", _timed_platform(str(name), module.async_setup_entry, timings)
+        ))
+
+    writes = []
+    hass.bus.async_listen(EVENT_STATE_CHANGED, lambda _event: writes.append(time.perf_counter()))
+
+    entry = aarlo_entry
+
+    for p in patches:
+        p.start()
+    try:
+        start = time.perf_counter()
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        setup_time = time.perf_counter() - start
+        await hass.async_block_till_done()
+        settled_time = time.perf_counter() - start
+    finally:
+        for p in patches:
+            p.stop()
+
+    stats = hass.data[COMPONENT_STATS].as_dict()["timers"]
+    entities = len(er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id))
+    result = {
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "homeassistant": HA_VERSION,
+        "devices": devices,
+        "entities": entities,
+        "setup_entry": round(setup_time, 4),
+        "settled": round(settled_time, 4),
+        "device_registry": stats["setup/device_registry"]["total"],
+        "first_state_write": round(writes[0] - start, 4) if writes else None,
+        "last_state_write": round(writes[-1] - start, 4) if writes else None,
+        "platforms": {name: round(value, 4) if isinstance(value, float) else value
+                      for name, value in sorted(timings.items())},
+    }
+    print(f"setup devices={devices}: {json.dumps(result)}")
+
+    if os.environ.get("AARLO_BENCH_RECORD"):
+        with open(RESULTS, "a") as results:
+            results.write(json.dumps(result) + "\n")
+
+    assert entities > devices
+    assert writes
@@ -0,0 +1,71 @@
+"""Check set up, and a failed set up cleaning up after itself.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`.
+"""
+
+import datetime
+import time
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from tests.fakes import make_arlo
+
+
+async def test_login_passes_pyaarlo_its_options(hass):
+    from custom_components.aarlo import login
+
+    with patch("pyaarlo.PyArlo") as pyarlo:
+        pyarlo.return_value.is_connected = True
+        arlo = await hass.async_add_executor_job(login, hass, {
+            "username": "user@example.com",
+            "snapshot_timeout": datetime.timedelta(seconds=45),
+        })
+
+    assert arlo is pyarlo.return_value
+    options = pyarlo.call_args.kwargs
+    assert options["storage_dir"] == hass.config.path(".aarlo")
+    assert options["snapshot_timeout"] == 45
+    assert options["dump"] is False
+
+
+async def test_failed_setup_is_undone(hass, aarlo_entry):
+    from custom_components.aarlo.executor import ArloExecutor
+
+    arlo = make_arlo()
+    stop = arlo.stop
+
+    def slow_stop(logout=False):
+        time.sleep(0.2)
+        stop(logout)
+
+    arlo.stop = slow_stop
+    with patch("custom_components.aarlo.login", return_value=arlo), \
+            patch("custom_components.aarlo._async_get_or_create_momentary_device_in_registry",
+                  side_effect=RuntimeError("registry broke")), \
+            patch.object(ArloExecutor, "shutdown", autospec=True,
+                         side_effect=ArloExecutor.shutdown) as shutdown:
+        assert not await hass.config_entries.async_setup(aarlo_entry.entry_id)
+        # pyaarlo has stopped by the time set up gives up.
+        assert not arlo.is_connected
+        await hass.async_block_till_done()
+
+    assert shutdown.call_count == 1
+    assert not [key for key in hass.data if str(key).startswith("aarlo-")]
+
+
+async def test_video_doorbells_are_only_estimated_once(hass, setup_aarlo, caplog):
+    from pyaarlo.constant import BATTERY_KEY
+
+    arlo = make_arlo()
+    doorbell = arlo.doorbells[0]
+    # pyaarlo lists video doorbells as cameras too.
+    arlo.cameras.append(doorbell)
+    await setup_aarlo(arlo, "battery_sensors: true")
+
+    assert hass.states.get("sensor.aarlo_battery_drain_doorbell_0") is not None
+    assert "ID battery_drain_doorbell_0 is already used" not in caplog.text
+    assert [cb.__name__ for cb in doorbell._callbacks[BATTERY_KEY]].count("update_battery") == 1
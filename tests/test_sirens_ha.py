@@ -0,0 +1,30 @@
+"""Check sirens are fanned out through the rate limiter.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+
+async def test_a_fleet_of_sirens_beats_the_deadline(hass):
+    from custom_components.aarlo.const import (
+        COMPONENT_CONFIG,
+        COMPONENT_DOMAIN,
+        COMPONENT_LIMITER,
+        CONF_SIREN_DEADLINE,
+    )
+    from custom_components.aarlo.limiter import ArloRateLimiter
+    from custom_components.aarlo.utils import async_fan_out_sirens
+
+    hass.data[COMPONENT_CONFIG] = {COMPONENT_DOMAIN: {CONF_SIREN_DEADLINE: 2}}
+    hass.data[COMPONENT_LIMITER] = ArloRateLimiter()
+
+    jobs = [(f"siren{i}", f"SIREN{i:04}", lambda: True) for i in range(30)]
+    result = await async_fan_out_sirens(hass, jobs)
+
+    assert result.ok
+    assert not result.timed_out
+    assert len(result.latencies) == 30
@@ -0,0 +1,127 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+from snapshots import (
+    METHOD_FULL_FRAME,
+    METHOD_STREAM,
+    METHOD_STREAM_THUMBNAIL,
+    ArloSnapshotStrategy,
+)
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _teach(strategy, device_id, method, outcomes):
+    for outcome in outcomes:
+        if outcome is None:
+            strategy.record(device_id, method, False)
+        else:
+            strategy.record(device_id, method, True, outcome)
+
+
+def test_every_method_is_tried_first():
+    strategy = ArloSnapshotStrategy(min_samples=2, explore=0.0)
+    tried = []
+    for _ in range(6):
+        method = strategy.choose("CAM0001")
+        tried.append(method)
+        strategy.record("CAM0001", method, True, 5.0)
+    assert tried == [METHOD_FULL_FRAME] * 2 + [METHOD_STREAM] * 2 + [METHOD_STREAM_THUMBNAIL] * 2
+
+
+def test_fastest_reliable_method_wins():
+    strategy = ArloSnapshotStrategy(min_samples=3, explore=0.0)
+    # Quick when it works, but it mostly doesn't.
+    _teach(strategy, "CAM0001", METHOD_FULL_FRAME, [2.0, None, None, None])
+    _teach(strategy, "CAM0001", METHOD_STREAM, [6.0, 5.0, 7.0, 6.0])
+    _teach(strategy, "CAM0001", METHOD_STREAM_THUMBNAIL, [None, None, None])
+    assert strategy.choose("CAM0001") == METHOD_STREAM
+    assert strategy.best("CAM0001") == METHOD_STREAM
+
+    # Another camera learns on its own.
+    _teach(strategy, "CAM0002", METHOD_FULL_FRAME, [3.0, 3.0, 3.0])
+    _teach(strategy, "CAM0002", METHOD_STREAM, [6.0, 6.0, 6.0])
+    _teach(strategy, "CAM0002", METHOD_STREAM_THUMBNAIL, [4.0, 4.0, 4.0])
+    assert strategy.choose("CAM0002") == METHOD_FULL_FRAME
+
+
+def test_exploring_tries_the_others():
+    values = iter([0.05, 0.0, 0.05, 0.9, 0.5])
+    strategy = ArloSnapshotStrategy(min_samples=1, explore=0.1, rand=lambda: next(values))
+    _teach(strategy, "CAM0001", METHOD_FULL_FRAME, [1.0])
+    _teach(strategy, "CAM0001", METHOD_STREAM, [5.0])
+    _teach(strategy, "CAM0001", METHOD_STREAM_THUMBNAIL, [5.0])
+    assert strategy.choose("CAM0001") == METHOD_STREAM
+    assert strategy.choose("CAM0001") == METHOD_STREAM_THUMBNAIL
+    assert strategy.choose("CAM0001") == METHOD_FULL_FRAME
+
+
+def test_pending_snapshots_are_timed():
+    clock = Clock()
+    strategy = ArloSnapshotStrategy(clock=clock)
+    changes = []
+    strategy.on_change = lambda: changes.append(1)
+
+    strategy.start("CAM0001", METHOD_STREAM)
+    clock.now += 4.5
+    assert strategy.finished("CAM0001", "snapshot/1") == METHOD_STREAM
+    assert strategy.finished("CAM0001", "snapshot/2") is None
+
+    # Never arrived; asking again counts it as failed.
+    strategy.start("CAM0001", METHOD_FULL_FRAME)
+    strategy.start("CAM0001", METHOD_FULL_FRAME)
+
+    methods = strategy.as_dict()["CAM0001"]["methods"]
+    assert methods[METHOD_STREAM]["samples"] == [[True, 4.5]]
+    assert methods[METHOD_FULL_FRAME]["success_rate"] == 0.0
+    assert len(changes) == 2
+
+
+def test_the_right_image_answers_a_snapshot_and_requests_time_out():
+    clock = Clock()
+    strategy = ArloSnapshotStrategy(clock=clock)
+
+    # A recording isn't a full frame snapshot, the stream thumbnail is saved as one.
+    strategy.start("CAM0001", METHOD_FULL_FRAME)
+    assert strategy.finished("CAM0001", "capture/1") is None
+    assert strategy.finished("CAM0001", "snapshot/1") == METHOD_FULL_FRAME
+    strategy.start("CAM0001", METHOD_STREAM_THUMBNAIL)
+    clock.now += 3.0
+    assert strategy.finished("CAM0001", "capture/2") == METHOD_STREAM_THUMBNAIL
+
+    # Only the request that timed out is given up on.
+    timed_out = strategy.start("CAM0001", METHOD_STREAM)
+    strategy.abandon("CAM0001", timed_out)
+    current = strategy.start("CAM0001", METHOD_STREAM)
+    strategy.abandon("CAM0001", timed_out)
+    assert strategy.finished("CAM0001", "snapshot/2") == METHOD_STREAM
+    strategy.abandon("CAM0001", current)
+
+    methods = strategy.as_dict()["CAM0001"]["methods"]
+    assert methods[METHOD_STREAM_THUMBNAIL]["samples"] == [[True, 3.0]]
+    assert methods[METHOD_STREAM]["samples"] == [[False, None], [True, 0.0]]
+
+
+def test_outcomes_survive_a_restart():
+    strategy = ArloSnapshotStrategy(min_samples=1, explore=0.0)
+    _teach(strategy, "CAM0001", METHOD_FULL_FRAME, [9.0, None])
+    _teach(strategy, "CAM0001", METHOD_STREAM, [3.0, 4.0])
+    _teach(strategy, "CAM0001", METHOD_STREAM_THUMBNAIL, [None])
+    saved = strategy.as_dict()
+    saved["CAM0001"]["methods"]["carrier_pigeon"] = {"samples": [[True, 1.0]]}
+    saved["CAM0001"]["methods"][METHOD_STREAM]["samples"].append([True, None])
+
+    restored = ArloSnapshotStrategy(min_samples=1, explore=0.0).load(saved)
+    assert restored.best("CAM0001") == METHOD_STREAM
+    assert restored.as_dict()["CAM0001"]["methods"][METHOD_STREAM]["samples"][-1] == [False, None]
+    assert set(restored.as_dict()["CAM0001"]["methods"]) == {
+        METHOD_FULL_FRAME, METHOD_STREAM, METHOD_STREAM_THUMBNAIL
+    }
+    assert ArloSnapshotStrategy().load(None).as_dict() == {}
@@ -0,0 +1,88 @@
+"""Check snapshot outcomes are learnt and saved.
+
+Needs the Home Assistant test environment;
+`pip install pytest-homeassistant-custom-component`.
+"""
+
+import datetime
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.util import dt as dt_util
+from pyaarlo.constant import LAST_IMAGE_SRC_KEY
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from tests.fakes import make_arlo
+
+
+async def test_snapshots_are_learnt_and_saved(hass, hass_storage, setup_aarlo):
+    from custom_components.aarlo.const import COMPONENT_SNAPSHOTS, SNAPSHOTS_STORAGE_KEY
+
+    hass_storage[SNAPSHOTS_STORAGE_KEY] = {
+        "version": 1,
+        "key": SNAPSHOTS_STORAGE_KEY,
+        "data": {"CAM0000": {"methods": {"full_frame": {"samples": [[True, 3.0]]}}}},
+    }
+    arlo = make_arlo()
+    entry = await setup_aarlo(arlo, "adaptive_snapshots: true")
+    camera = arlo.cameras[0]
+    camera.set_attribute(LAST_IMAGE_SRC_KEY, "capture/1")
+
+    await hass.services.async_call("aarlo", "camera_request_snapshot",
+                                   {"entity_id": "camera.aarlo_camera_0"}, blocking=True)
+    await hass.async_add_executor_job(camera.set_attribute, LAST_IMAGE_SRC_KEY, "snapshot/2")
+    await hass.async_block_till_done()
+
+    methods = hass.data[COMPONENT_SNAPSHOTS].as_dict()["CAM0000"]["methods"]
+    assert len(methods["full_frame"]["samples"]) == 2
+    assert all(ok for ok, _latency in methods["full_frame"]["samples"])
+
+    async_fire_time_changed(hass, dt_util.utcnow() + datetime.timedelta(seconds=61))
+    await hass.async_block_till_done()
+    saved = hass_storage[SNAPSHOTS_STORAGE_KEY]["data"]
+    assert len(saved["CAM0000"]["methods"]["full_frame"]["samples"]) == 2
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_thumbnails_count_and_lost_snapshots_time_out(hass, hass_storage, setup_aarlo):
+    from custom_components.aarlo.const import COMPONENT_SNAPSHOTS, SNAPSHOTS_STORAGE_KEY
+
+    hass_storage[SNAPSHOTS_STORAGE_KEY] = {
+        "version": 1,
+        "key": SNAPSHOTS_STORAGE_KEY,
+        "data": {"CAM0000": {"methods": {
+            "full_frame": {"samples": [[True, 3.0]] * 3},
+            "stream": {"samples": [[True, 9.0]] * 3},
+        }}},
+    }
+    arlo = make_arlo()
+    entry = await setup_aarlo(arlo, "adaptive_snapshots: true", "snapshot_timeout: 30")
+    camera = arlo.cameras[0]
+    camera.set_attribute(LAST_IMAGE_SRC_KEY, "capture/1")
+
+    async def _request_snapshot():
+        await hass.services.async_call("aarlo", "camera_request_snapshot",
+                                       {"entity_id": "camera.aarlo_camera_0"}, blocking=True)
+        await hass.async_block_till_done()
+
+    # The stream thumbnail still needs trying; it turns up as a capture.
+    await _request_snapshot()
+    thumbnail_arlo = camera._arlo
+    assert thumbnail_arlo._options == {"stream_snapshot_stop": 2}
+    await hass.async_add_executor_job(camera.set_attribute, LAST_IMAGE_SRC_KEY, "capture/2")
+    await hass.async_block_till_done()
+
+    # The same method again doesn't touch the camera's settings, and a
+    # snapshot that never arrives fails once it times out.
+    await _request_snapshot()
+    assert camera._arlo is thumbnail_arlo
+    async_fire_time_changed(hass, dt_util.utcnow() + datetime.timedelta(seconds=31))
+    await hass.async_block_till_done()
+
+    methods = hass.data[COMPONENT_SNAPSHOTS].as_dict()["CAM0000"]["methods"]
+    assert [ok for ok, _latency in methods["stream_thumbnail"]["samples"]] == [True, False]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,34 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+from stats import ArloStats
+
+
+def test_counters():
+    stats = ArloStats()
+    stats.count("callback/motion")
+    stats.count("callback/motion", 2)
+    assert stats.counter("callback/motion") == 3
+    assert stats.counter("callback/ding") == 0
+
+
+def test_timers():
+    stats = ArloStats()
+    stats.time("service/siren_on", 0.5)
+    stats.time("service/siren_on", 1.5)
+    timer = stats.timer("service/siren_on")
+    assert timer["count"] == 2
+    assert timer["total"] == 2.0
+    assert timer["average"] == 1.0
+    assert timer["max"] == 1.5
+    assert timer["last"] == 1.5
+    assert stats.timer("service/siren_off") is None
+
+
+def test_as_dict_and_reset():
+    stats = ArloStats()
+    stats.count("a")
+    stats.time("b", 1.0)
+    assert set(stats.as_dict()["timers"]) == {"b"}
+    stats.reset()
+    assert stats.as_dict() == {"counters": {}, "timers": {}}
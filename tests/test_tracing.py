@@ -0,0 +1,71 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'custom_components', 'aarlo'))
+
+from tracing import (
+    ArloTracer,
+    MAX_AGE,
+    STAGE_ARLO,
+    STAGE_CALLBACK,
+    STAGE_STATE,
+    packet_device_ids,
+    packet_time,
+    percentile,
+)
+
+
+class Clock(object):
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_packet_device_ids():
+    assert packet_device_ids({"from": "cam1", "resource": "cameras/cam1"}) == {"cam1"}
+    assert packet_device_ids({"resource": "devices", "devices": {"a": {}, "b": {}}}) == {"a", "b"}
+    assert packet_device_ids({"resource": "subscriptions/base"}) == set()
+
+
+def test_packet_time():
+    assert packet_time({"timestamp": 1700000000123}) == 1700000000.123
+    assert packet_time({"properties": {"utcCreatedDate": 1700000000}}) == 1700000000.0
+    assert packet_time({"properties": {}}) is None
+
+
+def test_percentile():
+    ordered = list(range(1, 11))
+    assert percentile(ordered, 0.5) == 5
+    assert percentile(ordered, 0.9) == 9
+    assert percentile(ordered, 0.99) == 10
+    assert percentile([], 0.5) is None
+
+
+def test_stages_follow_packet():
+    clock = Clock(100.0)
+    tracer = ArloTracer(clock=clock, wall_clock=Clock(1700000000.5))
+    tracer.packet({"from": "cam1", "resource": "cameras/cam1", "timestamp": 1700000000000})
+
+    clock.now = 100.25
+    assert tracer.stage("cam1", "motionDetected", STAGE_CALLBACK) == 0.25
+    clock.now = 100.5
+    # A state write belongs to the last callback's event.
+    assert tracer.stage("cam1", None, STAGE_STATE) == 0.5
+
+    report = tracer.as_dict()["cam1"]
+    assert report["packet"][STAGE_ARLO]["p50"] == 0.5
+    assert report["motionDetected"][STAGE_CALLBACK]["count"] == 1
+    assert report["motionDetected"][STAGE_STATE]["max"] == 0.5
+
+
+def test_stale_or_unknown_packets_ignored():
+    clock = Clock()
+    tracer = ArloTracer(clock=clock)
+    assert tracer.stage("cam1", "motionDetected", STAGE_CALLBACK) is None
+
+    tracer.packet({"from": "cam1"})
+    assert tracer.stage("cam1", None, STAGE_STATE) is None
+    clock.now = MAX_AGE + 1
+    assert tracer.stage("cam1", "motionDetected", STAGE_CALLBACK) is None
+    assert tracer.as_dict() == {}